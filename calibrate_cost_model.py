@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Usage: python calibrate_cost_model.py [--min-samples N]
+# Fits COST_MODEL_CALIBRATION from recorded job timings. Reads the local
+# runtime database when LOCAL_RUNTIME_DB is set, else DYNAMODB_JOBS_TABLE.
+import sys
+import json
+import argparse
+from dotenv import load_dotenv
+
+sys.path.append("layers/shared")
+from job_manager import get_job_manager  # noqa: E402
+from cost_model import fit_calibration, estimate_resources  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fit cost model calibration from job timings"
+    )
+    parser.add_argument(
+        "--min-samples",
+        type=int,
+        default=3,
+        help="Completed jobs needed per renderer/preset factor",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    records = get_job_manager().list_jobs()
+    estimated = [
+        record
+        for record in records
+        if record.get("status") == "completed"
+        and (record.get("estimate") or {}).get("features")
+    ]
+    print(f"📊 {len(estimated)} completed jobs with estimates ({len(records)} total)")
+
+    calibration = fit_calibration(records, args.min_samples)
+    if not calibration:
+        print("❌ Not enough samples to calibrate")
+        sys.exit(1)
+
+    # Mean absolute error before and after calibration
+    for label, factors in (("uncalibrated", {}), ("calibrated", calibration)):
+        errors = [
+            abs(
+                estimate_resources(record["estimate"]["features"], factors)[
+                    "renderSeconds"
+                ]
+                - record["processingTime"]
+            )
+            for record in estimated
+            if record.get("renderCache") != "hit"
+        ]
+        if errors:
+            print(f"   {label}: mean error {sum(errors) / len(errors):.1f}s")
+
+    print("\nCOST_MODEL_CALIBRATION=" + json.dumps(calibration))
+
+
+if __name__ == "__main__":
+    main()
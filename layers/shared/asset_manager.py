@@ -0,0 +1,176 @@
+import os
+import logging
+from storage_backends import (
+    S3Backend,
+    HTTPBackend,
+    LocalBackend,
+    LocalS3Backend,
+    TransferStats,
+    S3_URI_PATTERN,
+    parse_s3_uri,
+)
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+class AssetManager:
+    def __init__(self):
+        """
+        Initialize AssetManager with one storage backend per URI scheme
+
+        Every transfer goes through _measure, so latency and throughput are
+        recorded per backend (see storage_metrics).
+        """
+        # S3_LOCAL_ROOT swaps S3 for a directory-backed stand-in (tests, benchmarks)
+        local_root = os.getenv("S3_LOCAL_ROOT")
+        self.s3 = LocalS3Backend(local_root) if local_root else S3Backend()
+        self.http = HTTPBackend()
+        self.local = LocalBackend()
+        self.stats = TransferStats()
+
+    def backend_for(self, uri):
+        """Storage backend serving a URI"""
+        if self._is_s3_uri(uri):
+            return self.s3
+        elif self._is_http_uri(uri):
+            return self.http
+        return self.local
+
+    def download_asset(self, source_uri, temp_dir):
+        """Download asset from S3, HTTP/HTTPS, or copy local file"""
+        backend = self.backend_for(source_uri)
+        if backend is self.http:
+            filename = self.http.filename(source_uri)
+        else:
+            filename = os.path.basename(source_uri)
+        local_path = os.path.join(temp_dir, filename)
+
+        with self._measure(backend, "get") as record:
+            backend.get(source_uri, local_path)
+            record["bytes"] = os.path.getsize(local_path)
+        return local_path
+
+    def upload_result(self, local_path, destination_uri, filename):
+        """Upload result to S3 or save to local destination"""
+        if self._is_s3_uri(destination_uri):
+            bucket, key_prefix = parse_s3_uri(destination_uri)
+            key = f"{key_prefix.rstrip('/')}/{filename}"
+            uri = f"s3://{bucket}/{key}"
+            with self._measure(self.s3, "put") as record:
+                self.s3.put(local_path, uri)
+                record["bytes"] = os.path.getsize(local_path)
+            return uri, bucket, key
+
+        final_path = os.path.join(destination_uri, filename)
+        with self._measure(self.local, "put") as record:
+            self.local.put(local_path, final_path)
+            record["bytes"] = os.path.getsize(local_path)
+        return final_path, None, None
+
+    def head(self, source_uri):
+        """Size, ETag and range support of an asset"""
+        backend = self.backend_for(source_uri)
+        with self._measure(backend, "head"):
+            return backend.head(source_uri)
+
+    def read_range(self, source_uri, start, end):
+        """Bytes start..end (inclusive) of an asset without downloading it"""
+        backend = self.backend_for(source_uri)
+        with self._measure(backend, "read_range") as record:
+            data = backend.read_range(source_uri, start, end)
+            record["bytes"] = len(data)
+        return data
+
+    def get_asset_size(self, source_uri, asset_info=None):
+        """
+        Return the asset size in bytes (HeadObject / Content-Length) or None
+
+        asset_info holds sizes and ETags recorded by the submit-time
+        preflight; assets found there are not requested again.
+        """
+        known = (asset_info or {}).get(source_uri)
+        if known and known.get("size"):
+            return known["size"]
+        try:
+            return self.head(source_uri)["size"]
+        except Exception as e:
+            logger.warning(f"Could not determine size of {source_uri}: {e}")
+            return None
+
+    def get_stream_url(self, source_uri):
+        """Return a location ffmpeg can read directly, without staging to disk"""
+        backend = self.backend_for(source_uri)
+        with self._measure(backend, "presign"):
+            return backend.presign(
+                source_uri, int(os.getenv("STREAM_URL_EXPIRATION", "21600"))
+            )
+
+    def get_asset_fingerprint(self, source_uri, asset_info=None):
+        """
+        Return a content fingerprint (ETag or size/mtime) or None if unknown
+
+        Fingerprints recorded in asset_info by the preflight are used as is.
+        """
+        known = (asset_info or {}).get(source_uri)
+        if known and known.get("etag"):
+            return known["etag"]
+        if self._is_local_uri(source_uri) and not os.path.exists(source_uri):
+            return None
+        return self.fingerprint(self.head(source_uri))
+
+    @staticmethod
+    def fingerprint(info):
+        """Content fingerprint from head() output, or None"""
+        if info.get("etag"):
+            return info["etag"].strip('"')
+        last_modified = info.get("lastModified")
+        length = info.get("size")
+        return f"{length}-{last_modified}" if last_modified and length else None
+
+    def copy_result(self, source_s3_uri, destination_uri, filename):
+        """Copy an existing S3 output to a destination instead of re-uploading"""
+        src_bucket, src_key = parse_s3_uri(source_s3_uri)
+        if self._is_s3_uri(destination_uri):
+            bucket, key_prefix = parse_s3_uri(destination_uri)
+            key = f"{key_prefix.rstrip('/')}/{filename}"
+            if (bucket, key) != (src_bucket, src_key):
+                with self._measure(self.s3, "copy"):
+                    self.s3.copy(source_s3_uri, f"s3://{bucket}/{key}")
+            return f"s3://{bucket}/{key}", bucket, key
+
+        os.makedirs(destination_uri, exist_ok=True)
+        final_path = os.path.join(destination_uri, filename)
+        logger.info(f"Downloading cached output {source_s3_uri} to {final_path}")
+        with self._measure(self.s3, "get") as record:
+            self.s3.get(source_s3_uri, final_path)
+            record["bytes"] = os.path.getsize(final_path)
+        return final_path, None, None
+
+    def generate_presigned_url(self, bucket, key, expiration_seconds=None):
+        """Generate pre-signed URL for S3 object"""
+        if expiration_seconds is None:
+            expiration_seconds = int(
+                os.getenv("S3_PRESIGNED_URL_EXPIRATION", "86400")
+            )  # 24 hours default
+        with self._measure(self.s3, "presign"):
+            return self.s3.presign(f"s3://{bucket}/{key}", expiration_seconds)
+
+    def storage_metrics(self):
+        """Transfer counts, bytes, latency and throughput per backend"""
+        return self.stats.snapshot()
+
+    def _measure(self, backend, operation):
+        return self.stats.measure(backend.name, operation)
+
+    def _is_s3_uri(self, uri):
+        """Check if URI is S3 format"""
+        return S3_URI_PATTERN.match(uri) is not None
+
+    def _is_http_uri(self, uri):
+        """Check if URI is HTTP/HTTPS format"""
+        return uri.startswith(("http://", "https://"))
+
+    def _is_local_uri(self, uri):
+        return not (self._is_s3_uri(uri) or self._is_http_uri(uri))
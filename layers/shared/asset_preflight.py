@@ -0,0 +1,83 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# HTTP statuses that mean the asset will never be downloadable as specified
+HTTP_NOT_FOUND = {404, 410}
+HTTP_DENIED = {401, 403}
+
+
+def is_preflight_enabled() -> bool:
+    """ASSET_PREFLIGHT turns submit-time asset checks on"""
+    return os.getenv("ASSET_PREFLIGHT", "false").lower() in ("true", "1", "yes")
+
+
+def get_asset_sources(job_spec):
+    """Every asset URI of a job spec, video first, without duplicates"""
+    sources = [job_spec.assets.video.source]
+    sources += [audio.source for audio in job_spec.assets.audio]
+    return list(dict.fromkeys(sources))
+
+
+def preflight_assets(asset_manager, sources, concurrency=None):
+    """
+    HEAD every asset concurrently (S3 HeadObject, HTTP HEAD, local stat)
+
+    Returns (assets, errors): assets maps each readable URI to its size,
+    ETag and range support, errors lists assets that are missing or access
+    is denied to.
+    Assets that could not be checked for other reasons (timeouts,
+    throttling, servers without HEAD) are left out of both and are fetched
+    as usual by the worker.
+    """
+    if concurrency is None:
+        concurrency = int(os.getenv("ASSET_PREFLIGHT_CONCURRENCY", "16"))
+    if not sources:
+        return {}, []
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(sources))) as pool:
+        results = list(pool.map(lambda uri: _check(asset_manager, uri), sources))
+
+    assets = {}
+    errors = []
+    for uri, info, error in results:
+        if error:
+            errors.append(f"{uri}: {error}")
+        elif info:
+            assets[uri] = info
+    return assets, errors
+
+
+def _check(asset_manager, uri):
+    """(uri, {"size", "etag", "ranges"} or None, error message or None)"""
+    try:
+        info = asset_manager.head(uri)
+    except FileNotFoundError:
+        return uri, None, "not found"
+    except PermissionError:
+        return uri, None, "access denied"
+    except Exception as e:
+        logger.info(f"Could not preflight {uri}: {e}")
+        return uri, None, None
+
+    status = info.get("status")
+    if status in HTTP_NOT_FOUND:
+        return uri, None, f"not found (HTTP {status})"
+    if status in HTTP_DENIED:
+        return uri, None, f"access denied (HTTP {status})"
+    if (status is not None and status >= 400) or not info.get("size"):
+        # No usable answer to HEAD; the download decides
+        return uri, None, None
+    return (
+        uri,
+        {
+            "size": info["size"],
+            "etag": asset_manager.fingerprint(info),
+            "ranges": bool(info.get("ranges")),
+        },
+        None,
+    )
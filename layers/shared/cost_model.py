@@ -0,0 +1,252 @@
+import os
+import json
+import logging
+import statistics
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any
+from media_header import read_media_info
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# x264 encode seconds per second of 1080p30 output on the Lambda's 2 vCPUs
+PRESET_SECONDS = {
+    "ultrafast": 0.25,
+    "superfast": 0.3,
+    "veryfast": 0.4,
+    "faster": 0.55,
+    "fast": 0.65,
+    "medium": 0.8,
+    "slow": 1.4,
+    "slower": 2.6,
+    "veryslow": 5.0,
+}
+# Decode seconds per second of 1080p30 input, by MP4 sample entry
+DECODE_SECONDS = {"avc1": 0.06, "avc3": 0.06, "hvc1": 0.1, "hev1": 0.1}
+DEFAULT_DECODE_SECONDS = 0.12
+# MoviePy composites every frame in Python before piping it to ffmpeg
+RENDERER_FACTOR = {"ffmpeg": 1.0, "moviepy": 2.2}
+REFERENCE_PIXELS = 1920 * 1080
+REFERENCE_FPS = 30
+# Fixed per-job cost, input transfer rate and TTS cost per event and character
+JOB_OVERHEAD_SECONDS = 5
+TRANSFER_BYTES_PER_SECOND = 40e6
+TTS_EVENT_SECONDS = 0.5
+TTS_CHAR_SECONDS = 0.002
+# Encoder frames in flight (x264 lookahead) and MoviePy's RGB frame buffers
+BASE_MEMORY_MB = 400
+ENCODER_FRAMES = 48
+MOVIEPY_FRAMES = 16
+# Float32 stereo mix at 44.1 kHz, kept in the PCM cache on /tmp
+PCM_BYTES_PER_SECOND = 44100 * 2 * 4
+# Input duration assumed from its size (1080p H.264 at ~5 Mbit/s) when the
+# header cannot be read with range requests
+SIZE_ONLY_BYTES_PER_SECOND = 5e6 / 8
+
+# What a Lambda invocation can do; bigger jobs go to the large-job queue
+STANDARD_LIMITS = {"renderSeconds": 840, "memoryMb": 3008, "diskMb": 10240}
+# What no worker class accepts
+HARD_LIMITS = {"renderSeconds": 6 * 3600, "memoryMb": 30720, "diskMb": 204800}
+LIMIT_ENV = {
+    "renderSeconds": "RENDER_SECONDS",
+    "memoryMb": "MEMORY_MB",
+    "diskMb": "DISK_MB",
+}
+
+
+def get_limits(kind):
+    """Standard (STANDARD_MAX_*) or hard (MAX_JOB_*) resource limits"""
+    defaults, prefix = (
+        (STANDARD_LIMITS, "STANDARD_MAX_")
+        if kind == "standard"
+        else (HARD_LIMITS, "MAX_JOB_")
+    )
+    return {
+        key: float(os.getenv(prefix + LIMIT_ENV[key], str(value)))
+        for key, value in defaults.items()
+    }
+
+
+def job_features(job_spec, video_info, input_bytes):
+    """Everything the cost model reads, taken from the spec and probed input"""
+    output = job_spec.output
+    encoding = output.encoding
+    tts_events = [event for event in job_spec.timeline if event.type == "tts"]
+    return {
+        "duration": video_info["duration"],
+        "width": video_info.get("width") or 1920,
+        "height": video_info.get("height") or 1080,
+        "fps": (encoding.fps if encoding and encoding.fps else None)
+        or video_info.get("fps")
+        or REFERENCE_FPS,
+        "codec": video_info.get("videoCodec"),
+        "preset": encoding.preset if encoding else "medium",
+        "renderer": output.renderer or os.getenv("RENDER_BACKEND", "moviepy"),
+        "inputBytes": input_bytes or 0,
+        "audioAssets": len(job_spec.assets.audio),
+        "ttsEvents": len(tts_events),
+        "ttsChars": sum(len(event.data.text) for event in tts_events),
+        "renditions": [
+            {"height": r.height, "preset": r.preset} for r in output.renditions or []
+        ],
+        "previewHeight": output.preview.height if output.preview else None,
+        "finalRender": not output.preview or output.preview.finalRender,
+    }
+
+
+def calibration_key(features):
+    return f"{features['renderer']}/{features['preset']}"
+
+
+def estimate_resources(features, calibration=None):
+    """
+    Render seconds, peak memory and scratch disk for a job
+
+    Encode and decode cost scale with pixel rate relative to 1080p30, by x264
+    preset, input codec and render backend; renditions and previews add an
+    encode each at their own size. Calibration factors (see fit_calibration)
+    scale the render time per renderer/preset.
+    """
+    duration = features["duration"]
+    pixels = features["width"] * features["height"]
+    rate = pixels / REFERENCE_PIXELS * features["fps"] / REFERENCE_FPS
+    preset_seconds = PRESET_SECONDS.get(features["preset"], PRESET_SECONDS["medium"])
+
+    decode = (
+        duration * rate * DECODE_SECONDS.get(features["codec"], DEFAULT_DECODE_SECONDS)
+    )
+    encode = duration * rate * preset_seconds if features["finalRender"] else 0
+    encoder_pixels = pixels if features["finalRender"] else 0
+    for rendition in features["renditions"][1:]:
+        scale = (rendition["height"] / features["height"]) ** 2
+        seconds = PRESET_SECONDS.get(rendition["preset"], preset_seconds)
+        encode += duration * rate * scale * seconds
+        encoder_pixels += pixels * scale
+    if features["previewHeight"]:
+        scale = min(features["previewHeight"] / features["height"], 1) ** 2
+        encode += duration * rate * scale * PRESET_SECONDS["ultrafast"]
+        encoder_pixels += pixels * scale
+
+    renderer_factor = RENDERER_FACTOR.get(features["renderer"], 1.0)
+    render_seconds = (
+        JOB_OVERHEAD_SECONDS
+        + features["inputBytes"] / TRANSFER_BYTES_PER_SECOND
+        + features["ttsEvents"] * TTS_EVENT_SECONDS
+        + features["ttsChars"] * TTS_CHAR_SECONDS
+        + (decode + encode) * renderer_factor
+    )
+    calibration = calibration if calibration is not None else load_calibration()
+    render_seconds *= calibration.get(
+        calibration_key(features), calibration.get("*", 1.0)
+    )
+
+    # yuv420p frames are 1.5 bytes per pixel, RGB frames 3
+    memory_bytes = encoder_pixels * 1.5 * ENCODER_FRAMES
+    if features["renderer"] == "moviepy":
+        memory_bytes += pixels * 3 * MOVIEPY_FRAMES
+    memory_mb = BASE_MEMORY_MB + memory_bytes / 2**20
+
+    # Input, output and temporary audio (the workspace budget's estimate)
+    output_factor = float(os.getenv("WORKSPACE_OUTPUT_FACTOR", "1.5"))
+    disk_bytes = features["inputBytes"] * (1 + output_factor)
+    disk_bytes += duration * PCM_BYTES_PER_SECOND * (1 + features["audioAssets"])
+    disk_mb = disk_bytes / 2**20
+
+    return {
+        "renderSeconds": round(render_seconds, 1),
+        "memoryMb": round(memory_mb),
+        "diskMb": round(disk_mb),
+    }
+
+
+def load_calibration():
+    """Factors from COST_MODEL_CALIBRATION, e.g. {"ffmpeg/medium": 1.2, "*": 0.9}"""
+    raw = os.getenv("COST_MODEL_CALIBRATION")
+    if not raw:
+        return {}
+    try:
+        return {key: float(value) for key, value in json.loads(raw).items()}
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Ignoring invalid COST_MODEL_CALIBRATION: {e}")
+        return {}
+
+
+def fit_calibration(job_records, min_samples=3):
+    """
+    Calibration factors from completed job records
+
+    Each factor is the median ratio of recorded processingTime to the
+    uncalibrated estimate, per renderer/preset with at least min_samples
+    jobs, plus an overall "*" factor for the rest.
+    """
+    ratios = {}
+    for record in job_records:
+        features = (record.get("estimate") or {}).get("features")
+        actual = record.get("processingTime")
+        if record.get("status") != "completed" or not features or not actual:
+            continue
+        if record.get("renderCache") == "hit":
+            # Served from a previous render, nothing was rendered
+            continue
+        predicted = estimate_resources(features, calibration={})["renderSeconds"]
+        ratios.setdefault(calibration_key(features), []).append(actual / predicted)
+
+    calibration = {
+        key: round(statistics.median(values), 3)
+        for key, values in ratios.items()
+        if len(values) >= min_samples
+    }
+    everything = [ratio for values in ratios.values() for ratio in values]
+    if len(everything) >= min_samples:
+        calibration["*"] = round(statistics.median(everything), 3)
+    return calibration
+
+
+def estimate_job(job_spec, asset_manager, asset_info=None) -> Optional[Dict[str, Any]]:
+    """
+    Estimate a job from its probed input video, or None if it cannot be probed
+
+    The estimate holds the resource figures, the queue class ("standard" or
+    "large"), the limits it exceeds and an ETA assuming an idle worker.
+    asset_info holds HEAD results (size, range support) from the asset
+    preflight, if it ran, so the input is not HEADed again. Inputs on
+    servers without range support are not read at all; their estimate
+    assumes a 1080p input whose duration follows from its size.
+    """
+    source = job_spec.assets.video.source
+    known = (asset_info or {}).get(source)
+    try:
+        if known and "ranges" in known:
+            info = known
+        else:
+            info = asset_manager.head(source)
+    except Exception as e:
+        logger.info(f"Skipping cost estimate, {source} is not readable: {e}")
+        return None
+    input_bytes = info.get("size")
+    if info.get("ranges"):
+        video_info = read_media_info(asset_manager, source, input_bytes)
+    elif input_bytes:
+        logger.info(f"{source} has no range support, estimating from its size")
+        video_info = {"duration": input_bytes / SIZE_ONLY_BYTES_PER_SECOND}
+    else:
+        video_info = None
+    if not video_info:
+        return None
+
+    features = job_features(job_spec, video_info, input_bytes)
+    estimate = estimate_resources(features)
+    estimate["queue"] = (
+        "large" if exceeded_limits(estimate, get_limits("standard")) else "standard"
+    )
+    estimate["estimatedCompletionAt"] = (
+        datetime.now(timezone.utc) + timedelta(seconds=estimate["renderSeconds"])
+    ).isoformat()
+    estimate["features"] = features
+    return estimate
+
+
+def exceeded_limits(estimate, limits):
+    """Names of the resource limits an estimate is over"""
+    return [key for key, limit in limits.items() if estimate[key] > limit]
@@ -1,10 +1,23 @@
 import boto3
+import logging
 import os
+import threading
+import time
+from botocore.exceptions import ClientError
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from decimal import Decimal
 from response_formatter import create_standardized_response
 
+logger = logging.getLogger(__name__)
+
+# Statuses after which a redelivered message must not reprocess the job
+FINAL_STATUSES = ("completed", "failed")
+
+
+def get_lease_seconds() -> int:
+    return int(os.environ.get("JOB_LEASE_SECONDS", "120"))
+
 
 class JobManager:
     def __init__(self):
@@ -38,6 +51,8 @@ class JobManager:
         self,
         job_id: str,
         job_info: Optional[Dict[str, Any]] = None,
+        estimate: Optional[Dict[str, Any]] = None,
+        asset_info: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Create a new job record with submitted status and return standardized response"""
         timestamp = datetime.now(timezone.utc).isoformat()
@@ -51,6 +66,10 @@ class JobManager:
             updated_at=timestamp,
             job_info=job_info,
         )
+        if estimate:
+            response_item["estimate"] = estimate
+        if asset_info:
+            response_item["assetInfo"] = asset_info
 
         # Add DynamoDB-specific fields and convert types
         db_item = response_item.copy()
@@ -68,21 +87,35 @@ class JobManager:
         processing_time: float,
         output: Dict[str, Any],
         error: Optional[str] = None,
-    ) -> None:
-        """Update job with completion data"""
+        metrics: Optional[Dict[str, Any]] = None,
+        lease_owner: Optional[str] = None,
+    ) -> bool:
+        """
+        Update job with completion data
+
+        With lease_owner the write only lands while that worker still holds
+        the job's lease; returns False if the lease was taken over.
+        """
         timestamp = datetime.now(timezone.utc).isoformat()
 
-        self.table.update_item(
-            Key={"jobId": job_id},
-            UpdateExpression="SET #status = :status, updatedAt = :updated, completedAt = :completed, processingTime = :time, #output = :output, #error = :error",
-            ExpressionAttributeValues={
-                ":status": status,
-                ":updated": timestamp,
-                ":completed": timestamp if status in ["completed", "failed"] else None,
-                ":time": self._convert_for_dynamodb(round(processing_time, 2)),
-                ":output": self._convert_for_dynamodb(output),
-                ":error": error,
-            },
+        update_expr = "SET #status = :status, updatedAt = :updated, completedAt = :completed, processingTime = :time, #output = :output, #error = :error"
+        expr_values = {
+            ":status": status,
+            ":updated": timestamp,
+            ":completed": timestamp if status in ["completed", "failed"] else None,
+            ":time": self._convert_for_dynamodb(round(processing_time, 2)),
+            ":output": self._convert_for_dynamodb(output),
+            ":error": error,
+        }
+        if metrics:
+            update_expr += ", metrics = :metrics"
+            expr_values[":metrics"] = self._convert_for_dynamodb(metrics)
+
+        return self._update_leased(
+            job_id,
+            lease_owner,
+            UpdateExpression=update_expr,
+            ExpressionAttributeValues=expr_values,
             ExpressionAttributeNames={
                 "#status": "status",
                 "#output": "output",
@@ -90,8 +123,14 @@ class JobManager:
             },
         )
 
-    def update_status(self, job_id: str, status: str, **kwargs) -> None:
-        """Update job status with optional additional fields"""
+    def update_status(
+        self, job_id: str, status: str, lease_owner: Optional[str] = None, **kwargs
+    ) -> bool:
+        """
+        Update job status with optional additional fields
+
+        lease_owner makes the write conditional as in update_job_completion.
+        """
         update_expr = "SET #status = :status, updatedAt = :updated"
         expr_values = {
             ":status": status,
@@ -101,16 +140,102 @@ class JobManager:
 
         for key, value in kwargs.items():
             if value is not None:
-                update_expr += f", {key} = :{key}"
+                update_expr += f", #{key} = :{key}"
                 expr_values[f":{key}"] = self._convert_for_dynamodb(value)
+                expr_names[f"#{key}"] = key
 
-        self.table.update_item(
-            Key={"jobId": job_id},
+        return self._update_leased(
+            job_id,
+            lease_owner,
             UpdateExpression=update_expr,
             ExpressionAttributeValues=expr_values,
             ExpressionAttributeNames=expr_names,
         )
 
+    def _update_leased(self, job_id: str, lease_owner: Optional[str], **kwargs) -> bool:
+        """update_item, conditional on leaseOwner when lease_owner is given"""
+        if lease_owner:
+            kwargs["ConditionExpression"] = "leaseOwner = :owner"
+            kwargs["ExpressionAttributeValues"][":owner"] = lease_owner
+        try:
+            self.table.update_item(Key={"jobId": job_id}, **kwargs)
+            return True
+        except ClientError as e:
+            if lease_owner and (
+                e.response["Error"]["Code"] == "ConditionalCheckFailedException"
+            ):
+                logger.warning(f"Job {job_id} is no longer leased by {lease_owner}")
+                return False
+            raise
+
+    def acquire_lease(
+        self, job_id: str, owner: str, lease_seconds: Optional[int] = None
+    ) -> bool:
+        """
+        Take the processing lease on a job with a conditional write
+
+        Succeeds when the job exists, is not finished, and the lease is free,
+        expired, or already held by the same owner.
+        """
+        now = int(time.time())
+        try:
+            self.table.update_item(
+                Key={"jobId": job_id},
+                UpdateExpression="SET leaseOwner = :owner, leaseExpiresAt = :expires",
+                ConditionExpression=(
+                    "attribute_exists(jobId) AND NOT #status IN (:completed, :failed) "
+                    "AND (attribute_not_exists(leaseOwner) OR leaseExpiresAt < :now "
+                    "OR leaseOwner = :owner)"
+                ),
+                ExpressionAttributeValues={
+                    ":owner": owner,
+                    ":expires": now + (lease_seconds or get_lease_seconds()),
+                    ":now": now,
+                    ":completed": FINAL_STATUSES[0],
+                    ":failed": FINAL_STATUSES[1],
+                },
+                ExpressionAttributeNames={"#status": "status"},
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def renew_lease(
+        self, job_id: str, owner: str, lease_seconds: Optional[int] = None
+    ) -> bool:
+        """Extend a lease we still own; returns False if it was taken over"""
+        try:
+            self.table.update_item(
+                Key={"jobId": job_id},
+                UpdateExpression="SET leaseExpiresAt = :expires",
+                ConditionExpression="leaseOwner = :owner",
+                ExpressionAttributeValues={
+                    ":owner": owner,
+                    ":expires": int(time.time())
+                    + (lease_seconds or get_lease_seconds()),
+                },
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def release_lease(self, job_id: str, owner: str) -> None:
+        """Drop a lease we own so the job can be picked up again immediately"""
+        try:
+            self.table.update_item(
+                Key={"jobId": job_id},
+                UpdateExpression="REMOVE leaseOwner, leaseExpiresAt",
+                ConditionExpression="leaseOwner = :owner",
+                ExpressionAttributeValues={":owner": owner},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
     def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get job status and details"""
         try:
@@ -119,3 +244,79 @@ class JobManager:
             return self._convert_from_dynamodb(item)
         except Exception:
             return None
+
+    def list_jobs(self):
+        """Every job record (a full table scan, for offline analysis)"""
+        items = []
+        kwargs = {}
+        while True:
+            response = self.table.scan(**kwargs)
+            items.extend(self._convert_from_dynamodb(response.get("Items", [])))
+            if "LastEvaluatedKey" not in response:
+                return items
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def get_job_manager():
+    """JobManager, or the SQLite-backed one when LOCAL_RUNTIME_DB is set"""
+    if os.environ.get("LOCAL_RUNTIME_DB"):
+        # Imported lazily: local_store builds on this module
+        from local_store import LocalJobManager
+
+        return LocalJobManager(os.environ["LOCAL_RUNTIME_DB"])
+    return JobManager()
+
+
+class LeaseHeartbeat:
+    """Renews a job lease from a background thread while the job runs"""
+
+    def __init__(self, job_manager, job_id: str, owner: str):
+        self.job_manager = job_manager
+        self.job_id = job_id
+        self.owner = owner
+        self.lease_seconds = get_lease_seconds()
+        self.lost = False
+        self.project_slots = None
+        self.project_id = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def hold_project_slot(self, project_slots, project_id) -> None:
+        """Renew the job's project slot (see scheduler) along with the lease"""
+        self.project_slots = project_slots
+        self.project_id = project_id
+
+    def stop(self) -> None:
+        """Stop renewing and release the lease and project slot"""
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+        try:
+            self.job_manager.release_lease(self.job_id, self.owner)
+        except Exception as e:
+            logger.warning(f"Failed to release lease on job {self.job_id}: {e}")
+        if self.project_slots:
+            try:
+                self.project_slots.release(self.project_id, self.job_id)
+            except Exception as e:
+                logger.warning(f"Failed to release project slot of {self.job_id}: {e}")
+
+    def _run(self) -> None:
+        interval = max(self.lease_seconds / 3, 1)
+        while not self._stop_event.wait(interval):
+            try:
+                if not self.job_manager.renew_lease(
+                    self.job_id, self.owner, self.lease_seconds
+                ):
+                    self.lost = True
+                    logger.warning(f"Lease on job {self.job_id} was taken over")
+                    return
+                if self.project_slots:
+                    self.project_slots.renew(
+                        self.project_id, self.job_id, self.lease_seconds
+                    )
+            except Exception as e:
+                logger.warning(f"Lease heartbeat failed for job {self.job_id}: {e}")
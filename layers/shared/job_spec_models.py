@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, field_validator, HttpUrl
 from typing import List, Optional, Union, Literal, Dict, Any
 from enum import Enum
+import hashlib
 import json
 import os
 from polly_constants import LanguageCode, VoiceId
@@ -10,6 +11,7 @@ class JobInfo(BaseModel):
     projectId: Optional[str] = Field(default=None, max_length=100)
     title: Optional[str] = Field(default=None, max_length=200)
     tags: Optional[List[str]] = Field(default=None, max_length=10)
+    priority: Optional[Literal["interactive", "batch"]] = None
     
     @field_validator('tags')
     @classmethod
@@ -24,6 +26,7 @@ class JobInfo(BaseModel):
 class VideoAsset(BaseModel):
     id: str
     source: str
+    inputMode: Optional[Literal["download", "stream"]] = None
 
 
 class AudioAsset(BaseModel):
@@ -52,7 +55,7 @@ class ProviderConfig(BaseModel):
 
 class TTSData(BaseModel):
     text: str
-    provider: Literal["aws-polly"] = "aws-polly"
+    provider: Literal["aws-polly", "local"] = "aws-polly"
     providerConfig: ProviderConfig = Field(default_factory=ProviderConfig)
     volume: float = Field(default=1.0, ge=0.0, le=1.0)
     duckingLevel: Optional[float] = Field(default=None, ge=0.0, le=1.0)
@@ -88,12 +91,30 @@ class Encoding(BaseModel):
     fps: Optional[float] = None
 
 
+class Rendition(BaseModel):
+    height: int = Field(ge=144, le=2160)
+    bitrate: Optional[str] = None
+    preset: Optional[str] = None
+
+
+class HLSOutput(BaseModel):
+    segmentDuration: float = Field(default=4.0, ge=1.0, le=30.0)
+
+
+class Preview(BaseModel):
+    height: int = Field(default=360, ge=144, le=1080)
+    bitrate: str = "500k"
+    fps: Optional[float] = Field(default=15, gt=0)
+    finalRender: bool = True
+
+
 class WebhookConfig(BaseModel):
     url: HttpUrl
     method: Literal["POST", "PUT"] = "POST"
     headers: Optional[Dict[str, str]] = None
     metadata: Optional[Dict[str, Union[str, int, float, bool]]] = None
-    
+    progressEvents: bool = False
+
     @field_validator('headers')
     @classmethod
     def validate_headers_size(cls, v):
@@ -117,6 +138,26 @@ class Output(BaseModel):
     destination: Optional[str] = None
     filename: str
     encoding: Optional[Encoding] = None
+    preview: Optional[Preview] = None
+    renditions: Optional[List[Rendition]] = Field(
+        default=None, min_length=1, max_length=5
+    )
+    hls: Optional[HLSOutput] = None
+    renderer: Optional[Literal["moviepy", "ffmpeg"]] = None
+
+    @field_validator("renditions")
+    @classmethod
+    def validate_unique_renditions(cls, v):
+        if v and len({rendition.height for rendition in v}) != len(v):
+            raise ValueError("Rendition heights must be unique")
+        return v
+
+    @field_validator("hls")
+    @classmethod
+    def validate_hls_output(cls, v, info):
+        if v and info.data.get("renditions"):
+            raise ValueError("HLS output cannot be combined with renditions")
+        return v
 
 
 class JobSpec(BaseModel):
@@ -150,3 +191,30 @@ class JobSpec(BaseModel):
                         f"Audio asset '{event.data.assetId}' not found in assets.audio"
                     )
         return v
+
+
+def schema_version(model_cls) -> int:
+    """Version number derived from a hash of the model's JSON schema"""
+    schema = json.dumps(model_cls.model_json_schema(), sort_keys=True)
+    return int(hashlib.sha256(schema.encode("utf-8")).hexdigest()[:12], 16)
+
+
+# Changes with every field added to or changed in the spec, so workers from
+# another deployment fall back to full validation instead of dropping fields
+JOB_SPEC_SCHEMA_VERSION = schema_version(JobSpec)
+
+
+class JobMessage(BaseModel):
+    """SQS message envelope produced by submit_job"""
+
+    jobId: str
+    jobSpec: Dict[str, Any]
+    schemaVersion: Optional[int] = None
+    specHash: Optional[str] = None
+    submittedAt: Optional[str] = None
+    # Scheduling hints read by queue workers without parsing the spec
+    lane: Optional[str] = None
+    projectId: Optional[str] = None
+    estimatedSeconds: Optional[float] = None
+    # Asset URI -> {"size", "etag"} recorded by the submit-time preflight
+    assetInfo: Optional[Dict[str, Dict[str, Any]]] = None
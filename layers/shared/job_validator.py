@@ -1,5 +1,10 @@
-from pydantic import ValidationError
-from job_spec_models import JobSpec
+import hashlib
+import inspect
+import json
+import types
+from typing import Any, Dict, Literal, Optional, Tuple, Union, get_args, get_origin
+from pydantic import BaseModel, HttpUrl, ValidationError
+from job_spec_models import JobSpec, JOB_SPEC_SCHEMA_VERSION
 
 
 def validate_job_spec(job_spec_dict):
@@ -22,6 +27,106 @@ def validate_job_spec(job_spec_dict):
         raise ValueError(f"Invalid job specification:{formatted_errors}")
 
 
+def validate_job_spec_json(raw_json):
+    """
+    Parse and validate a job specification straight from a JSON string
+
+    Args:
+        raw_json: Request body as str or bytes
+
+    Returns:
+        JobSpec: Validated JobSpec object
+
+    Raises:
+        ValueError: If the body is not valid JSON or fails validation
+    """
+    try:
+        return JobSpec.model_validate_json(raw_json)
+    except ValidationError as e:
+        if any(error["type"] == "json_invalid" for error in e.errors()):
+            raise ValueError("Invalid JSON in request body")
+        formatted_errors = format_validation_errors(e)
+        raise ValueError(f"Invalid job specification:{formatted_errors}")
+
+
+def normalize_job_spec(job_spec: JobSpec) -> Tuple[Dict[str, Any], str]:
+    """Dump a validated JobSpec with all defaults filled and return it with its hash"""
+    normalized = job_spec.model_dump(mode="json")
+    return normalized, compute_spec_hash(normalized)
+
+
+def compute_spec_hash(job_spec_dict: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON form of a job spec dictionary"""
+    canonical = json.dumps(job_spec_dict, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_job_spec(
+    job_spec_dict: Dict[str, Any],
+    spec_hash: Optional[str] = None,
+    schema_version: Optional[int] = None,
+) -> JobSpec:
+    """
+    Load a job spec received from the queue
+
+    Specs normalized by submit_job carry the current schema version and a
+    content hash. When both match, the spec is rebuilt without rerunning
+    validators. Anything else goes through full validation.
+    """
+    if (
+        spec_hash
+        and schema_version == JOB_SPEC_SCHEMA_VERSION
+        and compute_spec_hash(job_spec_dict) == spec_hash
+    ):
+        return construct_trusted(JobSpec, job_spec_dict)
+    return validate_job_spec(job_spec_dict)
+
+
+def construct_trusted(model_cls, data: Dict[str, Any]):
+    """Recursively build a model from already-validated data via model_construct"""
+    values = {}
+    for name, field in model_cls.model_fields.items():
+        if name in data:
+            values[name] = _construct_value(field.annotation, data[name])
+    return model_cls.model_construct(**values)
+
+
+def _construct_value(annotation, value):
+    if value is None:
+        return None
+
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        candidates = [arg for arg in get_args(annotation) if arg is not type(None)]
+        models = [arg for arg in candidates if _is_model(arg)]
+        if isinstance(value, dict) and models:
+            for model in models:
+                if _literals_match(model, value):
+                    return construct_trusted(model, value)
+        return _construct_value(candidates[0], value) if len(candidates) == 1 else value
+    if origin is list:
+        (item_type,) = get_args(annotation) or (Any,)
+        return [_construct_value(item_type, item) for item in value]
+    if _is_model(annotation) and isinstance(value, dict):
+        return construct_trusted(annotation, value)
+    if annotation is HttpUrl:
+        return HttpUrl(value)
+    return value
+
+
+def _is_model(annotation) -> bool:
+    return inspect.isclass(annotation) and issubclass(annotation, BaseModel)
+
+
+def _literals_match(model_cls, value: Dict[str, Any]) -> bool:
+    """Pick a union member by its Literal discriminator fields (e.g. event type)"""
+    for name, field in model_cls.model_fields.items():
+        if get_origin(field.annotation) is Literal and name in value:
+            if value[name] not in get_args(field.annotation):
+                return False
+    return True
+
+
 def format_validation_errors(e: ValidationError) -> str:
     """Format Pydantic validation errors into user-friendly messages"""
     error_messages = []
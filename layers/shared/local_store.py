@@ -0,0 +1,427 @@
+import boto3
+import json
+import os
+import time
+import uuid
+import sqlite3
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from response_formatter import create_standardized_response
+from job_manager import FINAL_STATUSES, get_lease_seconds
+from scheduler import get_project_cap
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    item TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    message_id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    body TEXT NOT NULL,
+    sent_at REAL NOT NULL,
+    visible_at REAL NOT NULL,
+    receive_count INTEGER NOT NULL DEFAULT 0,
+    first_received_at REAL,
+    receipt_handle TEXT,
+    deleted_at REAL
+);
+CREATE INDEX IF NOT EXISTS messages_ready ON messages (queue, deleted_at, visible_at);
+CREATE TABLE IF NOT EXISTS project_slots (
+    project_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (project_id, job_id)
+);
+"""
+
+
+class LocalDatabase:
+    """
+    SQLite file shared by every process of a local runtime
+
+    Each operation opens its own connection, so job managers and queue
+    clients can be used from worker processes and heartbeat threads alike.
+    Writes take the database lock up front (BEGIN IMMEDIATE), which makes
+    read-modify-write updates such as lease checks atomic across processes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        db = self._connect()
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    @contextmanager
+    def transaction(self):
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+
+class LocalJobManager:
+    """JobManager backed by a SQLite table instead of DynamoDB"""
+
+    def __init__(self, path=None):
+        self.db = LocalDatabase(path or os.environ["LOCAL_RUNTIME_DB"])
+
+    def create_job(
+        self,
+        job_id: str,
+        job_info: Optional[Dict[str, Any]] = None,
+        estimate: Optional[Dict[str, Any]] = None,
+        asset_info: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Create a new job record with submitted status and return standardized response"""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        response_item = create_standardized_response(
+            job_id=job_id,
+            status="submitted",
+            submitted_at=timestamp,
+            updated_at=timestamp,
+            job_info=job_info,
+        )
+        if estimate:
+            response_item["estimate"] = estimate
+        if asset_info:
+            response_item["assetInfo"] = asset_info
+        with self.db.transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, item) VALUES (?, ?)",
+                (job_id, json.dumps(response_item)),
+            )
+        return response_item
+
+    def update_job_completion(
+        self,
+        job_id: str,
+        status: str,
+        processing_time: float,
+        output: Dict[str, Any],
+        error: Optional[str] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        lease_owner: Optional[str] = None,
+    ) -> bool:
+        """Update job with completion data, conditional on lease_owner if given"""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        fields = {
+            "status": status,
+            "updatedAt": timestamp,
+            "completedAt": timestamp if status in FINAL_STATUSES else None,
+            "processingTime": round(processing_time, 2),
+            "output": output,
+            "error": error,
+        }
+        if metrics:
+            fields["metrics"] = metrics
+        return self._update_leased(job_id, lease_owner, fields)
+
+    def update_status(
+        self, job_id: str, status: str, lease_owner: Optional[str] = None, **kwargs
+    ) -> bool:
+        """Update job status with optional additional fields"""
+        fields = {"status": status, "updatedAt": datetime.now(timezone.utc).isoformat()}
+        fields.update({k: v for k, v in kwargs.items() if v is not None})
+        return self._update_leased(job_id, lease_owner, fields)
+
+    def acquire_lease(
+        self, job_id: str, owner: str, lease_seconds: Optional[int] = None
+    ) -> bool:
+        """Take the processing lease under the same conditions as JobManager"""
+        now = int(time.time())
+
+        def take(item):
+            if item.get("status") in FINAL_STATUSES:
+                return False
+            if (
+                item.get("leaseOwner") not in (None, owner)
+                and item.get("leaseExpiresAt", 0) >= now
+            ):
+                return False
+            item["leaseOwner"] = owner
+            item["leaseExpiresAt"] = now + (lease_seconds or get_lease_seconds())
+            return True
+
+        return self._update(job_id, take) is True
+
+    def renew_lease(
+        self, job_id: str, owner: str, lease_seconds: Optional[int] = None
+    ) -> bool:
+        """Extend a lease we still own; returns False if it was taken over"""
+
+        def renew(item):
+            if item.get("leaseOwner") != owner:
+                return False
+            item["leaseExpiresAt"] = int(time.time()) + (
+                lease_seconds or get_lease_seconds()
+            )
+            return True
+
+        return self._update(job_id, renew) is True
+
+    def release_lease(self, job_id: str, owner: str) -> None:
+        """Drop a lease we own so the job can be picked up again immediately"""
+
+        def release(item):
+            if item.get("leaseOwner") == owner:
+                item.pop("leaseOwner")
+                item.pop("leaseExpiresAt", None)
+
+        self._update(job_id, release)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get job status and details"""
+        with self.db.transaction() as db:
+            row = db.execute(
+                "SELECT item FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(row["item"]) if row else None
+
+    def list_jobs(self):
+        """Every job record, oldest first"""
+        with self.db.transaction() as db:
+            rows = db.execute("SELECT item FROM jobs ORDER BY rowid").fetchall()
+        return [json.loads(row["item"]) for row in rows]
+
+    def _update_leased(self, job_id, lease_owner, fields):
+        """Apply fields unless lease_owner is given and no longer holds the lease"""
+
+        def apply(item):
+            if lease_owner and item.get("leaseOwner") != lease_owner:
+                logger.warning(f"Job {job_id} is no longer leased by {lease_owner}")
+                return False
+            item.update(fields)
+            return True
+
+        return self._update(job_id, apply) is True
+
+    def _update(self, job_id, mutate):
+        """Apply mutate to a job record atomically; returns mutate's result"""
+        with self.db.transaction() as db:
+            row = db.execute(
+                "SELECT item FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if not row:
+                # Matches the attribute_exists(jobId) condition on DynamoDB
+                return False
+            item = json.loads(row["item"])
+            result = mutate(item)
+            db.execute(
+                "UPDATE jobs SET item = ? WHERE job_id = ?",
+                (json.dumps(item, default=str), job_id),
+            )
+        return result
+
+
+class LocalProjectSlots:
+    """ProjectSlots backed by a SQLite table instead of DynamoDB"""
+
+    def __init__(self, path=None):
+        self.db = LocalDatabase(path or os.environ["LOCAL_RUNTIME_DB"])
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    def acquire(self, project_id, job_id, seconds=None) -> bool:
+        """Take a slot for a job; False when the project is at its cap"""
+        cap = get_project_cap(project_id)
+        if not cap:
+            return True
+        now = time.time()
+        with self.db.transaction() as db:
+            db.execute(
+                "DELETE FROM project_slots WHERE project_id = ? AND expires_at < ?",
+                (project_id, now),
+            )
+            running = {
+                row["job_id"]
+                for row in db.execute(
+                    "SELECT job_id FROM project_slots WHERE project_id = ?",
+                    (project_id,),
+                )
+            }
+            if job_id not in running and len(running) >= cap:
+                return False
+            db.execute(
+                "INSERT OR REPLACE INTO project_slots (project_id, job_id, expires_at) "
+                "VALUES (?, ?, ?)",
+                (project_id, job_id, now + (seconds or get_lease_seconds())),
+            )
+        return True
+
+    def renew(self, project_id, job_id, seconds=None) -> None:
+        """Extend a job's slot; no-op if it already expired and was taken"""
+        with self.db.transaction() as db:
+            db.execute(
+                "UPDATE project_slots SET expires_at = ? "
+                "WHERE project_id = ? AND job_id = ?",
+                (time.time() + (seconds or get_lease_seconds()), project_id, job_id),
+            )
+
+    def release(self, project_id, job_id) -> None:
+        """Free a job's slot for the project's next job"""
+        with self.db.transaction() as db:
+            db.execute(
+                "DELETE FROM project_slots WHERE project_id = ? AND job_id = ?",
+                (project_id, job_id),
+            )
+
+
+class LocalQueueClient:
+    """
+    SQS client stand-in over the same SQLite file
+
+    Implements the boto3 calls the services make (send, receive with a
+    visibility timeout, delete, change visibility), keyed by QueueUrl, so
+    queue consumers run unchanged against it. Deleted messages are kept with
+    their timestamps for queue-wait reporting (see message_timings).
+    """
+
+    def __init__(self, path=None):
+        self.db = LocalDatabase(path or os.environ["LOCAL_RUNTIME_DB"])
+
+    def send_message(self, QueueUrl, MessageBody, DelaySeconds=0, **kwargs):
+        message_id = str(uuid.uuid4())
+        now = time.time()
+        with self.db.transaction() as db:
+            db.execute(
+                "INSERT INTO messages (message_id, queue, body, sent_at, visible_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (message_id, QueueUrl, MessageBody, now, now + DelaySeconds),
+            )
+        return {"MessageId": message_id}
+
+    def receive_message(
+        self,
+        QueueUrl,
+        MaxNumberOfMessages=1,
+        WaitTimeSeconds=0,
+        VisibilityTimeout=30,
+        **kwargs,
+    ):
+        """Oldest visible messages, hidden for VisibilityTimeout seconds"""
+        deadline = time.time() + WaitTimeSeconds
+        while True:
+            messages = self._receive(QueueUrl, MaxNumberOfMessages, VisibilityTimeout)
+            if messages or time.time() >= deadline:
+                return {"Messages": messages} if messages else {}
+            time.sleep(min(0.2, max(deadline - time.time(), 0)))
+
+    def delete_message(self, QueueUrl, ReceiptHandle, **kwargs):
+        with self.db.transaction() as db:
+            db.execute(
+                "UPDATE messages SET deleted_at = ? "
+                "WHERE queue = ? AND receipt_handle = ? AND deleted_at IS NULL",
+                (time.time(), QueueUrl, ReceiptHandle),
+            )
+        return {}
+
+    def change_message_visibility(
+        self, QueueUrl, ReceiptHandle, VisibilityTimeout, **kwargs
+    ):
+        with self.db.transaction() as db:
+            db.execute(
+                "UPDATE messages SET visible_at = ? "
+                "WHERE queue = ? AND receipt_handle = ? AND deleted_at IS NULL",
+                (time.time() + VisibilityTimeout, QueueUrl, ReceiptHandle),
+            )
+        return {}
+
+    def change_message_visibility_batch(self, QueueUrl, Entries, **kwargs):
+        for entry in Entries:
+            self.change_message_visibility(
+                QueueUrl, entry["ReceiptHandle"], entry["VisibilityTimeout"]
+            )
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+    def get_queue_attributes(self, QueueUrl, **kwargs):
+        """Visible and in-flight message counts, as SQS reports them"""
+        now = time.time()
+        with self.db.transaction() as db:
+            row = db.execute(
+                "SELECT SUM(visible_at <= ?) AS visible, SUM(visible_at > ?) AS hidden "
+                "FROM messages WHERE queue = ? AND deleted_at IS NULL",
+                (now, now, QueueUrl),
+            ).fetchone()
+        return {
+            "Attributes": {
+                "ApproximateNumberOfMessages": str(row["visible"] or 0),
+                "ApproximateNumberOfMessagesNotVisible": str(row["hidden"] or 0),
+            }
+        }
+
+    def message_timings(self, QueueUrl):
+        """Sent, first received and deleted times (epoch seconds) per message"""
+        with self.db.transaction() as db:
+            rows = db.execute(
+                "SELECT message_id, body, sent_at, first_received_at, deleted_at, "
+                "receive_count FROM messages WHERE queue = ? ORDER BY sent_at",
+                (QueueUrl,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _receive(self, queue_url, max_messages, visibility_timeout):
+        now = time.time()
+        messages = []
+        with self.db.transaction() as db:
+            rows = db.execute(
+                "SELECT * FROM messages WHERE queue = ? AND deleted_at IS NULL "
+                "AND visible_at <= ? ORDER BY sent_at LIMIT ?",
+                (queue_url, now, max_messages),
+            ).fetchall()
+            for row in rows:
+                receipt_handle = str(uuid.uuid4())
+                db.execute(
+                    "UPDATE messages SET visible_at = ?, receipt_handle = ?, "
+                    "receive_count = receive_count + 1, "
+                    "first_received_at = COALESCE(first_received_at, ?) "
+                    "WHERE message_id = ?",
+                    (now + visibility_timeout, receipt_handle, now, row["message_id"]),
+                )
+                messages.append(
+                    {
+                        "MessageId": row["message_id"],
+                        "ReceiptHandle": receipt_handle,
+                        "Body": row["body"],
+                        "Attributes": {
+                            "SentTimestamp": str(int(row["sent_at"] * 1000)),
+                            "ApproximateReceiveCount": str(row["receive_count"] + 1),
+                            "ApproximateFirstReceiveTimestamp": str(
+                                int((row["first_received_at"] or now) * 1000)
+                            ),
+                        },
+                    }
+                )
+        return messages
+
+
+def get_queue_client(**kwargs):
+    """SQS client, or the SQLite stand-in when LOCAL_RUNTIME_DB is set"""
+    path = os.getenv("LOCAL_RUNTIME_DB")
+    if path:
+        return LocalQueueClient(path)
+    return boto3.client("sqs", **kwargs)
@@ -0,0 +1,140 @@
+import os
+import struct
+import logging
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Bytes fetched per range read while looking for the moov box
+HEADER_READ_SIZE = 64 * 1024
+# Larger moov boxes (hours of very short samples) are not worth fetching
+MAX_MOOV_BYTES = 32 * 1024 * 1024
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+
+def read_media_info(asset_manager, uri, size=None):
+    """
+    Duration, resolution, fps and codecs of an MP4/MOV from its moov box
+
+    Reads only the container header through byte-range requests (a few
+    hundred KB at most), so it works where ffprobe is not available, such as
+    the submit function. Returns None for other containers or unreadable
+    headers.
+    """
+    try:
+        if size is None:
+            size = asset_manager.head(uri)["size"]
+        moov = _find_moov(asset_manager, uri, size)
+        return _parse_moov(moov) if moov else None
+    except Exception as e:
+        logger.info(f"Could not read media header of {uri}: {e}")
+        return None
+
+
+def _find_moov(asset_manager, uri, size):
+    """Walk the top-level boxes (ftyp, mdat, moov, ...) to the moov box"""
+    offset = 0
+    while offset + 8 <= size:
+        end = min(offset + HEADER_READ_SIZE, size) - 1
+        data = asset_manager.read_range(uri, offset, end)
+        box_size, box_type, header_size = _box_header(data, 0)
+        if box_size is None:
+            return None
+        if box_size == 0:
+            box_size = size - offset
+        if box_type == b"moov":
+            if box_size > MAX_MOOV_BYTES:
+                return None
+            if box_size > len(data):
+                data = asset_manager.read_range(uri, offset, offset + box_size - 1)
+            return data[header_size:box_size]
+        if box_size < header_size:
+            return None
+        offset += box_size
+    return None
+
+
+def _box_header(data, offset):
+    """(size, type, header size) of the box at offset, or Nones if truncated"""
+    if offset + 8 > len(data):
+        return None, None, None
+    box_size, box_type = struct.unpack(">I4s", data[offset : offset + 8])
+    if box_size == 1:
+        if offset + 16 > len(data):
+            return None, None, None
+        return struct.unpack(">Q", data[offset + 8 : offset + 16])[0], box_type, 16
+    return box_size, box_type, 8
+
+
+def _boxes(data):
+    """Yield (type, payload) for each box in data"""
+    offset = 0
+    while True:
+        box_size, box_type, header_size = _box_header(data, offset)
+        if box_size is None or box_size < header_size:
+            return
+        if box_size == 0:
+            box_size = len(data) - offset
+        yield box_type, data[offset + header_size : offset + box_size]
+        offset += box_size
+
+
+def _parse_moov(moov):
+    info = {
+        "duration": None,
+        "width": None,
+        "height": None,
+        "fps": None,
+        "videoCodec": None,
+        "audioCodec": None,
+    }
+    for box_type, payload in _boxes(moov):
+        if box_type == b"mvhd":
+            info["duration"] = _media_duration(payload)
+        elif box_type == b"trak":
+            _parse_track(payload, info)
+    return info if info["duration"] else None
+
+
+def _media_duration(payload):
+    """Seconds from an mvhd or mdhd payload"""
+    if payload[0] == 1:
+        timescale, duration = struct.unpack(">IQ", payload[20:32])
+    else:
+        timescale, duration = struct.unpack(">II", payload[12:20])
+    return duration / timescale if timescale else None
+
+
+def _parse_track(trak, info):
+    track = {}
+
+    def walk(data):
+        for box_type, payload in _boxes(data):
+            if box_type in CONTAINER_BOXES:
+                walk(payload)
+            elif box_type == b"tkhd" and len(payload) >= 8:
+                # Width and height are the last two 16.16 fixed-point fields
+                width, height = struct.unpack(">II", payload[-8:])
+                track["size"] = (width >> 16, height >> 16)
+            elif box_type == b"mdhd":
+                track["duration"] = _media_duration(payload)
+            elif box_type == b"hdlr":
+                track["handler"] = payload[8:12]
+            elif box_type == b"stsd" and len(payload) >= 16:
+                track["codec"] = payload[12:16].decode("latin-1").strip()
+            elif box_type == b"stts":
+                (count,) = struct.unpack(">I", payload[4:8])
+                track["frames"] = sum(
+                    struct.unpack(">I", payload[8 + 8 * n : 12 + 8 * n])[0]
+                    for n in range(count)
+                )
+
+    walk(trak)
+    if track.get("handler") == b"vide" and not info["videoCodec"]:
+        info["videoCodec"] = track.get("codec")
+        info["width"], info["height"] = track.get("size", (None, None))
+        if track.get("frames") and track.get("duration"):
+            info["fps"] = round(track["frames"] / track["duration"], 3)
+    elif track.get("handler") == b"soun" and not info["audioCodec"]:
+        info["audioCodec"] = track.get("codec")
@@ -0,0 +1,173 @@
+import os
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Service error codes that mean "slow down" rather than "failed"
+THROTTLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "SlowDown",
+    "ServiceUnavailable",
+    "RequestThrottled",
+}
+THROTTLE_STATUSES = {429, 503}
+
+# Per-service ceilings; each limiter starts at half and adapts from there
+DEFAULT_LIMITS = {"polly": 8, "s3": 32, "webhook": 16}
+
+
+def is_throttle_error(error):
+    """True when an exception is a throttling signal from AWS or an HTTP API"""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code", "")
+        status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        return code in THROTTLE_CODES or status in THROTTLE_STATUSES
+    return getattr(response, "status_code", None) in THROTTLE_STATUSES
+
+
+class Permit:
+    """A held concurrency slot; set throttled for throttling seen without an error"""
+
+    __slots__ = ("throttled",)
+
+    def __init__(self):
+        self.throttled = False
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter shared by every thread calling one service
+
+    While callers use every slot, the limit grows by one per cooldown period;
+    a throttling signal cuts it by a quarter, at most once per cooldown so a
+    burst of throttles from the same round counts once. Callers beyond the
+    limit wait, so throughput settles just under the service quota instead of
+    oscillating between bursts and failures.
+    """
+
+    def __init__(
+        self, name, max_limit, min_limit=1, cooldown=1.0, retries=3, backoff=0.75
+    ):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = max(min_limit, max_limit / 2)
+        self.cooldown = cooldown
+        self.retries = retries
+        self.backoff = backoff
+        self.in_flight = 0
+        self.calls = 0
+        self.throttles = 0
+        self.waited_seconds = 0.0
+        self._last_decrease = 0.0
+        self._last_change = 0.0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def acquire(self):
+        """Hold one slot; throttling errors raised inside shrink the limit"""
+        started = time.monotonic()
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            self.waited_seconds += time.monotonic() - started
+
+        permit = Permit()
+        succeeded = False
+        try:
+            yield permit
+            succeeded = not permit.throttled
+        except Exception as e:
+            permit.throttled = is_throttle_error(e)
+            raise
+        finally:
+            self._release(succeeded, permit.throttled)
+
+    def call(self, fn, *args, **kwargs):
+        """Call fn within a slot, retrying throttled calls with jittered backoff"""
+        for attempt in range(self.retries + 1):
+            try:
+                with self.acquire():
+                    return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.retries or not is_throttle_error(e):
+                    raise
+                # Full jitter so throttled callers do not retry in lockstep
+                delay = random.uniform(0, min(20.0, 0.5 * 2**attempt))
+                logger.warning(
+                    f"{self.name} throttled, retrying in {delay:.1f}s "
+                    f"(limit {self.limit:.1f})"
+                )
+                time.sleep(delay)
+
+    def _release(self, succeeded, throttled):
+        with self._condition:
+            self.in_flight -= 1
+            self.calls += 1
+            now = time.monotonic()
+            if throttled:
+                self.throttles += 1
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = self._last_change = now
+            elif (
+                succeeded
+                and now - self._last_change >= self.cooldown
+                and self.in_flight + 1 >= int(self.limit)
+            ):
+                # Only grow while the current limit is actually in use
+                self.limit = min(self.max_limit, self.limit + 1)
+                self._last_change = now
+            self._condition.notify_all()
+
+    def metrics(self):
+        """Current limit and counters for job records and logs"""
+        with self._condition:
+            return {
+                "limit": round(self.limit, 2),
+                "inFlight": self.in_flight,
+                "calls": self.calls,
+                "throttles": self.throttles,
+                "waitedSeconds": round(self.waited_seconds, 3),
+            }
+
+
+_limiters = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(name, key=None):
+    """
+    Process-wide limiter for a service, configured by RATE_LIMIT_<NAME>_MAX
+
+    key separates independent quotas of one service (e.g. webhook hosts) so
+    one throttling endpoint does not slow the others.
+    """
+    limiter_name = f"{name}:{key}" if key else name
+    with _registry_lock:
+        if limiter_name not in _limiters:
+            max_limit = int(
+                os.getenv(
+                    f"RATE_LIMIT_{name.upper()}_MAX", str(DEFAULT_LIMITS.get(name, 16))
+                )
+            )
+            _limiters[limiter_name] = AdaptiveLimiter(limiter_name, max_limit)
+        return _limiters[limiter_name]
+
+
+def limiter_metrics():
+    """Snapshot of every limiter created in this process"""
+    with _registry_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.metrics() for limiter in limiters}
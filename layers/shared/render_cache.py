@@ -0,0 +1,113 @@
+import boto3
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional, Dict, Any
+from job_validator import compute_spec_hash
+
+
+def compute_render_hash(job_spec, asset_fingerprints: Dict[str, str]) -> str:
+    """
+    Hash the render-relevant parts of a job spec
+
+    Two specs with the same hash produce the same video: same asset contents
+    (source plus ETag/fingerprint), timeline, background music and encoding.
+    Output filename/destination, jobInfo and notifications are excluded.
+    """
+    video = job_spec.assets.video
+    payload = {
+        "assets": {
+            "video": {
+                "source": video.source,
+                "etag": asset_fingerprints[video.source],
+            },
+            "audio": [
+                {
+                    "id": audio.id,
+                    "source": audio.source,
+                    "etag": asset_fingerprints[audio.source],
+                }
+                for audio in job_spec.assets.audio
+            ],
+        },
+        "timeline": [event.model_dump(mode="json") for event in job_spec.timeline],
+        "backgroundMusic": (
+            job_spec.backgroundMusic.model_dump(mode="json")
+            if job_spec.backgroundMusic
+            else None
+        ),
+        "encoding": (
+            job_spec.output.encoding.model_dump(mode="json")
+            if job_spec.output.encoding
+            else None
+        ),
+    }
+    # Preview-only jobs produce the proxy, not the full render
+    preview = job_spec.output.preview
+    if preview and not preview.finalRender:
+        payload["preview"] = preview.model_dump(mode="json")
+    return compute_spec_hash(payload)
+
+
+class RenderCache:
+    """DynamoDB-backed map of render hash -> previously rendered S3 output"""
+
+    def __init__(self):
+        self.table_name = os.environ.get("DYNAMODB_RENDER_CACHE_TABLE")
+        self.table = (
+            boto3.resource("dynamodb").Table(self.table_name)
+            if self.table_name
+            else None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.table is not None
+
+    def get(self, render_hash: str) -> Optional[Dict[str, Any]]:
+        """Return cached output for a render hash, or None on miss"""
+        if not self.enabled:
+            return None
+        try:
+            item = self.table.get_item(Key={"renderHash": render_hash}).get("Item")
+        except Exception:
+            return None
+        if not item:
+            return None
+        return {
+            "s3Uri": item["s3Uri"],
+            "duration": float(item["duration"]) if item.get("duration") else None,
+            "size": int(item["size"]) if item.get("size") else None,
+            "jobId": item.get("jobId"),
+        }
+
+    def put(
+        self,
+        render_hash: str,
+        job_id: str,
+        s3_uri: str,
+        duration: Optional[float],
+        size: Optional[int],
+    ) -> None:
+        """Record a rendered output so identical specs can reuse it"""
+        if not self.enabled:
+            return
+        ttl_seconds = int(os.environ.get("RENDER_CACHE_TTL_SECONDS", "604800"))
+        now = datetime.now(timezone.utc)
+        self.table.put_item(
+            Item={
+                "renderHash": render_hash,
+                "jobId": job_id,
+                "s3Uri": s3_uri,
+                "duration": Decimal(str(round(duration, 3))) if duration else None,
+                "size": size,
+                "createdAt": now.isoformat(),
+                "ttl": int(now.timestamp()) + ttl_seconds,
+            }
+        )
+
+    def invalidate(self, render_hash: str) -> None:
+        """Drop an entry whose output no longer exists"""
+        if not self.enabled:
+            return
+        self.table.delete_item(Key={"renderHash": render_hash})
@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import logging
+import boto3
+from collections import Counter
+from datetime import datetime
+from botocore.exceptions import ClientError
+from job_manager import get_lease_seconds
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Priority lanes, in the order workers serve them
+LANES = ("interactive", "batch")
+# SQS caps a receive at 10 messages and a long poll at 20 seconds
+MAX_RECEIVE_MESSAGES = 10
+LONG_POLL_SECONDS = 20
+# Idle long poll on the top lane when there are several, so a lower lane's
+# first message waits at most this long
+LANE_POLL_SECONDS = 5
+# Conditional-write attempts before a contended project slot counts as taken
+SLOT_ATTEMPTS = 5
+# Idle project slot records expire after a day
+SLOT_RECORD_TTL_SECONDS = 86400
+
+
+def get_lane(job_spec, estimate=None) -> str:
+    """
+    Priority lane of a job: jobInfo.priority when set, else interactive for
+    preview renders and jobs estimated at SCHEDULER_SHORT_JOB_SECONDS or less
+    (so short jobs overtake a batch backlog), else batch
+    """
+    priority = job_spec.jobInfo.priority if job_spec.jobInfo else None
+    if priority:
+        return priority
+    if job_spec.output.preview:
+        return "interactive"
+    short_job_seconds = float(os.getenv("SCHEDULER_SHORT_JOB_SECONDS", "60"))
+    if estimate and estimate["renderSeconds"] <= short_job_seconds:
+        return "interactive"
+    return "batch"
+
+
+def get_lane_queue_urls(default_url=None):
+    """
+    Queue URL per lane
+
+    The batch lane is SQS_JOB_QUEUE_URL; the interactive lane is
+    SQS_INTERACTIVE_JOB_QUEUE_URL, or the same queue when that is unset.
+    """
+    default_url = default_url or os.environ["SQS_JOB_QUEUE_URL"]
+    return {
+        "interactive": os.environ.get("SQS_INTERACTIVE_JOB_QUEUE_URL") or default_url,
+        "batch": default_url,
+    }
+
+
+def get_project_cap(project_id) -> int:
+    """
+    Concurrent jobs allowed for a project, 0 for no cap
+
+    PROJECT_CONCURRENCY_LIMITS holds per-project overrides as JSON, e.g.
+    {"bulk-import": 2}; other projects get PROJECT_MAX_CONCURRENT_JOBS. Jobs
+    without a projectId are never capped.
+    """
+    if not project_id:
+        return 0
+    overrides = os.getenv("PROJECT_CONCURRENCY_LIMITS")
+    if overrides:
+        try:
+            limits = json.loads(overrides)
+            if project_id in limits:
+                return int(limits[project_id])
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring invalid PROJECT_CONCURRENCY_LIMITS: {e}")
+    return int(os.getenv("PROJECT_MAX_CONCURRENT_JOBS", "0"))
+
+
+def scheduling_info(body):
+    """Lane, project, estimated seconds and submit time of a job message"""
+    message = json.loads(body)
+    submitted_at = message.get("submittedAt")
+    return {
+        "jobId": message.get("jobId"),
+        "lane": message.get("lane") or "batch",
+        "projectId": message.get("projectId"),
+        "estimatedSeconds": message.get("estimatedSeconds"),
+        "submittedAt": (
+            datetime.fromisoformat(submitted_at).timestamp() if submitted_at else None
+        ),
+    }
+
+
+def receive_by_priority(
+    sqs,
+    queue_urls,
+    max_messages,
+    visibility_timeout,
+    wait_seconds=LONG_POLL_SECONDS,
+    lower_lane_max=None,
+):
+    """
+    Receive up to max_messages from lane queues, highest priority first
+
+    Lower lanes are only asked for what higher ones did not fill, and for at
+    most lower_lane_max messages, so a worker can prefetch interactive jobs
+    without holding batch jobs it cannot start yet. When every lane is empty
+    the top lane is long-polled (for at most LANE_POLL_SECONDS when there are
+    several). Each message gets its "QueueUrl" and "Scheduling" info (see
+    scheduling_info).
+    """
+    messages = []
+    for n, queue_url in enumerate(queue_urls):
+        wanted = min(max_messages - len(messages), MAX_RECEIVE_MESSAGES)
+        if n and lower_lane_max is not None:
+            wanted = min(wanted, lower_lane_max)
+        if wanted <= 0:
+            break
+        messages.extend(
+            _receive(sqs, queue_url, wanted, visibility_timeout, wait_seconds=0)
+        )
+    if not messages and wait_seconds:
+        if len(queue_urls) > 1:
+            wait_seconds = min(wait_seconds, LANE_POLL_SECONDS)
+        messages = _receive(
+            sqs,
+            queue_urls[0],
+            min(max_messages, MAX_RECEIVE_MESSAGES),
+            visibility_timeout,
+            wait_seconds,
+        )
+    return messages
+
+
+def _receive(sqs, queue_url, max_messages, visibility_timeout, wait_seconds):
+    response = sqs.receive_message(
+        QueueUrl=queue_url,
+        MaxNumberOfMessages=max_messages,
+        WaitTimeSeconds=wait_seconds,
+        VisibilityTimeout=visibility_timeout,
+    )
+    messages = response.get("Messages", [])
+    for message in messages:
+        message["QueueUrl"] = queue_url
+        try:
+            message["Scheduling"] = scheduling_info(message["Body"])
+        except (ValueError, TypeError, AttributeError) as e:
+            # Still processed (and failed) by the job code, just unranked
+            logger.warning(f"Unreadable job message {message['MessageId']}: {e}")
+            message["Scheduling"] = scheduling_info("{}")
+    return messages
+
+
+class JobScheduler:
+    """
+    Picks which waiting job a free worker slot runs next
+
+    Interactive jobs go before batch jobs. Within a lane, projects with fewer
+    running jobs go first (fair share), then the shortest estimated job, so
+    small jobs keep low latency while workers are saturated by bulk
+    submissions. Waiting lowers a job's effective estimate by
+    SCHEDULER_AGING_RATE seconds per second, so long jobs are not starved.
+    Jobs of projects at their concurrency cap are not picked.
+    """
+
+    def __init__(self, aging_rate=None, default_estimate=None):
+        self.aging_rate = (
+            aging_rate
+            if aging_rate is not None
+            else float(os.getenv("SCHEDULER_AGING_RATE", "0.1"))
+        )
+        self.default_estimate = (
+            default_estimate
+            if default_estimate is not None
+            else float(os.getenv("SCHEDULER_DEFAULT_ESTIMATE_SECONDS", "300"))
+        )
+
+    def pick(self, waiting, running, now=None):
+        """
+        The message from waiting to run next, or None if all are capped
+
+        waiting holds received messages and running the "Scheduling" info of
+        jobs already running on this worker.
+        """
+        now = now if now is not None else time.time()
+        running_per_project = Counter(info["projectId"] for info in running)
+        best, best_rank = None, None
+        for message in waiting:
+            info = message["Scheduling"]
+            project_id = info["projectId"]
+            cap = get_project_cap(project_id)
+            if cap and running_per_project[project_id] >= cap:
+                continue
+            rank = self.rank(info, running_per_project[project_id], now)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = message, rank
+        return best
+
+    def rank(self, info, project_running, now):
+        """Sort key of a waiting job; lower runs first"""
+        lane = LANES.index(info["lane"]) if info["lane"] in LANES else len(LANES)
+        estimate = info["estimatedSeconds"]
+        if estimate is None:
+            estimate = self.default_estimate
+        submitted_at = info["submittedAt"]
+        waited = max(now - submitted_at, 0) if submitted_at is not None else 0
+        return (lane, project_running, estimate - self.aging_rate * waited)
+
+
+class ProjectSlots:
+    """
+    Running jobs per project in DynamoDB, enforcing project caps across workers
+
+    Each project's item maps its running job IDs to an expiry that the job's
+    lease heartbeat renews, so slots of crashed workers free themselves.
+    Writes are conditional on a version number. Caps are not enforced across
+    workers when DYNAMODB_PROJECT_SLOTS_TABLE is unset.
+    """
+
+    def __init__(self):
+        self.table_name = os.environ.get("DYNAMODB_PROJECT_SLOTS_TABLE")
+        self.table = (
+            boto3.resource("dynamodb").Table(self.table_name)
+            if self.table_name
+            else None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.table is not None
+
+    def acquire(self, project_id, job_id, seconds=None) -> bool:
+        """Take a slot for a job; False when the project is at its cap"""
+        cap = get_project_cap(project_id)
+        if not self.enabled or not cap:
+            return True
+        for _ in range(SLOT_ATTEMPTS):
+            now = int(time.time())
+            item = self.table.get_item(
+                Key={"projectId": project_id}, ConsistentRead=True
+            ).get("Item")
+            slots = {
+                running_job: int(expires)
+                for running_job, expires in (item or {}).get("slots", {}).items()
+                if int(expires) >= now
+            }
+            if job_id not in slots and len(slots) >= cap:
+                return False
+            slots[job_id] = now + (seconds or get_lease_seconds())
+            version = int(item["version"]) if item else 0
+            condition = {"ConditionExpression": "attribute_not_exists(projectId)"}
+            if item:
+                condition = {
+                    "ConditionExpression": "#version = :version",
+                    "ExpressionAttributeNames": {"#version": "version"},
+                    "ExpressionAttributeValues": {":version": version},
+                }
+            try:
+                self.table.put_item(
+                    Item={
+                        "projectId": project_id,
+                        "slots": slots,
+                        "version": version + 1,
+                        "ttl": now + SLOT_RECORD_TTL_SECONDS,
+                    },
+                    **condition,
+                )
+                return True
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+        logger.info(f"Slot records of project {project_id} are contended")
+        return False
+
+    def renew(self, project_id, job_id, seconds=None) -> None:
+        """Extend a job's slot; no-op if it already expired and was taken"""
+        self._update_slot(
+            project_id,
+            job_id,
+            "SET #slots.#job = :expires, #version = #version + :one, #ttl = :ttl",
+            {
+                ":expires": int(time.time()) + (seconds or get_lease_seconds()),
+                ":ttl": int(time.time()) + SLOT_RECORD_TTL_SECONDS,
+            },
+        )
+
+    def release(self, project_id, job_id) -> None:
+        """Free a job's slot for the project's next job"""
+        self._update_slot(
+            project_id, job_id, "REMOVE #slots.#job SET #version = #version + :one"
+        )
+
+    def _update_slot(self, project_id, job_id, expression, values=None):
+        if not self.enabled or not get_project_cap(project_id):
+            return
+        names = {"#slots": "slots", "#job": job_id, "#version": "version"}
+        if "#ttl" in expression:
+            names["#ttl"] = "ttl"
+        try:
+            self.table.update_item(
+                Key={"projectId": project_id},
+                UpdateExpression=expression,
+                ConditionExpression="attribute_exists(#slots.#job)",
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues={":one": 1, **(values or {})},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+
+def get_project_slots():
+    """ProjectSlots, or the SQLite-backed one when LOCAL_RUNTIME_DB is set"""
+    if os.environ.get("LOCAL_RUNTIME_DB"):
+        # Imported lazily: local_store builds on this module
+        from local_store import LocalProjectSlots
+
+        return LocalProjectSlots(os.environ["LOCAL_RUNTIME_DB"])
+    return ProjectSlots()
@@ -0,0 +1,505 @@
+import os
+import re
+import time
+import shutil
+import hashlib
+import logging
+import threading
+import boto3
+import requests
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from botocore.exceptions import ClientError
+from botocore.config import Config
+from rate_limiter import get_limiter
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+S3_URI_PATTERN = re.compile(r"^s3://([^/]+)/(.+)$")
+
+
+def get_aws_region():
+    """Region of the app's bucket and regional clients (APP_AWS_REGION)"""
+    return os.getenv("APP_AWS_REGION", "us-east-2")
+
+
+def parse_s3_uri(s3_uri):
+    """Parse S3 URI into bucket and key"""
+    match = S3_URI_PATTERN.match(s3_uri)
+    if not match:
+        raise ValueError(f"Invalid S3 URI format: {s3_uri}")
+    return match.group(1), match.group(2)
+
+
+class TransferStats:
+    """Latency and throughput of storage operations, per backend"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    @contextmanager
+    def measure(self, backend, operation):
+        """Time one operation; set record["bytes"] to count transferred bytes"""
+        record = {"bytes": 0}
+        started = time.monotonic()
+        failed = True
+        try:
+            yield record
+            failed = False
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                stats = self._stats.setdefault(backend, {}).setdefault(
+                    operation,
+                    {"count": 0, "errors": 0, "bytes": 0, "seconds": 0.0},
+                )
+                stats["count"] += 1
+                stats["errors"] += failed
+                stats["bytes"] += record["bytes"]
+                stats["seconds"] += elapsed
+
+    def snapshot(self):
+        """Per backend and operation totals with mean latency and MB/s"""
+        with self._lock:
+            snapshot = {}
+            for backend, operations in self._stats.items():
+                snapshot[backend] = {}
+                for operation, stats in operations.items():
+                    seconds = stats["seconds"]
+                    snapshot[backend][operation] = {
+                        **stats,
+                        "seconds": round(seconds, 3),
+                        "meanLatencyMs": round(seconds / stats["count"] * 1000, 1),
+                        "throughputMBps": (
+                            round(stats["bytes"] / seconds / 1e6, 1)
+                            if stats["bytes"] and seconds
+                            else None
+                        ),
+                    }
+            return snapshot
+
+
+class S3Backend:
+    """Amazon S3 (or an S3-compatible endpoint via S3_ENDPOINT_URL)"""
+
+    name = "s3"
+
+    def __init__(self):
+        self.client = boto3.client(
+            "s3",
+            region_name=get_aws_region(),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            config=Config(
+                retries={"max_attempts": 3, "mode": "adaptive"},
+                max_pool_connections=50,
+                signature_version="s3v4",
+                s3={"addressing_style": "virtual"},
+            ),
+        )
+        # Worker-wide S3 concurrency, adapting to SlowDown responses
+        self.limiter = get_limiter("s3")
+        self.retry_attempts = 3
+        self.backoff_base = 2
+
+    def head(self, uri):
+        bucket, key = parse_s3_uri(uri)
+        try:
+            response = self.limiter.call(
+                self.client.head_object, Bucket=bucket, Key=key
+            )
+        except ClientError as e:
+            # HEAD responses have no body, so the code is the bare status
+            error_code = e.response["Error"]["Code"]
+            if error_code in ["NoSuchBucket", "NoSuchKey", "404"]:
+                raise FileNotFoundError(f"S3 object not found: {uri}") from e
+            if error_code in ["AccessDenied", "403"]:
+                raise PermissionError(f"Access denied to S3 object: {uri}") from e
+            raise
+        return {
+            "size": response["ContentLength"],
+            "etag": response["ETag"].strip('"'),
+            "ranges": True,
+        }
+
+    def get(self, uri, local_path):
+        """Download file from S3 with retry logic"""
+        bucket, key = parse_s3_uri(uri)
+        for attempt in range(self.retry_attempts):
+            try:
+                logger.info(
+                    f"Downloading s3://{bucket}/{key} to {local_path} (attempt {attempt + 1})"
+                )
+                self.limiter.call(self.client.download_file, bucket, key, local_path)
+                logger.info(f"Successfully downloaded {uri}")
+                return local_path
+            except ClientError as e:
+                error_code = e.response["Error"]["Code"]
+                logger.error(
+                    f"S3 download failed - Bucket: '{bucket}', Key: '{key}', Error: {error_code}"
+                )
+                if error_code in ["NoSuchBucket", "NoSuchKey", "404"]:
+                    raise FileNotFoundError(f"S3 object not found: s3://{bucket}/{key}")
+                elif error_code in ["AccessDenied", "403"]:
+                    raise PermissionError(
+                        f"Access denied to S3 object: s3://{bucket}/{key}"
+                    )
+                else:
+                    logger.warning(f"S3 download attempt {attempt + 1} failed: {e}")
+                    if attempt == self.retry_attempts - 1:  # Last attempt
+                        raise
+                    time.sleep(self.backoff_base**attempt)  # Exponential backoff
+
+    def put(self, local_path, uri):
+        bucket, key = parse_s3_uri(uri)
+        try:
+            logger.info(f"Uploading {local_path} to {uri}")
+            self.limiter.call(self.client.upload_file, local_path, bucket, key)
+            logger.info(f"Successfully uploaded to {uri}")
+            return uri
+        except ClientError as e:
+            logger.error(f"Failed to upload to S3: {e}")
+            raise
+
+    def read_range(self, uri, start, end):
+        """Bytes start..end (inclusive) of an object"""
+        bucket, key = parse_s3_uri(uri)
+        response = self.limiter.call(
+            self.client.get_object, Bucket=bucket, Key=key, Range=f"bytes={start}-{end}"
+        )
+        return response["Body"].read()
+
+    def presign(self, uri, expiration_seconds):
+        bucket, key = parse_s3_uri(uri)
+        try:
+            return self.client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": bucket, "Key": key},
+                ExpiresIn=expiration_seconds,
+            )
+        except ClientError as e:
+            logger.error(f"Failed to generate presigned URL: {e}")
+            raise
+
+    def copy(self, source_uri, destination_uri):
+        """Server-side copy between S3 locations"""
+        src_bucket, src_key = parse_s3_uri(source_uri)
+        bucket, key = parse_s3_uri(destination_uri)
+        logger.info(f"Copying {source_uri} to {destination_uri}")
+        self.limiter.call(
+            self.client.copy, {"Bucket": src_bucket, "Key": src_key}, bucket, key
+        )
+
+
+class HTTPBackend:
+    """
+    HTTP/HTTPS sources over one pooled session
+
+    Large files on servers that accept byte ranges are fetched as parallel
+    ranges into a preallocated file. Progress is kept per range (or per
+    stream) so a retry resumes where the failed attempt stopped.
+    """
+
+    name = "http"
+
+    def __init__(self):
+        self.retry_attempts = 3
+        self.timeout = 30
+        self.backoff_base = 2
+
+        # HTTP error categorization
+        self.permanent_http_errors = {400, 401, 403, 404, 405, 410, 422}
+
+        # Ranged HTTP download settings
+        self.http_concurrency = int(os.getenv("HTTP_DOWNLOAD_CONCURRENCY", "8"))
+        self.range_part_size = int(os.getenv("HTTP_RANGE_PART_SIZE", str(8 << 20)))
+        self.range_threshold = int(os.getenv("HTTP_RANGE_THRESHOLD", str(16 << 20)))
+        self.chunk_size = 256 * 1024
+
+        # One pooled session for all HTTP traffic of this processor
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.http_concurrency,
+            pool_maxsize=self.http_concurrency,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def head(self, url):
+        """
+        HEAD the URL for size, range support and validator; never raises
+
+        "status" is the HTTP status, or None when the server was unreachable.
+        """
+        probe = {
+            "size": None,
+            "ranges": False,
+            "etag": None,
+            "lastModified": None,
+            "status": None,
+        }
+        try:
+            response = self.session.head(
+                url, allow_redirects=True, timeout=self.timeout
+            )
+            probe["status"] = response.status_code
+            if response.status_code < 400:
+                length = response.headers.get("Content-Length")
+                probe["size"] = int(length) if length and length.isdigit() else None
+                probe["ranges"] = (
+                    response.headers.get("Accept-Ranges", "").lower() == "bytes"
+                )
+                probe["etag"] = response.headers.get("ETag")
+                probe["lastModified"] = response.headers.get("Last-Modified")
+        except requests.exceptions.RequestException as e:
+            logger.debug(f"HEAD probe failed for {url}: {e}")
+        return probe
+
+    def get(self, url, local_path):
+        """Download file from HTTP/HTTPS URL with retry logic"""
+        if os.path.exists(local_path):
+            os.remove(local_path)
+
+        probe = self.head(url)
+        parts = None
+        if probe["ranges"] and (probe["size"] or 0) >= self.range_threshold:
+            parts = self._plan_ranges(probe["size"])
+
+        for attempt in range(self.retry_attempts):
+            try:
+                logger.info(f"Downloading {url} (attempt {attempt + 1})")
+                if parts:
+                    self._fetch_ranges(url, local_path, parts, probe)
+                else:
+                    self._fetch_stream(url, local_path, probe["ranges"])
+
+                logger.info(f"Successfully downloaded {url}")
+                return local_path
+            except requests.exceptions.HTTPError as e:
+                if any(str(code) in str(e) for code in self.permanent_http_errors):
+                    raise
+                logger.warning(
+                    f"URL download attempt {attempt + 1} failed with HTTP error: {e}"
+                )
+                last_error = e
+            except (
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.SSLError,
+            ) as e:
+                logger.warning(f"URL download attempt {attempt + 1} network error: {e}")
+                last_error = e
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"URL download attempt {attempt + 1} failed: {e}")
+                last_error = e
+
+            if attempt == self.retry_attempts - 1:
+                raise last_error
+            time.sleep(self.backoff_base**attempt)
+
+    def put(self, local_path, url):
+        """Streamed PUT, e.g. to a presigned upload URL"""
+        with open(local_path, "rb") as f:
+            response = self.session.put(url, data=f, timeout=self.timeout)
+        self._check_response(response, url)
+        return url
+
+    def read_range(self, url, start, end):
+        """
+        Bytes start..end (inclusive), streamed so that a server ignoring the
+        Range header costs at most end + 1 bytes, never the whole body
+        """
+        with self.session.get(
+            url,
+            timeout=self.timeout,
+            headers={"Range": f"bytes={start}-{end}"},
+            stream=True,
+        ) as response:
+            self._check_response(response, url)
+            # Server ignored the range: skip to start in the full body
+            skip = 0 if response.status_code == 206 else start
+            wanted = end - start + 1
+            data = bytearray()
+            for chunk in response.iter_content(self.chunk_size):
+                if skip:
+                    dropped = min(skip, len(chunk))
+                    chunk = chunk[dropped:]
+                    skip -= dropped
+                data += chunk
+                if len(data) >= wanted:
+                    break
+        return bytes(data[:wanted])
+
+    def presign(self, url, expiration_seconds):
+        return url
+
+    def filename(self, url):
+        return (
+            os.path.basename(urlparse(url).path)
+            or f"url_download_{id(url) % 10000}.tmp"
+        )
+
+    def _plan_ranges(self, size):
+        """Split a file into byte ranges; 'done' tracks bytes already written"""
+        return [
+            {
+                "start": start,
+                "end": min(start + self.range_part_size, size) - 1,
+                "done": 0,
+            }
+            for start in range(0, size, self.range_part_size)
+        ]
+
+    def _check_response(self, response, url):
+        if response.status_code in self.permanent_http_errors:
+            raise requests.exceptions.HTTPError(
+                f"HTTP {response.status_code} error downloading {url}"
+            )
+        response.raise_for_status()
+
+    def _fetch_stream(self, url, local_path, can_resume):
+        """Single streamed GET, resuming a partial file when ranges are supported"""
+        offset = (
+            os.path.getsize(local_path)
+            if can_resume and os.path.exists(local_path)
+            else 0
+        )
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        response = self.session.get(
+            url, stream=True, timeout=self.timeout, headers=headers
+        )
+        self._check_response(response, url)
+        if offset and response.status_code != 206:
+            offset = 0  # Server ignored the range, start over
+
+        with open(local_path, "ab" if offset else "wb") as f:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                f.write(chunk)
+
+    def _fetch_ranges(self, url, local_path, parts, probe):
+        """Fetch all unfinished ranges in parallel into a preallocated file"""
+        if not os.path.exists(local_path):
+            with open(local_path, "wb") as f:
+                f.truncate(probe["size"])
+
+        pending = [p for p in parts if p["start"] + p["done"] <= p["end"]]
+        workers = min(self.http_concurrency, len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self._fetch_range, url, local_path, part, probe["etag"])
+                for part in pending
+            ]
+            for future in futures:
+                future.result()
+
+    def _fetch_range(self, url, local_path, part, etag):
+        start = part["start"] + part["done"]
+        headers = {"Range": f"bytes={start}-{part['end']}"}
+        if etag:
+            headers["If-Range"] = etag
+
+        response = self.session.get(
+            url, stream=True, timeout=self.timeout, headers=headers
+        )
+        self._check_response(response, url)
+        if response.status_code != 206:
+            raise requests.exceptions.RequestException(
+                f"Server did not honor range request for {url} "
+                f"(HTTP {response.status_code}), remote file may have changed"
+            )
+
+        with open(local_path, "r+b") as f:
+            f.seek(start)
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                f.write(chunk)
+                part["done"] += len(chunk)
+
+
+class LocalBackend:
+    """Local filesystem paths"""
+
+    name = "local"
+
+    def path(self, uri):
+        return uri
+
+    def head(self, uri):
+        path = self.path(uri)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Local file not found: {uri}")
+        stat = os.stat(path)
+        return {
+            "size": stat.st_size,
+            "etag": f"{stat.st_size}-{stat.st_mtime_ns}",
+            "ranges": True,
+        }
+
+    def get(self, uri, local_path):
+        """Copy local file to the destination path"""
+        source_path = self.path(uri)
+        if not os.path.exists(source_path):
+            raise FileNotFoundError(f"Local file not found: {uri}")
+        try:
+            shutil.copy2(source_path, local_path)
+            logger.info(f"Copied local file {source_path} to {local_path}")
+            return local_path
+        except Exception as e:
+            logger.error(f"Failed to copy local file: {e}")
+            raise
+
+    def put(self, local_path, uri):
+        """Save result to local destination"""
+        final_path = self.path(uri)
+        # Ensure destination directory exists
+        os.makedirs(os.path.dirname(final_path) or ".", exist_ok=True)
+        try:
+            logger.info(f"Copying {local_path} to {final_path}")
+            shutil.copy2(local_path, final_path)
+            logger.info(f"Successfully saved to {final_path}")
+            return uri
+        except Exception as e:
+            logger.error(f"Failed to save to local destination: {e}")
+            raise
+
+    def read_range(self, uri, start, end):
+        with open(self.path(uri), "rb") as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def presign(self, uri, expiration_seconds):
+        """Local files are read in place"""
+        path = self.path(uri)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Local file not found: {uri}")
+        return path
+
+    def copy(self, source_uri, destination_uri):
+        self.put(self.path(source_uri), destination_uri)
+
+
+class LocalS3Backend(LocalBackend):
+    """
+    S3 stand-in backed by a directory, for tests and benchmarks without AWS
+
+    s3://bucket/key lives at <S3_LOCAL_ROOT>/bucket/key. ETags are content
+    MD5s like single-part S3 uploads, and "presigned" URLs are file paths.
+    """
+
+    name = "s3-local"
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, uri):
+        bucket, key = parse_s3_uri(uri)
+        return os.path.join(self.root, bucket, key)
+
+    def head(self, uri):
+        info = super().head(uri)
+        with open(self.path(uri), "rb") as f:
+            info["etag"] = hashlib.file_digest(f, "md5").hexdigest()
+        return info
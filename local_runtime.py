@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import importlib.util
+import multiprocessing
+from dotenv import load_dotenv
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SHARED_DIR = os.path.join(ROOT_DIR, "layers", "shared")
+VIDEO_PROCESSOR_DIR = os.path.join(ROOT_DIR, "src", "video_processor")
+sys.path.append(SHARED_DIR)
+from local_store import LocalJobManager, LocalQueueClient  # noqa: E402
+from scheduler import receive_by_priority  # noqa: E402
+
+DEFAULT_QUEUE_URL = "local-jobs"
+DEFAULT_INTERACTIVE_QUEUE_URL = "local-interactive-jobs"
+
+
+def load_handler(name):
+    """Import a service's app.py under a unique module name"""
+    path = os.path.join(ROOT_DIR, "src", name, "app.py")
+    spec = importlib.util.spec_from_file_location(f"{name}_app", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.lambda_handler
+
+
+def run_worker(queue_urls, visibility_timeout, stop_event, ready):
+    """
+    Worker process: pull one message at a time into the real Lambda handler
+
+    Mirrors the SQS event source mappings with a batch size of 1: a message is
+    deleted once the handler accepts it, and messages reported back in
+    batchItemFailures become visible again after a jittered delay. The
+    interactive lane is polled before the batch lane.
+    """
+    sys.path.insert(0, VIDEO_PROCESSOR_DIR)
+    import app
+
+    ready.put(os.getpid())
+    queue = LocalQueueClient()
+    while not stop_event.is_set():
+        messages = receive_by_priority(
+            queue, queue_urls, 1, visibility_timeout, wait_seconds=1
+        )
+        for message in messages:
+            # No receiptHandle: redelivery delays are applied here, not via SQS
+            record = {"messageId": message["MessageId"], "body": message["Body"]}
+            try:
+                result = app.lambda_handler({"Records": [record]}, None)
+                failed = bool(result["batchItemFailures"])
+            except Exception as e:
+                print(f"❌ Worker {os.getpid()} handler error: {e}")
+                failed = True
+
+            if failed:
+                queue.change_message_visibility(
+                    QueueUrl=message["QueueUrl"],
+                    ReceiptHandle=message["ReceiptHandle"],
+                    VisibilityTimeout=app.get_retry_delay(),
+                )
+            else:
+                queue.delete_message(
+                    QueueUrl=message["QueueUrl"], ReceiptHandle=message["ReceiptHandle"]
+                )
+
+
+class LocalRuntime:
+    """
+    submit_job, get_status and the video processor wired together locally
+
+    Jobs and the queue live in one SQLite file (LOCAL_RUNTIME_DB), so the
+    handlers run unchanged and a pool of worker processes consumes the queue
+    the way concurrent Lambda invocations would.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        workers=2,
+        queue_url=None,
+        visibility_timeout=900,
+        interactive_queue_url=None,
+    ):
+        self.db_path = os.path.abspath(db_path)
+        self.workers = workers
+        self.queue_url = queue_url or DEFAULT_QUEUE_URL
+        self.interactive_queue_url = (
+            interactive_queue_url or DEFAULT_INTERACTIVE_QUEUE_URL
+        )
+        self.queue_urls = [self.interactive_queue_url, self.queue_url]
+        self.visibility_timeout = visibility_timeout
+
+        os.environ["LOCAL_RUNTIME_DB"] = self.db_path
+        os.environ["SQS_JOB_QUEUE_URL"] = self.queue_url
+        os.environ["SQS_INTERACTIVE_JOB_QUEUE_URL"] = self.interactive_queue_url
+        self.job_manager = LocalJobManager(self.db_path)
+        self.queue = LocalQueueClient(self.db_path)
+        self.submit_handler = load_handler("submit_job")
+        self.status_handler = load_handler("get_status")
+
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._ready = self._context.Queue()
+        self._processes = []
+
+    def start(self, timeout=120):
+        """Start the worker pool and wait until every worker can take jobs"""
+        for _ in range(self.workers):
+            process = self._context.Process(
+                target=run_worker,
+                args=(
+                    self.queue_urls,
+                    self.visibility_timeout,
+                    self._stop_event,
+                    self._ready,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        # Cold-start imports would otherwise count as queue wait
+        for _ in self._processes:
+            self._ready.get(timeout=timeout)
+        return self
+
+    def stop(self, timeout=30):
+        """Let workers finish their current job, then stop them"""
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def submit(self, job_spec):
+        """POST /submit; returns (statusCode, body)"""
+        response = self.submit_handler({"body": json.dumps(job_spec)}, None)
+        return response["statusCode"], json.loads(response["body"])
+
+    def status(self, job_id):
+        """GET /status/{jobId}; returns (statusCode, body)"""
+        response = self.status_handler({"pathParameters": {"jobId": job_id}}, None)
+        return response["statusCode"], json.loads(response["body"])
+
+    def wait(self, job_ids, timeout):
+        """Poll until every job is completed or failed; returns the records"""
+        deadline = time.time() + timeout
+        pending = set(job_ids)
+        records = {}
+        while pending and time.time() < deadline:
+            for job_id in list(pending):
+                status_code, record = self.status(job_id)
+                if status_code == 200 and record["status"] in ("completed", "failed"):
+                    records[job_id] = record
+                    pending.discard(job_id)
+            if pending:
+                time.sleep(0.5)
+        return records
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile, or None for no values"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(runtime, job_ids, records):
+    """Queue wait, processing time and throughput for a finished load run"""
+    timings = {
+        json.loads(row["body"])["jobId"]: row
+        for queue_url in runtime.queue_urls
+        for row in runtime.queue.message_timings(queue_url)
+    }
+    rows = [timings[job_id] for job_id in job_ids if job_id in timings]
+    finished = [row for row in rows if row["deleted_at"]]
+    queue_waits = [
+        row["first_received_at"] - row["sent_at"]
+        for row in rows
+        if row["first_received_at"]
+    ]
+    latencies = [row["deleted_at"] - row["sent_at"] for row in finished]
+    processing = [
+        record["processingTime"]
+        for record in records.values()
+        if record.get("processingTime") is not None
+    ]
+    completed = [r for r in records.values() if r["status"] == "completed"]
+
+    elapsed = None
+    if finished:
+        elapsed = max(row["deleted_at"] for row in finished) - min(
+            row["sent_at"] for row in rows
+        )
+
+    def stats(values):
+        return {
+            "p50": _round(percentile(values, 50)),
+            "p95": _round(percentile(values, 95)),
+            "max": _round(max(values) if values else None),
+        }
+
+    return {
+        "submitted": len(job_ids),
+        "completed": len(completed),
+        "failed": sum(1 for r in records.values() if r["status"] == "failed"),
+        "unfinished": len(job_ids) - len(records),
+        "redeliveries": sum(max(row["receive_count"] - 1, 0) for row in rows),
+        "queueWaitSeconds": stats(queue_waits),
+        "processingSeconds": stats(processing),
+        "endToEndSeconds": stats(latencies),
+        "jobsPerMinute": round(len(completed) / elapsed * 60, 2) if elapsed else None,
+    }
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+def unique_output(job_spec, n):
+    """Give each generated job its own output file"""
+    spec = json.loads(json.dumps(job_spec))
+    stem, ext = os.path.splitext(spec["output"]["filename"])
+    spec["output"]["filename"] = f"{stem}_{n:04d}{ext or '.mp4'}"
+    return spec
+
+
+def run_load(runtime, job_spec, jobs, rate, timeout):
+    """Submit jobs at a steady rate (jobs per second) and wait for them"""
+    job_ids = []
+    started = time.time()
+    for n in range(jobs):
+        # Schedule against the start time so slow submits do not drift
+        delay = started + n / rate - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        status_code, body = runtime.submit(unique_output(job_spec, n))
+        if status_code != 200:
+            print(f"❌ Submit {n} rejected ({status_code}): {body.get('error')}")
+            continue
+        job_ids.append(body["jobId"])
+    print(f"📤 Submitted {len(job_ids)} jobs in {time.time() - started:.1f}s")
+
+    records = runtime.wait(job_ids, timeout)
+    return summarize(runtime, job_ids, records)
+
+
+def print_report(report):
+    print("\n📊 Load test results")
+    print(
+        f"   Jobs: {report['submitted']} submitted, {report['completed']} completed, "
+        f"{report['failed']} failed, {report['unfinished']} unfinished, "
+        f"{report['redeliveries']} redeliveries"
+    )
+    for label, key in (
+        ("Queue wait", "queueWaitSeconds"),
+        ("Processing", "processingSeconds"),
+        ("End to end", "endToEndSeconds"),
+    ):
+        values = report[key]
+        print(
+            f"   {label:<11} p50 {values['p50']}s  p95 {values['p95']}s  "
+            f"max {values['max']}s"
+        )
+    print(f"   Throughput: {report['jobsPerMinute']} jobs/minute")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run submit → queue → worker pool → status locally under load"
+    )
+    parser.add_argument("spec", help="Job specification file to submit")
+    parser.add_argument("--jobs", type=int, default=10, help="Jobs to submit")
+    parser.add_argument(
+        "--rate", type=float, default=1.0, help="Submission rate in jobs per second"
+    )
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes")
+    parser.add_argument(
+        "--db",
+        default="tmp/local_runtime.db",
+        help="SQLite file for jobs and the queue (recreated each run)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=1800, help="Seconds to wait for jobs"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    load_dotenv()
+    with open(args.spec) as f:
+        job_spec = json.load(f)
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.db + suffix):
+            os.remove(args.db + suffix)
+
+    runtime = LocalRuntime(args.db, workers=args.workers).start()
+    print(
+        f"🎬 {args.jobs} jobs at {args.rate}/s on {args.workers} workers "
+        f"({args.spec})"
+    )
+    try:
+        report = run_load(runtime, job_spec, args.jobs, args.rate, args.timeout)
+    finally:
+        runtime.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    sys.exit(0 if report["completed"] == report["submitted"] else 1)
+
+
+if __name__ == "__main__":
+    main()
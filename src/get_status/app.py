@@ -1,7 +1,7 @@
 import json
 from datetime import datetime, timezone
 from typing import Dict, Any
-from job_manager import JobManager
+from job_manager import get_job_manager
 
 
 def lambda_handler(event, context):
@@ -14,7 +14,7 @@ def lambda_handler(event, context):
         job_id = event["pathParameters"]["jobId"]
 
         # Get job status from DynamoDB
-        job_manager = JobManager()
+        job_manager = get_job_manager()
         job_data = job_manager.get_job(job_id)
 
         if not job_data:
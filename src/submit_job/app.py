@@ -1,12 +1,21 @@
 import json
 import uuid
-import boto3
 import os
+import logging
 from datetime import datetime, timezone
 from typing import Dict, Any
 
-from job_validator import validate_job_spec
-from job_manager import JobManager
+from job_validator import validate_job_spec_json, normalize_job_spec
+from job_spec_models import JOB_SPEC_SCHEMA_VERSION
+from job_manager import get_job_manager
+from local_store import get_queue_client
+from asset_manager import AssetManager
+from cost_model import estimate_job, exceeded_limits, get_limits
+from scheduler import get_lane, get_lane_queue_urls
+from asset_preflight import is_preflight_enabled, get_asset_sources, preflight_assets
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 
 
 def lambda_handler(event, context):
@@ -17,36 +26,82 @@ def lambda_handler(event, context):
         if not event.get("body"):
             return create_error_response(400, "Missing request body")
 
+        # Parse and validate job specification in a single pass
         try:
-            body = json.loads(event["body"])
-        except json.JSONDecodeError:
-            return create_error_response(400, "Invalid JSON in request body")
-
-        # Validate job specification
-        try:
-            job_spec = validate_job_spec(body)
+            job_spec = validate_job_spec_json(event["body"])
         except ValueError as e:
             return create_error_response(400, str(e))
 
+        # Normalize once so the worker can skip revalidation
+        normalized_spec, spec_hash = normalize_job_spec(job_spec)
+
         # Generate job ID and extract job info
         job_id = str(uuid.uuid4())
-        job_info = body.get("jobInfo")
+        job_info = (
+            job_spec.jobInfo.model_dump(exclude_none=True) if job_spec.jobInfo else None
+        )
+
+        asset_manager = AssetManager()
+
+        # Optionally check every asset exists and is readable before queueing
+        asset_info = None
+        if is_preflight_enabled():
+            asset_info, asset_errors = preflight_assets(
+                asset_manager, get_asset_sources(job_spec)
+            )
+            if asset_errors:
+                return create_error_response(
+                    400, f"Asset preflight failed: {'; '.join(asset_errors)}"
+                )
+
+        # Estimate cost from the input video's header and enforce hard limits
+        estimate = estimate_job(job_spec, asset_manager, asset_info)
+        if estimate:
+            hard_limits = get_limits("hard")
+            exceeded = exceeded_limits(estimate, hard_limits)
+            if exceeded:
+                details = ", ".join(
+                    f"{key} {estimate[key]} > {hard_limits[key]:g}" for key in exceeded
+                )
+                return create_error_response(
+                    400, f"Job exceeds processing limits: {details}"
+                )
 
         # Initialize job manager
-        job_manager = JobManager()
+        job_manager = get_job_manager()
+
+        # Interactive and batch jobs queue in separate priority lanes; jobs
+        # too big for the Lambda processor go to the large-job workers
+        lane = get_lane(job_spec, estimate)
+        queue_url = get_lane_queue_urls()[lane]
+        if estimate and estimate["queue"] == "large":
+            large_queue_url = os.environ.get("SQS_LARGE_JOB_QUEUE_URL")
+            if large_queue_url:
+                queue_url = large_queue_url
+            else:
+                logger.warning(
+                    f"No large-job queue configured, queueing {job_id} as standard"
+                )
+                estimate["queue"] = "standard"
 
         # Create job record in DynamoDB and get standardized response
-        response_data = job_manager.create_job(job_id, job_info)
+        response_data = job_manager.create_job(job_id, job_info, estimate, asset_info)
 
         # Send job to SQS queue
-        queue_url = os.environ["SQS_JOB_QUEUE_URL"]
         message = {
             "jobId": job_id,
-            "jobSpec": body,
+            "jobSpec": normalized_spec,
+            "schemaVersion": JOB_SPEC_SCHEMA_VERSION,
+            "specHash": spec_hash,
             "submittedAt": datetime.now(timezone.utc).isoformat(),
+            "lane": lane,
+            "projectId": job_spec.jobInfo.projectId if job_spec.jobInfo else None,
+            "estimatedSeconds": estimate["renderSeconds"] if estimate else None,
+            # Sizes and ETags from the preflight, for disk planning and caching
+            "assetInfo": asset_info,
         }
 
-        sqs = boto3.client("sqs")
+        sqs = get_queue_client()
         sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(message))
 
         return {
@@ -1,18 +1,28 @@
-import json
 import logging
 import sys
 import os
+import time
+import uuid
+import random
+import boto3
+from datetime import datetime, timezone, timedelta
 from botocore.exceptions import ClientError
-from video_processor import VideoProcessor
-from webhook_notifier import WebhookNotifier
-from asset_manager import AssetManager
 
 
 # Add layers path for local development and Docker
 layers_path = os.path.join(os.path.dirname(__file__), "..", "..", "layers", "shared")
 sys.path.insert(0, os.path.abspath(layers_path))
-from job_validator import validate_job_spec  # noqa: E402
-from job_manager import JobManager  # noqa: E402
+from video_processor import VideoProcessor, get_output_filename  # noqa: E402
+from asset_manager import AssetManager  # noqa: E402
+from progress_reporter import ProgressReporter  # noqa: E402
+from hls_publisher import HLSPublisher  # noqa: E402
+from job_validator import load_job_spec  # noqa: E402
+from job_spec_models import JobMessage  # noqa: E402
+from job_manager import get_job_manager, LeaseHeartbeat, FINAL_STATUSES  # noqa: E402
+from webhook_notifier import WebhookNotifier  # noqa: E402
+from render_cache import RenderCache, compute_render_hash  # noqa: E402
+from rate_limiter import is_throttle_error  # noqa: E402
+from scheduler import get_project_slots  # noqa: E402
 
 
 # Configure logging for the entire application
@@ -25,12 +35,21 @@ logger = logging.getLogger(__name__)
 logger.setLevel(level)
 
 
+# Results whose message is redelivered later instead of deleted; "busy" means
+# another worker holds the lease (the retry is a no-op once it finishes) or
+# the job's project is at its concurrency cap
+RETRY_STATUSES = ("transient_failure", "busy")
+
+
 class JobProcessor:
     def __init__(self):
-        self.job_manager = JobManager()
-        self.video_processor = VideoProcessor()
+        self.job_manager = get_job_manager()
         self.asset_manager = AssetManager()
+        self.video_processor = VideoProcessor(asset_manager=self.asset_manager)
         self.webhook_notifier = WebhookNotifier()
+        self.render_cache = RenderCache()
+        self.project_slots = get_project_slots()
+        self.worker_id = str(uuid.uuid4())
         self.empty_output = {
             "url": None,
             "urlExpiresAt": None,
@@ -41,62 +60,189 @@ class JobProcessor:
 
 
 def lambda_handler(event, context):
+    """Process job messages, reporting only transient failures back to SQS"""
     transient_failures = []
     permanent_failures = []
     successful_jobs = []
+    batch_item_failures = []
     processor = JobProcessor()
 
-    # Parse SQS message
     for record in event["Records"]:
-        message_body = json.loads(record["body"])
-        job_id = message_body["jobId"]
-        job_spec_dict = message_body["jobSpec"]
+        job_id, result = process_job_message(processor, record["body"])
 
-        result = process_single_job(processor, job_id, job_spec_dict)
-
-        if result["status"] == "success":
+        if result["status"] in ("success", "duplicate"):
             successful_jobs.append(job_id)
-        elif result["status"] == "transient_failure":
+        elif result["status"] in RETRY_STATUSES:
             transient_failures.append(job_id)
+            batch_item_failures.append({"itemIdentifier": record["messageId"]})
+            delay_retry(record)
         else:
             permanent_failures.append(job_id)
 
-    # If any jobs had transient failures, raise exception to trigger SQS retry
-    if transient_failures:
-        raise Exception(f"Transient failures for jobs: {', '.join(transient_failures)}")
+    logger.info(
+        f"Batch done. Successful: {', '.join(successful_jobs) or '-'}. "
+        f"Retrying: {', '.join(transient_failures) or '-'}. "
+        f"Permanent failures: {', '.join(permanent_failures) or '-'}"
+    )
 
-    # Return appropriate status based on results
-    if permanent_failures:
-        return {
-            "statusCode": 400,
-            "body": f"Permanent failures: {', '.join(permanent_failures)}. Successful: {', '.join(successful_jobs)}",
-        }
+    # Only transient failures are redelivered; the rest of the batch is
+    # acknowledged instead of retrying every message together
+    return {"batchItemFailures": batch_item_failures}
+
+
+_sqs_client = None
+
+
+def delay_retry(record):
+    """
+    Push a failed message's redelivery to a random point in the retry window
+
+    Without jitter every throttled job reappears after the same visibility
+    timeout and hits the service together again.
+    """
+    global _sqs_client
+    delay = get_retry_delay()
+    if not delay or "receiptHandle" not in record:
+        return
+    try:
+        # arn:aws:sqs:<region>:<account>:<name>
+        _, _, _, region, account, name = record["eventSourceARN"].split(":")
+        if _sqs_client is None:
+            _sqs_client = boto3.client("sqs", region_name=region)
+        _sqs_client.change_message_visibility(
+            QueueUrl=f"https://sqs.{region}.amazonaws.com/{account}/{name}",
+            ReceiptHandle=record["receiptHandle"],
+            VisibilityTimeout=delay,
+        )
+    except Exception as e:
+        logger.warning(f"Could not delay retry of {record.get('messageId')}: {e}")
+
+
+def get_retry_delay():
+    """Random redelivery delay within JOB_RETRY_JITTER_SECONDS, 0 when disabled"""
+    window = int(os.getenv("JOB_RETRY_JITTER_SECONDS", "300"))
+    return random.randint(window // 10, window) if window else 0
 
-    return {
-        "statusCode": 200,
-        "body": f"All jobs processed successfully: {', '.join(successful_jobs)}",
-    }
 
+def process_job_message(processor, body):
+    """Parse a queued job message and process it; returns (job_id, result)"""
+    message = JobMessage.model_validate_json(body)
+    result = process_single_job(
+        processor,
+        message.jobId,
+        message.jobSpec,
+        spec_hash=message.specHash,
+        schema_version=message.schemaVersion,
+        asset_info=message.assetInfo,
+    )
+    return message.jobId, result
+
+
+def process_single_job(
+    processor,
+    job_id,
+    job_spec_dict,
+    spec_hash=None,
+    schema_version=None,
+    asset_info=None,
+):
+    """
+    Process a single job and return result status
 
-def process_single_job(processor, job_id, job_spec_dict):
-    """Process a single job and return result status"""
+    asset_info holds asset sizes and ETags from the submit-time preflight.
+    """
 
     video_result = None
+    heartbeat = None
+    # Set once the lease is held: final writes then require still holding it
+    lease_owner = None
 
     try:
-        # Validate job spec
-        job_spec = validate_job_spec(job_spec_dict)
+        # Guard against SQS redelivery and concurrent duplicates
+        if not processor.job_manager.acquire_lease(job_id, processor.worker_id):
+            return skip_unleased_job(processor, job_id)
+        heartbeat = LeaseHeartbeat(
+            processor.job_manager, job_id, processor.worker_id
+        ).start()
+        lease_owner = processor.worker_id
+
+        # Load job spec (trusted fast path when submit_job already normalized it)
+        job_spec = load_job_spec(job_spec_dict, spec_hash, schema_version)
+
+        # Fair share: a project runs at most its capped number of jobs at once
+        project_id = job_spec.jobInfo.projectId if job_spec.jobInfo else None
+        if not processor.project_slots.acquire(project_id, job_id):
+            logger.info(f"Project {project_id} is at its cap, deferring job {job_id}")
+            return {"status": "busy"}
+        heartbeat.hold_project_slot(processor.project_slots, project_id)
+
+        # Look up identical previous renders
+        render_hash = get_render_hash(processor, job_spec, asset_info)
+        cached = processor.render_cache.get(render_hash) if render_hash else None
 
         # Update status to processing
-        processor.job_manager.update_status(job_id, "processing")
+        processor.job_manager.update_status(
+            job_id,
+            "processing",
+            renderCache=("hit" if cached else "miss") if render_hash else None,
+            renderHash=render_hash,
+        )
+
+        if cached:
+            result = complete_from_cache(
+                processor, job_id, job_spec, render_hash, cached, lease_owner
+            )
+            if result:
+                return result
+            processor.job_manager.update_status(
+                job_id, "processing", renderCache="stale"
+            )
 
         # Process video job
-        video_result = processor.video_processor.process_video_job(job_id, job_spec)
+        progress = create_progress_reporter(processor, job_id, job_spec)
+        hls_publisher = create_hls_publisher(processor, job_id, job_spec)
+        video_result = processor.video_processor.process_video_job(
+            job_id,
+            job_spec,
+            progress,
+            on_preview=create_preview_handler(processor, job_id, job_spec),
+            hls_publisher=hls_publisher,
+            asset_info=asset_info,
+        )
+
+        # Another worker took the job over while it rendered; its result wins
+        if heartbeat.lost:
+            return abandon_lost_job(job_id)
 
         if video_result["success"]:
             # Upload and get URLs
-            upload_result = upload_file(processor.asset_manager, video_result, job_spec)
+            progress.start_phase("uploading")
+            if hls_publisher:
+                upload_result = finish_hls(processor.asset_manager, hls_publisher)
+            else:
+                upload_result = upload_file(
+                    processor.asset_manager, video_result, job_spec
+                )
+            if upload_result["success"] and video_result.get("renditions"):
+                upload_result = upload_renditions(
+                    processor.asset_manager, video_result, job_spec, upload_result
+                )
             if upload_result["success"]:
+                if render_hash and upload_result["s3Uri"]:
+                    try:
+                        processor.render_cache.put(
+                            render_hash,
+                            job_id,
+                            upload_result["s3Uri"],
+                            video_result["duration"],
+                            video_result["fileSize"],
+                        )
+                    except Exception as e:
+                        logger.warning(f"Failed to record render cache entry: {e}")
+
+                if heartbeat.lost:
+                    return abandon_lost_job(job_id)
+
                 # Update job completion
                 output_data = {
                     "url": upload_result["outputUrl"],
@@ -105,9 +251,17 @@ def process_single_job(processor, job_id, job_spec_dict):
                     "duration": video_result["duration"],
                     "size": video_result["fileSize"],
                 }
-                processor.job_manager.update_job_completion(
-                    job_id, "completed", video_result["processingTime"], output_data
-                )
+                if upload_result.get("renditions"):
+                    output_data["renditions"] = upload_result["renditions"]
+                if not processor.job_manager.update_job_completion(
+                    job_id,
+                    "completed",
+                    video_result["processingTime"],
+                    output_data,
+                    metrics=video_result.get("metrics"),
+                    lease_owner=lease_owner,
+                ):
+                    return abandon_lost_job(job_id)
 
                 # Send success webhook
                 send_webhook(
@@ -126,13 +280,16 @@ def process_single_job(processor, job_id, job_spec_dict):
                 return {"status": "success"}
             else:
                 # Upload failed
-                processor.job_manager.update_job_completion(
+                if not processor.job_manager.update_job_completion(
                     job_id,
                     "failed",
                     video_result["processingTime"],
                     processor.empty_output,
                     upload_result["error"],
-                )
+                    metrics=video_result.get("metrics"),
+                    lease_owner=lease_owner,
+                ):
+                    return abandon_lost_job(job_id)
 
                 # Send failure webhook
                 send_webhook(
@@ -150,13 +307,16 @@ def process_single_job(processor, job_id, job_spec_dict):
                 return {"status": "permanent_failure"}
         else:
             # Processing failed
-            processor.job_manager.update_job_completion(
+            if not processor.job_manager.update_job_completion(
                 job_id,
                 "failed",
                 video_result["processingTime"],
                 processor.empty_output,
                 video_result["error"],
-            )
+                metrics=video_result.get("metrics"),
+                lease_owner=lease_owner,
+            ):
+                return abandon_lost_job(job_id)
 
             # Send failure webhook
             send_webhook(
@@ -175,90 +335,338 @@ def process_single_job(processor, job_id, job_spec_dict):
 
     except ValueError as e:
         # Permanent error (validation failure)
-        processor.job_manager.update_job_completion(
-            job_id, "failed", 0, processor.empty_output, str(e)
-        )
+        if not processor.job_manager.update_job_completion(
+            job_id,
+            "failed",
+            0,
+            processor.empty_output,
+            str(e),
+            lease_owner=lease_owner,
+        ):
+            return abandon_lost_job(job_id)
         logger.error(f"Job {job_id} permanently failed (validation): {str(e)}")
         return {"status": "permanent_failure"}
 
     except Exception as e:
         # Check if error is transient
         if is_transient_error(e):
-            processor.job_manager.update_status(job_id, "retrying", error=str(e))
+            if not processor.job_manager.update_status(
+                job_id, "retrying", lease_owner=lease_owner, error=str(e)
+            ):
+                return abandon_lost_job(job_id)
             logger.warning(f"Job {job_id} failed with transient error: {str(e)}")
             return {"status": "transient_failure"}
         else:
             # Permanent error
-            processor.job_manager.update_job_completion(
-                job_id, "failed", 0, processor.empty_output, str(e)
-            )
+            if not processor.job_manager.update_job_completion(
+                job_id,
+                "failed",
+                0,
+                processor.empty_output,
+                str(e),
+                lease_owner=lease_owner,
+            ):
+                return abandon_lost_job(job_id)
             logger.error(f"Job {job_id} permanently failed: {str(e)}")
             return {"status": "permanent_failure"}
 
     finally:
+        if heartbeat:
+            heartbeat.stop()
+
         # Single cleanCleanup in procesup location
         if video_result and video_result.get("tempDir"):
             processor.video_processor.cleanup_job_dir(video_result["tempDir"])
 
 
+def create_progress_reporter(processor, job_id, job_spec):
+    """Create a progress reporter, emitting phase webhooks if requested"""
+    webhook = job_spec.notifications.webhook if job_spec.notifications else None
+    on_phase_change = None
+    if webhook and webhook.progressEvents:
+        started_at = time.time()
+
+        def on_phase_change(progress):
+            job_info = job_spec.jobInfo.model_dump() if job_spec.jobInfo else None
+            payload = processor.webhook_notifier.create_payload(
+                job_id=job_id,
+                status="processing",
+                processing_time=time.time() - started_at,
+                job_info=job_info,
+            )
+            payload["progress"] = progress
+            processor.webhook_notifier.enqueue_notification(webhook, payload)
+
+    return ProgressReporter(processor.job_manager, job_id, on_phase_change)
+
+
+def create_preview_handler(processor, job_id, job_spec):
+    """Create a callback that publishes the preview before the final render"""
+    if not job_spec.output.preview:
+        return None
+
+    def on_preview(preview_result):
+        upload_result = upload_file(processor.asset_manager, preview_result, job_spec)
+        if not upload_result["success"]:
+            logger.warning(f"Preview upload failed: {upload_result['error']}")
+            return
+
+        preview_data = {
+            "url": upload_result["outputUrl"],
+            "urlExpiresAt": upload_result["urlExpiresAt"],
+            "s3Uri": upload_result["s3Uri"],
+            "duration": preview_result["duration"],
+            "size": preview_result["fileSize"],
+        }
+        processor.job_manager.update_status(job_id, "processing", preview=preview_data)
+
+        webhook = job_spec.notifications.webhook if job_spec.notifications else None
+        if webhook:
+            job_info = job_spec.jobInfo.model_dump() if job_spec.jobInfo else None
+            payload = processor.webhook_notifier.create_payload(
+                job_id=job_id,
+                status="processing",
+                processing_time=preview_result["processingTime"],
+                job_info=job_info,
+            )
+            payload["preview"] = preview_data
+            processor.webhook_notifier.enqueue_notification(webhook, payload)
+        logger.info(f"Job {job_id} preview ready: {upload_result['outputUrl']}")
+
+    return on_preview
+
+
+def create_hls_publisher(processor, job_id, job_spec):
+    """Create an HLS publisher that exposes the playlist once it goes live"""
+    if not job_spec.output.hls:
+        return None
+
+    stem, _ = os.path.splitext(get_output_filename(job_spec.output))
+    destination = f"{resolve_destination(job_spec).rstrip('/')}/{stem}_hls/"
+    started_at = time.time()
+
+    def on_ready(playlist_location):
+        upload_result = build_upload_result(processor.asset_manager, *playlist_location)
+        output_data = dict(
+            processor.empty_output,
+            url=upload_result["outputUrl"],
+            urlExpiresAt=upload_result["urlExpiresAt"],
+            s3Uri=upload_result["s3Uri"],
+        )
+        processor.job_manager.update_status(job_id, "processing", output=output_data)
+
+        webhook = job_spec.notifications.webhook if job_spec.notifications else None
+        if webhook:
+            job_info = job_spec.jobInfo.model_dump() if job_spec.jobInfo else None
+            payload = processor.webhook_notifier.create_payload(
+                job_id=job_id,
+                status="processing",
+                processing_time=time.time() - started_at,
+                job_info=job_info,
+                output_url=upload_result["outputUrl"],
+                url_expires_at=upload_result["urlExpiresAt"],
+                s3_uri=upload_result["s3Uri"],
+            )
+            processor.webhook_notifier.enqueue_notification(webhook, payload)
+
+    return HLSPublisher(processor.asset_manager, destination, on_ready)
+
+
+def finish_hls(asset_manager_processor, hls_publisher):
+    """Build the upload result for an HLS output published during encoding"""
+    if not hls_publisher.playlist_location:
+        return {
+            "success": False,
+            "outputUrl": None,
+            "s3Uri": None,
+            "error": "No HLS segments were produced",
+        }
+    return build_upload_result(
+        asset_manager_processor, *hls_publisher.playlist_location
+    )
+
+
+def skip_unleased_job(processor, job_id):
+    """Classify a job whose lease could not be taken"""
+    job = processor.job_manager.get_job(job_id)
+    if not job:
+        logger.error(f"Job {job_id} has no job record, dropping message")
+        return {"status": "permanent_failure"}
+    if job.get("status") in FINAL_STATUSES:
+        logger.info(f"Job {job_id} already {job['status']}, ignoring redelivery")
+        return {"status": "duplicate"}
+    logger.info(f"Job {job_id} is leased by {job.get('leaseOwner')}, skipping")
+    return {"status": "busy"}
+
+
+def abandon_lost_job(job_id):
+    """Drop a job whose lease another worker took over; it reports the result"""
+    logger.warning(f"Lease on job {job_id} was taken over, abandoning it")
+    return {"status": "duplicate"}
+
+
+def get_render_hash(processor, job_spec, asset_info=None):
+    """Compute the render cache key, or None if caching is off or unsafe"""
+    if not processor.render_cache.enabled:
+        return None
+    # Cache entries hold a single output file, not a ladder or HLS segments
+    if job_spec.output.renditions or job_spec.output.hls:
+        return None
+
+    sources = [job_spec.assets.video.source] + [
+        audio.source for audio in job_spec.assets.audio
+    ]
+    try:
+        fingerprints = {
+            source: processor.asset_manager.get_asset_fingerprint(source, asset_info)
+            for source in sources
+        }
+    except Exception as e:
+        logger.warning(f"Skipping render cache, asset fingerprint failed: {e}")
+        return None
+
+    if any(fingerprint is None for fingerprint in fingerprints.values()):
+        return None
+    return compute_render_hash(job_spec, fingerprints)
+
+
+def complete_from_cache(
+    processor, job_id, job_spec, render_hash, cached, lease_owner=None
+):
+    """Finish a job by reusing a previous render; returns None if it is gone"""
+    start_time = time.time()
+    try:
+        result_path, bucket, key = processor.asset_manager.copy_result(
+            cached["s3Uri"],
+            resolve_destination(job_spec),
+            get_output_filename(job_spec.output),
+        )
+    except (ClientError, FileNotFoundError, PermissionError) as e:
+        # Storage backends raise FileNotFoundError/PermissionError, boto3 ClientError
+        logger.warning(f"Cached render {cached['s3Uri']} unavailable: {e}")
+        processor.render_cache.invalidate(render_hash)
+        return None
+
+    upload_result = build_upload_result(
+        processor.asset_manager, result_path, bucket, key
+    )
+    video_result = {
+        "processingTime": time.time() - start_time,
+        "duration": cached["duration"],
+        "fileSize": cached["size"],
+    }
+    output_data = {
+        "url": upload_result["outputUrl"],
+        "urlExpiresAt": upload_result["urlExpiresAt"],
+        "s3Uri": upload_result["s3Uri"],
+        "duration": cached["duration"],
+        "size": cached["size"],
+    }
+    if not processor.job_manager.update_job_completion(
+        job_id,
+        "completed",
+        video_result["processingTime"],
+        output_data,
+        lease_owner=lease_owner,
+    ):
+        return abandon_lost_job(job_id)
+    send_webhook(
+        job_id,
+        "completed",
+        job_spec,
+        processor.webhook_notifier,
+        video_result,
+        upload_result,
+    )
+    logger.info(
+        f"Job {job_id} served from render cache (source job {cached.get('jobId')})"
+    )
+    return {"status": "success"}
+
+
+def resolve_destination(job_spec):
+    """Return the output destination, defaulting to the managed bucket"""
+    destination = job_spec.output.destination
+    if not destination:
+        bucket_name = os.environ.get("S3_BUCKET_NAME")
+        if bucket_name:
+            destination = f"s3://{bucket_name}/outputs/"
+        else:
+            raise ValueError(
+                "No output destination specified and no default bucket available"
+            )
+    return destination
+
+
+def build_upload_result(asset_manager_processor, result_path, bucket, key):
+    """Build upload result with a presigned URL for S3 outputs"""
+    if bucket and key:
+        s3_uri = f"s3://{bucket}/{key}"
+        try:
+            presigned_url = asset_manager_processor.generate_presigned_url(bucket, key)
+            # Calculate URL expiration
+            expiration_seconds = int(os.getenv("S3_PRESIGNED_URL_EXPIRATION", "86400"))
+            expires_at = datetime.now(timezone.utc) + timedelta(
+                seconds=expiration_seconds
+            )
+            url_expires_at = expires_at.isoformat()
+        except Exception as e:
+            logger.warning(f"Failed to generate presigned URL: {e}")
+            presigned_url = None
+            url_expires_at = None
+    else:
+        presigned_url = result_path
+        s3_uri = None
+        url_expires_at = None
+
+    return {
+        "success": True,
+        "outputUrl": presigned_url,
+        "s3Uri": s3_uri,
+        "urlExpiresAt": url_expires_at,
+        "error": None,
+    }
+
+
 def upload_file(asset_manager_processor, video_result, job_spec):
     """Upload processed video file and return upload video_result"""
     try:
         # Determine destination
-        destination = job_spec.output.destination
-        if not destination:
-            bucket_name = os.environ.get("S3_BUCKET_NAME")
-            if bucket_name:
-                destination = f"s3://{bucket_name}/outputs/"
-            else:
-                raise ValueError(
-                    "No output destination specified and no default bucket available"
-                )
+        destination = resolve_destination(job_spec)
 
         # Upload file
         result_path, bucket, key = asset_manager_processor.upload_result(
             video_result["localOutputPath"], destination, video_result["outputFilename"]
         )
 
-        # Generate presigned URL
-        if bucket and key:
-            s3_uri = f"s3://{bucket}/{key}"
-            try:
-                presigned_url = asset_manager_processor.generate_presigned_url(
-                    bucket, key
-                )
-                # Calculate URL expiration
-                from datetime import datetime, timezone, timedelta
-
-                expiration_seconds = int(
-                    os.getenv("S3_PRESIGNED_URL_EXPIRATION", "86400")
-                )
-                expires_at = datetime.now(timezone.utc) + timedelta(
-                    seconds=expiration_seconds
-                )
-                url_expires_at = expires_at.isoformat()
-            except Exception as e:
-                logger.warning(f"Failed to generate presigned URL: {e}")
-                presigned_url = None
-                url_expires_at = None
-        else:
-            presigned_url = result_path
-            s3_uri = None
-            url_expires_at = None
-
-        return {
-            "success": True,
-            "outputUrl": presigned_url,
-            "s3Uri": s3_uri,
-            "urlExpiresAt": url_expires_at,
-            "error": None,
-        }
+        return build_upload_result(asset_manager_processor, result_path, bucket, key)
 
     except Exception as e:
         logger.error(f"Upload failed: {str(e)}")
         return {"success": False, "outputUrl": None, "s3Uri": None, "error": str(e)}
 
 
+def upload_renditions(asset_manager_processor, video_result, job_spec, upload_result):
+    """Upload the remaining renditions; the first one is the primary output"""
+    renditions = []
+    for index, rendition in enumerate(video_result["renditions"]):
+        result = upload_result
+        if index > 0:
+            result = upload_file(asset_manager_processor, rendition, job_spec)
+        if not result["success"]:
+            return result
+        renditions.append(
+            {
+                "height": rendition["height"],
+                "url": result["outputUrl"],
+                "urlExpiresAt": result["urlExpiresAt"],
+                "s3Uri": result["s3Uri"],
+                "size": rendition["fileSize"],
+            }
+        )
+    return dict(upload_result, renditions=renditions)
+
+
 def send_webhook(
     job_id,
     status,
@@ -268,7 +676,7 @@ def send_webhook(
     upload_result=None,
     error=None,
 ):
-    """Send webhook notification"""
+    """Queue webhook notification for asynchronous delivery"""
     if not (job_spec.notifications and job_spec.notifications.webhook):
         return
 
@@ -287,6 +695,8 @@ def send_webhook(
             duration=video_result["duration"],
             file_size=video_result["fileSize"],
         )
+        if upload_result.get("renditions"):
+            payload["output"]["renditions"] = upload_result["renditions"]
     else:
         payload = webhook_notifier.create_payload(
             job_id=job_id,
@@ -296,13 +706,16 @@ def send_webhook(
             error=error,
         )
 
-    webhook_notifier.send_notification(job_spec.notifications.webhook, payload)
+    webhook_notifier.enqueue_notification(job_spec.notifications.webhook, payload)
 
 
 def is_transient_error(error):
     """Determine if error is transient and should be retried"""
     error_str = str(error).lower()
 
+    if is_throttle_error(error):
+        return True
+
     # AWS service errors that should be retried
     if isinstance(error, ClientError):
         error_code = error.response.get("Error", {}).get("Code", "")
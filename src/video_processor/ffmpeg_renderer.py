@@ -0,0 +1,202 @@
+import os
+import logging
+import subprocess
+from moviepy.config import FFMPEG_BINARY
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Same rate and layout MoviePy decodes and mixes audio at
+SAMPLE_RATE = 44100
+
+
+def plan_background_tracks(paths, durations, loop, crossfade, video_duration):
+    """
+    Lay out playlist tracks the way the MoviePy backend does
+
+    Returns dicts with path, start, duration, fadeIn and fadeOut: each track
+    after the first starts crossfade seconds before the previous one ends and
+    fades in, every track except the last fades out, and the playlist cycles
+    while loop is enabled until it covers the video.
+    """
+    tracks = []
+    current_duration = 0
+    track_index = 0
+
+    while current_duration < video_duration:
+        if track_index >= len(paths):
+            if loop:
+                track_index = 0
+            else:
+                break
+
+        path = paths[track_index]
+        remaining_duration = video_duration - current_duration
+        clip_duration = min(durations[path], remaining_duration + crossfade)
+        is_first = not tracks
+        tracks.append(
+            {
+                "path": path,
+                "start": current_duration - (0 if is_first else crossfade),
+                "duration": clip_duration,
+                "fadeIn": not is_first,
+                "fadeOut": current_duration + clip_duration < video_duration,
+            }
+        )
+        current_duration += clip_duration - (0 if is_first else crossfade)
+        track_index += 1
+
+        if video_duration - current_duration < 1:
+            break
+
+    return tracks
+
+
+def build_render_command(
+    video_path,
+    video_duration,
+    output_path,
+    events,
+    background=None,
+    ducking_ranges=(),
+    encoding=None,
+    threads=None,
+):
+    """
+    Compile a render into a single ffmpeg invocation
+
+    Args:
+        events: Timeline audio as dicts with path, start and volume
+        background: Optional dict with tracks (from plan_background_tracks),
+            volume and crossfade
+        ducking_ranges: Merged ranges with start, end, ducking_level and
+            fade_duration, applied to the background music
+    """
+    inputs = []
+    uses = {}
+    for path in [event["path"] for event in events] + [
+        track["path"] for track in (background["tracks"] if background else [])
+    ]:
+        if path not in uses:
+            inputs.append(path)
+        uses[path] = uses.get(path, 0) + 1
+
+    filters = []
+    streams = {}
+    for index, path in enumerate(inputs, start=1):
+        labels = [f"in{index}_{n}" for n in range(uses[path])]
+        chain = (
+            f"[{index}:a]aresample={SAMPLE_RATE},"
+            "aformat=sample_fmts=fltp:channel_layouts=stereo"
+        )
+        if len(labels) > 1:
+            chain += f",asplit={len(labels)}"
+        filters.append(chain + "".join(f"[{label}]" for label in labels))
+        streams[path] = labels
+
+    mix = []
+    if background and background["tracks"]:
+        crossfade = background["crossfade"]
+        bg_end = max(
+            track["start"] + track["duration"] for track in background["tracks"]
+        )
+        bg_duration = min(bg_end, video_duration)
+
+        # Ducking scales the whole music bed; applied per track after the
+        # delay (global timeline) so everything sums in a single amix
+        ducking = []
+        for duck in ducking_ranges:
+            fade = duck["fade_duration"]
+            if fade > 0:
+                # Matches the MoviePy backend, which fades the whole bed per range
+                ducking.append(f"afade=t=in:d={fade}")
+                ducking.append(f"afade=t=out:st={bg_duration - fade:.6f}:d={fade}")
+            ducking.append(
+                f"volume={duck['ducking_level']}:enable="
+                f"'between(t,{duck['start']:.6f},{duck['end']:.6f})'"
+            )
+
+        for n, track in enumerate(background["tracks"]):
+            chain = [
+                f"atrim=0:{track['duration']:.6f}",
+                "asetpts=PTS-STARTPTS",
+                f"volume={background['volume']}",
+            ]
+            if track["fadeIn"] and crossfade > 0:
+                chain.append(f"afade=t=in:d={crossfade}")
+            if track["fadeOut"] and crossfade > 0:
+                chain.append(
+                    f"afade=t=out:st={track['duration'] - crossfade:.6f}:d={crossfade}"
+                )
+            chain.append(_delay(track["start"]))
+            chain.extend(ducking)
+            filters.append(
+                f"[{streams[track['path']].pop()}]" + ",".join(chain) + f"[bg{n}]"
+            )
+            mix.append(f"[bg{n}]")
+
+    for n, event in enumerate(events):
+        filters.append(
+            f"[{streams[event['path']].pop()}]volume={event['volume']},"
+            f"{_delay(event['start'])}[ev{n}]"
+        )
+        mix.append(f"[ev{n}]")
+
+    if mix:
+        filters.append(
+            "".join(mix) + f"{_amix(len(mix))},atrim=0:{video_duration:.6f}[aout]"
+        )
+    else:
+        filters.append(
+            f"anullsrc=r={SAMPLE_RATE}:cl=stereo,atrim=0:{video_duration:.6f}[aout]"
+        )
+
+    cmd = [FFMPEG_BINARY, "-y", "-loglevel", "error", "-nostats", "-i", video_path]
+    for path in inputs:
+        cmd.extend(["-i", path])
+    cmd.extend(["-filter_complex", ";".join(filters)])
+    cmd.extend(["-map", "0:v:0", "-map", "[aout]"])
+    preset = encoding.preset if encoding else "medium"
+    cmd.extend(["-c:v", "libx264", "-preset", preset])
+    cmd.extend(["-pix_fmt", "yuv420p"])
+    if encoding and encoding.bitrate:
+        cmd.extend(["-b:v", encoding.bitrate])
+    if encoding and encoding.fps:
+        cmd.extend(["-r", str(encoding.fps)])
+    cmd.extend(["-c:a", "aac", "-ar", str(SAMPLE_RATE)])
+    if encoding and encoding.audio_bitrate:
+        cmd.extend(["-b:a", encoding.audio_bitrate])
+    if threads:
+        cmd.extend(["-threads", str(threads)])
+    cmd.extend(["-progress", "pipe:1", output_path])
+    return cmd
+
+
+def run_render(cmd, duration, on_progress=None):
+    """Run a render command, forwarding ffmpeg's progress as a 0-1 fraction"""
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    for line in process.stdout:
+        key, _, value = line.strip().partition("=")
+        if key == "out_time_us" and on_progress and duration:
+            try:
+                on_progress(min(1.0, int(value) / 1e6 / duration))
+            except ValueError:
+                pass
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise IOError(f"ffmpeg render failed: {stderr}")
+
+
+def _delay(start):
+    """Delay a stream by start seconds, sample-accurately"""
+    return f"adelay={round(max(start, 0) * SAMPLE_RATE)}S:all=1"
+
+
+def _amix(count):
+    """Sum streams like CompositeAudioClip (amix averages by default)"""
+    if count == 1:
+        return "anull"
+    return f"amix=inputs={count}:normalize=0:duration=longest"
@@ -0,0 +1,90 @@
+import os
+import re
+import logging
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+PLAYLIST_NAME = "index.m3u8"
+MAP_URI = re.compile(r'URI="([^"]+)"')
+
+
+class HLSPublisher:
+    """
+    Uploads HLS segments and the playlist while ffmpeg is still producing them
+
+    Only segments already listed in the local playlist are complete, so each
+    publish uploads those it has not seen yet and then the playlist itself.
+    For S3 destinations the uploaded playlist references presigned segment
+    URLs, so the playlist URL alone is enough to play a private output.
+    """
+
+    def __init__(self, asset_manager, destination, on_ready=None):
+        self.asset_manager = asset_manager
+        self.destination = destination
+        self.on_ready = on_ready
+        self.uploaded = {}
+        self.total_bytes = 0
+        self.playlist_location = None
+        self._playlist_mtime = None
+
+    def publish(self, hls_dir, final=False):
+        """Upload new segments and the playlist if the playlist changed"""
+        playlist_path = os.path.join(hls_dir, PLAYLIST_NAME)
+        try:
+            mtime = os.stat(playlist_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._playlist_mtime and not final:
+            return
+        self._playlist_mtime = mtime
+
+        with open(playlist_path) as f:
+            lines = f.read().splitlines()
+
+        published = []
+        for line in lines:
+            if line.startswith("#EXT-X-MAP:"):
+                # fMP4 init segment, referenced from a tag rather than a URI line
+                match = MAP_URI.search(line)
+                if match:
+                    uri = self._publish_segment(hls_dir, match.group(1))
+                    line = f"{line[: match.start(1)]}{uri}{line[match.end(1) :]}"
+            elif line and not line.startswith("#"):
+                line = self._publish_segment(hls_dir, line)
+            published.append(line)
+        if not self.uploaded:
+            return
+
+        publish_path = f"{playlist_path}.publish"
+        with open(publish_path, "w") as f:
+            f.write("\n".join(published) + "\n")
+        first_publish = self.playlist_location is None
+        self.playlist_location = self.asset_manager.upload_result(
+            publish_path, self.destination, PLAYLIST_NAME
+        )
+
+        if first_publish:
+            logger.info(f"HLS playlist live at {self.playlist_location[0]}")
+            if self.on_ready:
+                try:
+                    self.on_ready(self.playlist_location)
+                except Exception as e:
+                    logger.warning(f"HLS ready callback failed: {e}")
+
+    def _publish_segment(self, hls_dir, segment_name):
+        if segment_name not in self.uploaded:
+            self.uploaded[segment_name] = self._upload_segment(hls_dir, segment_name)
+        return self.uploaded[segment_name]
+
+    def _upload_segment(self, hls_dir, segment_name):
+        """Upload one segment and return how the playlist should reference it"""
+        segment_path = os.path.join(hls_dir, segment_name)
+        self.total_bytes += os.path.getsize(segment_path)
+        _, bucket, key = self.asset_manager.upload_result(
+            segment_path, self.destination, segment_name
+        )
+        if bucket and key:
+            return self.asset_manager.generate_presigned_url(bucket, key)
+        return segment_name
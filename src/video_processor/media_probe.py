@@ -0,0 +1,252 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import logging
+import subprocess
+import threading
+from statistics import median
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import FFmpegInfosParser
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Bump when the shape of cached probe results changes
+PROBE_VERSION = 1
+CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6}
+# Files up to this size (audio assets) are keyed by a hash of their content
+PROBE_HASH_MAX_BYTES = int(os.getenv("PROBE_HASH_MAX_BYTES", str(64 << 20)))
+
+_digest_lock = threading.Lock()
+_digests = {}
+
+
+def get_ffprobe_binary():
+    """FFPROBE_BINARY, else ffprobe next to FFMPEG_BINARY or on the PATH"""
+    configured = os.getenv("FFPROBE_BINARY")
+    if configured:
+        return configured
+    sibling = os.path.join(os.path.dirname(FFMPEG_BINARY), "ffprobe")
+    if os.path.isfile(sibling):
+        return sibling
+    return shutil.which("ffprobe")
+
+
+def content_digest(path, fingerprint=None):
+    """
+    Cache key of a local file, memoized per (path, size, mtime)
+
+    Shared by the probe and PCM caches so each asset is hashed only once.
+    Files up to PROBE_HASH_MAX_BYTES are keyed by their SHA-256. Larger
+    ones (input videos) are never read: they are keyed by the fingerprint
+    of their source (URI and ETag) when the caller has one, else by path,
+    size and mtime.
+    """
+    stat = os.stat(path)
+    path_key = (path, stat.st_size, stat.st_mtime_ns, fingerprint)
+    with _digest_lock:
+        digest = _digests.get(path_key)
+    if digest is None:
+        if stat.st_size <= PROBE_HASH_MAX_BYTES:
+            with open(path, "rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+        else:
+            if fingerprint:
+                identity = f"source:{fingerprint}:{stat.st_size}"
+            else:
+                identity = f"file:{os.path.abspath(path)}:{stat.st_mtime_ns}"
+            digest = hashlib.sha256(identity.encode()).hexdigest()
+        with _digest_lock:
+            _digests[path_key] = digest
+    return digest
+
+
+class MediaProbe:
+    """
+    One metadata pass per asset, cached by content (see content_digest)
+
+    Returns duration, stream codecs, resolution, fps, sample rate, channels
+    and (on request) keyframe times without decoding any media, so durations
+    can be planned before the first clip is opened. Results live in memory and
+    as small JSON files in the cache directory, shared by warm jobs and
+    worker processes. Remote inputs (streamed URLs) are probed uncached.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.ffprobe = get_ffprobe_binary()
+        self._lock = threading.Lock()
+        self._results = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if not self.ffprobe:
+            logger.warning("ffprobe not found, probing with ffmpeg -i instead")
+
+    def probe(self, path, keyframes=False, fingerprint=None):
+        """
+        Metadata of a media file or URL
+
+        Args:
+            keyframes: Also list the video keyframe times, which reads every
+                packet header of the file (still no decoding)
+            fingerprint: Source URI and ETag the file was downloaded from,
+                keying large files without hashing them
+        """
+        if not os.path.isfile(path):
+            return self._run(path, keyframes)
+
+        key = f"{content_digest(path, fingerprint)}_v{PROBE_VERSION}"
+        with self._lock:
+            info = self._results.get(key)
+        if info is None:
+            info = self._read_cached(key)
+        if info is None or (keyframes and info["keyframes"] is None and self.ffprobe):
+            info = self._run(path, keyframes)
+            self._write_cached(key, info)
+        with self._lock:
+            self._results[key] = info
+        return info
+
+    def duration(self, path, fingerprint=None):
+        """Container duration in seconds"""
+        return self.probe(path, fingerprint=fingerprint)["duration"]
+
+    def _read_cached(self, key):
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cached(self, key, info):
+        """Written atomically so concurrent workers never read a partial file"""
+        cache_path = os.path.join(self.cache_dir, f"{key}.json")
+        partial_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            with open(partial_path, "w") as f:
+                json.dump(info, f)
+            os.replace(partial_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache probe result {key}: {e}")
+
+    def _run(self, path, keyframes):
+        if self.ffprobe:
+            info = run_ffprobe(self.ffprobe, path, keyframes)
+        else:
+            info = run_ffmpeg_probe(path)
+        logger.info(
+            f"Probed {os.path.basename(path)}: {info['duration']}s, "
+            f"video {info['videoCodec']}, audio {info['audioCodec']}"
+        )
+        return info
+
+
+def run_ffprobe(ffprobe, path, keyframes=False):
+    """Probe with a single ffprobe run (JSON format, streams and packets)"""
+    cmd = [ffprobe, "-v", "error", "-of", "json", "-show_format", "-show_streams"]
+    if keyframes:
+        cmd.extend(["-show_entries", "packet=stream_index,pts_time,flags"])
+    cmd.append(path)
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise IOError(
+            f"Failed to probe {path}: {result.stderr.decode(errors='replace')}"
+        )
+    data = json.loads(result.stdout)
+
+    info = _empty_info()
+    duration = data.get("format", {}).get("duration")
+    info["duration"] = float(duration) if duration else None
+    video_index = None
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "video" and info["videoCodec"] is None:
+            # Cover art is an attached picture, not a video stream
+            if stream.get("disposition", {}).get("attached_pic"):
+                continue
+            video_index = stream["index"]
+            info["videoCodec"] = stream.get("codec_name")
+            info["width"], info["height"] = stream.get("width"), stream.get("height")
+            info["fps"] = _frame_rate(stream.get("avg_frame_rate"))
+        elif stream.get("codec_type") == "audio" and info["audioCodec"] is None:
+            info["audioCodec"] = stream.get("codec_name")
+            info["sampleRate"] = int(stream.get("sample_rate") or 0) or None
+            info["channels"] = stream.get("channels")
+        if info["duration"] is None and stream.get("duration"):
+            info["duration"] = float(stream["duration"])
+
+    if keyframes:
+        times = [
+            float(packet["pts_time"])
+            for packet in data.get("packets", [])
+            if packet.get("stream_index") == video_index
+            and "K" in packet.get("flags", "")
+            and packet.get("pts_time") not in (None, "N/A")
+        ]
+        _set_keyframes(info, sorted(times))
+    return info
+
+
+def run_ffmpeg_probe(path):
+    """
+    Probe from ffmpeg -i's stream summary, where ffprobe is not installed
+
+    Keyframes are not available this way.
+    """
+    cmd = [FFMPEG_BINARY, "-hide_banner", "-i", path]
+    result = subprocess.run(cmd, capture_output=True, stdin=subprocess.DEVNULL)
+    output = result.stderr.decode("utf8", errors="ignore")
+    try:
+        parsed = FFmpegInfosParser(output, path).parse()
+    except Exception as e:
+        raise IOError(f"Failed to probe {path}: {output}") from e
+
+    info = _empty_info()
+    info["duration"] = parsed.get("duration")
+    if parsed.get("video_found"):
+        info["videoCodec"] = parsed.get("video_codec_name")
+        info["width"], info["height"] = parsed.get("video_size") or (None, None)
+        info["fps"] = round(parsed["video_fps"], 3) if parsed.get("video_fps") else None
+    match = re.search(r"Stream #.*?Audio: (\w+).*?, (\d+) Hz, ([^,\n]+)", output)
+    if match:
+        info["audioCodec"] = match.group(1)
+        info["sampleRate"] = int(match.group(2))
+        layout = match.group(3).split("(")[0].strip()
+        channels = re.match(r"(\d+) channels", layout)
+        info["channels"] = (
+            int(channels.group(1)) if channels else CHANNEL_LAYOUTS.get(layout)
+        )
+    return info
+
+
+def _empty_info():
+    return {
+        "duration": None,
+        "videoCodec": None,
+        "audioCodec": None,
+        "width": None,
+        "height": None,
+        "fps": None,
+        "sampleRate": None,
+        "channels": None,
+        "keyframes": None,
+        "keyframeInterval": None,
+    }
+
+
+def _frame_rate(rate):
+    """Frames per second from ffprobe's "num/den" notation"""
+    try:
+        num, _, den = (rate or "").partition("/")
+        return round(int(num) / int(den or 1), 3) or None
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _set_keyframes(info, times):
+    info["keyframes"] = [round(t, 6) for t in times]
+    if len(times) > 1:
+        info["keyframeInterval"] = round(
+            median(b - a for a, b in zip(times, times[1:])), 3
+        )
@@ -0,0 +1,118 @@
+import os
+import re
+import wave
+import hashlib
+import logging
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+SAMPLE_RATE = 16000
+# Pauses after punctuation, in seconds
+PAUSES = {",": 0.2, ";": 0.25, ":": 0.25, ".": 0.45, "!": 0.45, "?": 0.45}
+WORD_GAP = 0.06
+SSML_BREAK = re.compile(r"<break\b[^>]*?time=[\"']([\d.]+)(ms|s)[\"'][^>]*>")
+SSML_TAG = re.compile(r"<[^>]+>")
+TOKEN = re.compile(r"\x00[\d.]+|[^\s,;:.!?\x00]+|[,;:.!?]")
+
+
+def _break_token(match):
+    """SSML break as a sentinel token carrying its length in seconds"""
+    seconds = float(match.group(1)) / (1000 if match.group(2) == "ms" else 1)
+    return f" \x00{seconds} "
+
+
+class OfflineProvider:
+    """
+    Deterministic speech-like audio with no network access
+
+    Each word becomes a voiced burst (a harmonic tone with a syllable-rate
+    envelope) whose length follows the word length at LOCAL_TTS_WPM, with
+    pauses after punctuation and SSML breaks. The same text and voice always
+    produce identical samples, so renders and load tests are reproducible
+    without touching Polly.
+    """
+
+    def __init__(self):
+        self.words_per_minute = float(os.getenv("LOCAL_TTS_WPM", "160"))
+
+    def generate_speech(
+        self,
+        text,
+        output_path,
+        voice_id="Joanna",
+        engine="neural",
+        language_code=None,
+        text_type="text",
+    ):
+        """Synthesize text to a 16-bit mono WAV and return its path"""
+        seed = int.from_bytes(
+            hashlib.sha256(f"{voice_id}\0{text_type}\0{text}".encode()).digest()[:8],
+            "little",
+        )
+        rng = np.random.default_rng(seed)
+        # Stable per-voice pitch between 100 and 220 Hz
+        pitch = 100 + hashlib.sha256(voice_id.encode()).digest()[0] / 255 * 120
+
+        segments = []
+        for kind, value in self._tokens(text, text_type):
+            if kind == "word":
+                segments.append(self._word(value, pitch, rng))
+                segments.append(np.zeros(int(WORD_GAP * SAMPLE_RATE)))
+            else:
+                segments.append(np.zeros(int(value * SAMPLE_RATE)))
+        samples = np.concatenate(segments) if segments else np.zeros(1)
+
+        output_path = os.path.splitext(output_path)[0] + ".wav"
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with wave.open(output_path, "wb") as clip:
+            clip.setnchannels(1)
+            clip.setsampwidth(2)
+            clip.setframerate(SAMPLE_RATE)
+            clip.writeframes((samples * 32767).astype(np.int16).tobytes())
+
+        logger.info(
+            f"Generated offline speech at: {output_path} "
+            f"({len(samples) / SAMPLE_RATE:.2f}s)"
+        )
+        return output_path
+
+    def generate_batch(self, requests):
+        """Synthesize each request; offline synthesis has no per-call cost"""
+        return [self.generate_speech(**request) for request in requests]
+
+    def _tokens(self, text, text_type):
+        """Yield ("word", text) and ("pause", seconds) items"""
+        if text_type == "ssml":
+            # Keep breaks as sentinel tokens, drop every other tag
+            text = SSML_BREAK.sub(_break_token, text)
+            text = SSML_TAG.sub(" ", text)
+        for token in TOKEN.findall(text):
+            if token.startswith("\x00"):
+                yield "pause", float(token[1:])
+            elif token in PAUSES:
+                yield "pause", PAUSES[token]
+            else:
+                yield "word", token
+
+    def _word(self, word, pitch, rng):
+        """A voiced burst lasting about as long as the word takes to say"""
+        # Average English word is ~5 letters; scale the WPM rate by length
+        duration = 60 / self.words_per_minute * max(len(word), 1) / 5 - WORD_GAP
+        n = int(max(duration, 0.08) * SAMPLE_RATE)
+        t = np.arange(n) / SAMPLE_RATE
+        position = t / t[-1]
+
+        # Gentle pitch drift and a few harmonics with falling weights
+        f0 = pitch * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(1, 3) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        tone = sum(np.sin(k * phase) / k for k in range(1, 6)) / 2.3
+
+        # Syllable-rate amplitude envelope with soft attack and release
+        syllables = max(1, round(len(word) / 3))
+        envelope = 0.6 * np.sin(np.pi * syllables * position) ** 2
+        envelope += 0.4 * np.sin(np.pi * position)
+        noise = rng.normal(0, 0.02, n)
+        return envelope * (0.25 * tone + noise)
@@ -0,0 +1,222 @@
+import gc
+import os
+import wave
+import weakref
+import logging
+import subprocess
+import threading
+import numpy as np
+from moviepy import AudioClip
+from moviepy.config import FFMPEG_BINARY
+from media_probe import content_digest
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Match MoviePy's AudioFileClip defaults and the render's audio output rate
+PCM_FPS = 44100
+PCM_CHANNELS = 2
+# 16-bit WAVs up to this long (e.g. raw PCM speech) are decoded in-process;
+# longer ones would need too much memory for a whole-file FFT resample
+NATIVE_WAV_MAX_SECONDS = 600
+
+
+def resample(samples, src_rate, dst_rate):
+    """Band-limited FFT resample along the first axis"""
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    n_out = round(len(samples) * dst_rate / src_rate)
+    spectrum = np.fft.rfft(samples, axis=0)
+    return np.fft.irfft(spectrum, n_out, axis=0) * (n_out / len(samples))
+
+
+def read_wav(audio_path):
+    """
+    Decode a 16-bit PCM WAV to float32 frames at PCM_FPS without ffmpeg
+
+    Returns None for WAVs this reader does not handle, so the caller can
+    fall back to an ffmpeg decode.
+    """
+    try:
+        with wave.open(audio_path, "rb") as clip:
+            rate, channels = clip.getframerate(), clip.getnchannels()
+            if (
+                clip.getsampwidth() != 2
+                or channels not in (1, PCM_CHANNELS)
+                or clip.getnframes() > NATIVE_WAV_MAX_SECONDS * rate
+            ):
+                return None
+            raw = clip.readframes(clip.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    samples = np.frombuffer(raw, dtype=np.int16).reshape(-1, channels) / 32768.0
+    samples = resample(samples, rate, PCM_FPS)
+    if channels == 1:
+        # Same -3 dB mono upmix as ffmpeg, so levels match the other decoders
+        samples = np.repeat(samples, PCM_CHANNELS, axis=1) * np.sqrt(0.5)
+    return np.clip(samples, -1.0, 1.0).astype(np.float32)
+
+
+class PCMAudioClip(AudioClip):
+    """
+    Audio clip backed by a memory-mapped float32 PCM array
+
+    Contiguous frame requests (MoviePy's chunked rendering) are served as
+    slices of the mapping, so any number of clips can share one decode.
+    """
+
+    def __init__(self, data, fps=PCM_FPS):
+        self.data = data
+        n_frames = len(data)
+
+        def frame_function(t):
+            if np.isscalar(t):
+                index = int(round(t * fps))
+                if 0 <= index < n_frames:
+                    return data[index]
+                return np.zeros(data.shape[1], dtype=np.float32)
+
+            indices = np.rint(np.asarray(t) * fps).astype(np.int64)
+            if len(indices) == 0:
+                return np.zeros((0, data.shape[1]), dtype=np.float32)
+            first, last = indices[0], indices[-1]
+            if 0 <= first and last < n_frames and last - first == len(indices) - 1:
+                return data[first : last + 1]
+
+            valid = (indices >= 0) & (indices < n_frames)
+            frames = np.zeros((len(indices), data.shape[1]), dtype=np.float32)
+            frames[valid] = data[indices[valid]]
+            return frames
+
+        super().__init__(frame_function, duration=n_frames / fps, fps=fps)
+
+
+class PCMCache:
+    """
+    Decodes each audio file once to raw PCM and memory-maps it for reuse
+
+    Entries are keyed by file content hash so they are shared between
+    timeline events, playlist loops and (warm) jobs. The cache directory is
+    trimmed to PCM_CACHE_MAX_BYTES, evicting least recently used entries.
+    Mappings are held weakly: once a job's clips are gone its entries are
+    no longer live and may be evicted.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(os.getenv("PCM_CACHE_MAX_BYTES", str(1 << 30)))
+        self._lock = threading.Lock()
+        self._mapped = weakref.WeakValueDictionary()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def load(self, audio_path):
+        """Return a PCMAudioClip for the file, decoding it only on first use"""
+        key = self._key_for(audio_path)
+        with self._lock:
+            data = self._mapped.get(key)
+        if data is None:
+            data = self._map(key, audio_path)
+        return PCMAudioClip(data)
+
+    def _key_for(self, audio_path):
+        return f"{content_digest(audio_path)}_{PCM_FPS}_{PCM_CHANNELS}"
+
+    def _map(self, key, audio_path):
+        pcm_path = os.path.join(self.cache_dir, f"{key}.f32")
+        decoded = not os.path.exists(pcm_path)
+        if decoded:
+            self._decode(audio_path, pcm_path)
+        else:
+            os.utime(pcm_path)
+
+        data = np.memmap(pcm_path, dtype=np.float32, mode="r").reshape(-1, PCM_CHANNELS)
+        with self._lock:
+            self._mapped[key] = data
+        if decoded:
+            # Evict once the new entry is live, so it is never trimmed itself
+            self._evict()
+        return data
+
+    def _decode(self, audio_path, pcm_path):
+        """Single decode to float32 PCM, written atomically"""
+        partial_path = f"{pcm_path}.{os.getpid()}.{threading.get_ident()}.part"
+        samples = read_wav(audio_path) if audio_path.endswith(".wav") else None
+        if samples is not None:
+            samples.tofile(partial_path)
+            os.replace(partial_path, pcm_path)
+            return
+
+        cmd = [
+            FFMPEG_BINARY,
+            "-v",
+            "error",
+            "-i",
+            audio_path,
+            "-vn",
+            "-f",
+            "f32le",
+            "-acodec",
+            "pcm_f32le",
+            "-ar",
+            str(PCM_FPS),
+            "-ac",
+            str(PCM_CHANNELS),
+            "-y",
+            partial_path,
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise IOError(
+                f"Failed to decode {audio_path}: {result.stderr.decode(errors='replace')}"
+            )
+        os.replace(partial_path, pcm_path)
+        logger.info(
+            f"Decoded {audio_path} to PCM cache ({os.path.getsize(pcm_path) / 1e6:.1f} MB)"
+        )
+
+    def usage_bytes(self):
+        """Bytes held by cached PCM files"""
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".f32"):
+                try:
+                    total += os.path.getsize(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+        return total
+
+    def _evict(self):
+        """Trim the cache to its size budget, least recently used first"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".f32"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        # Clips of finished jobs may only be held by reference cycles
+        gc.collect()
+        with self._lock:
+            live = list(self._mapped.keys())
+        in_use = {os.path.join(self.cache_dir, f"{key}.f32") for key in live}
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path in in_use:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,119 @@
+import os
+import time
+import logging
+from proglog import ProgressBarLogger
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Share of overall job progress covered by each phase (start, end) in percent
+PHASE_RANGES = {
+    "downloading": (0, 10),
+    "timeline": (10, 20),
+    "mixing": (20, 25),
+    "encoding_audio": (25, 30),
+    "preview": (30, 35),
+    "encoding_video": (35, 95),
+    "uploading": (95, 100),
+}
+
+# MoviePy progress bars mapped to encoding phases
+ENCODER_BARS = {"chunk": "encoding_audio", "frame_index": "encoding_video"}
+
+
+class ProgressReporter:
+    """
+    Writes throttled job progress (percent, phase, ETA) to the job record
+
+    Writes within a phase are coalesced to at most one per
+    PROGRESS_UPDATE_INTERVAL seconds and only once progress moved by
+    PROGRESS_UPDATE_PERCENT, which bounds DynamoDB writes per job. Phase
+    changes are always written and optionally sent as webhook events.
+    """
+
+    def __init__(self, job_manager, job_id, on_phase_change=None):
+        self.job_manager = job_manager
+        self.job_id = job_id
+        self.on_phase_change = on_phase_change
+        self.min_interval = float(os.getenv("PROGRESS_UPDATE_INTERVAL", "10"))
+        self.min_step = float(os.getenv("PROGRESS_UPDATE_PERCENT", "5"))
+        self.phase = None
+        self.phase_started_at = None
+        self.last_percent = None
+        self.last_write_at = 0.0
+
+    def start_phase(self, phase):
+        """Enter a new phase and write it immediately"""
+        if phase == self.phase:
+            return
+        self.phase = phase
+        self.phase_started_at = time.time()
+        progress = self._write(0.0, eta_seconds=None)
+        if self.on_phase_change and progress:
+            try:
+                self.on_phase_change(progress)
+            except Exception as e:
+                logger.warning(f"Progress webhook failed: {e}")
+
+    def update(self, fraction, phase=None):
+        """Report progress within the current (or given) phase"""
+        if phase and phase != self.phase:
+            self.start_phase(phase)
+
+        fraction = max(0.0, min(1.0, fraction))
+        now = time.time()
+        percent = self._overall_percent(fraction)
+        if now - self.last_write_at < self.min_interval:
+            return
+        if (
+            self.last_percent is not None
+            and percent - self.last_percent < self.min_step
+        ):
+            return
+
+        eta_seconds = None
+        if fraction > 0:
+            elapsed = now - self.phase_started_at
+            eta_seconds = round(elapsed / fraction * (1 - fraction), 1)
+        self._write(fraction, eta_seconds)
+
+    def encoder_logger(self, video_phase="encoding_video"):
+        """Return a proglog logger that feeds MoviePy encode progress here"""
+        return EncoderProgressLogger(self, video_phase)
+
+    def _overall_percent(self, fraction):
+        start, end = PHASE_RANGES.get(self.phase, (0, 100))
+        return round(start + (end - start) * fraction, 1)
+
+    def _write(self, fraction, eta_seconds):
+        progress = {
+            "percent": self._overall_percent(fraction),
+            "phase": self.phase,
+            "etaSeconds": eta_seconds,
+        }
+        try:
+            self.job_manager.update_status(self.job_id, "processing", progress=progress)
+        except Exception as e:
+            logger.warning(f"Failed to write progress for job {self.job_id}: {e}")
+            return None
+        self.last_write_at = time.time()
+        self.last_percent = progress["percent"]
+        return progress
+
+
+class EncoderProgressLogger(ProgressBarLogger):
+    """Proglog logger translating MoviePy bar updates into ProgressReporter calls"""
+
+    def __init__(self, reporter, video_phase="encoding_video"):
+        super().__init__()
+        self.reporter = reporter
+        self.phases = dict(ENCODER_BARS, frame_index=video_phase)
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        phase = self.phases.get(bar)
+        if phase is None or attr != "index":
+            return
+        total = self.bars[bar].get("total")
+        if total:
+            self.reporter.update(value / total, phase)
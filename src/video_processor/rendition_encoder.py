@@ -0,0 +1,160 @@
+import os
+import logging
+import subprocess
+from moviepy.config import FFMPEG_BINARY
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+def build_ladder_command(size, fps, audiofile, outputs, threads=None):
+    """
+    Build one ffmpeg command encoding every rendition from a single raw input
+
+    Frames arrive once on stdin and are fanned out with a split filter, so
+    the composited video is produced a single time however many renditions
+    are requested. The pre-mixed audio track is copied into each output.
+    """
+    width, height = size
+    labels = [f"v{i}" for i in range(len(outputs))]
+    scaled = []
+    for label, output in zip(labels, outputs):
+        # Never upscale; keep dimensions even for yuv420p
+        target = min(output["height"], height) // 2 * 2
+        scaled.append(f"[{label}]scale=-2:{target}[{label}out]")
+    split = f"[0:v]split={len(outputs)}" + "".join(f"[{label}]" for label in labels)
+    filter_graph = ";".join([split] + scaled)
+
+    cmd = [
+        FFMPEG_BINARY,
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "rawvideo",
+        "-vcodec",
+        "rawvideo",
+        "-s",
+        f"{width}x{height}",
+        "-pix_fmt",
+        "rgb24",
+        "-r",
+        f"{fps:.02f}",
+        "-i",
+        "-",
+    ]
+    if audiofile:
+        cmd.extend(["-i", audiofile])
+    cmd.extend(["-filter_complex", filter_graph])
+
+    for label, output in zip(labels, outputs):
+        cmd.extend(["-map", f"[{label}out]"])
+        if audiofile:
+            cmd.extend(["-map", "1:a", "-acodec", "copy"])
+        cmd.extend(["-vcodec", "libx264", "-preset", output["preset"]])
+        if output.get("bitrate"):
+            cmd.extend(["-b:v", output["bitrate"]])
+        cmd.extend(["-pix_fmt", "yuv420p"])
+        if threads:
+            cmd.extend(["-threads", str(threads)])
+        cmd.append(output["path"])
+    return cmd
+
+
+def build_hls_command(
+    size, fps, audiofile, hls_dir, segment_duration, preset, bitrate=None, threads=None
+):
+    """Build an ffmpeg command writing raw stdin frames as fMP4 HLS segments"""
+    width, height = size
+    cmd = [
+        FFMPEG_BINARY,
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "rawvideo",
+        "-vcodec",
+        "rawvideo",
+        "-s",
+        f"{width}x{height}",
+        "-pix_fmt",
+        "rgb24",
+        "-r",
+        f"{fps:.02f}",
+        "-i",
+        "-",
+    ]
+    if audiofile:
+        cmd.extend(["-i", audiofile, "-map", "0:v", "-map", "1:a", "-acodec", "copy"])
+    cmd.extend(["-vcodec", "libx264", "-preset", preset])
+    if bitrate:
+        cmd.extend(["-b:v", bitrate])
+    if threads:
+        cmd.extend(["-threads", str(threads)])
+    cmd.extend(
+        [
+            "-pix_fmt",
+            "yuv420p",
+            # Keyframe at every segment boundary so segments cut on time
+            "-force_key_frames",
+            f"expr:gte(t,n_forced*{segment_duration})",
+            "-f",
+            "hls",
+            "-hls_time",
+            str(segment_duration),
+            "-hls_list_size",
+            "0",
+            "-hls_playlist_type",
+            "event",
+            "-hls_segment_type",
+            "fmp4",
+            "-hls_fmp4_init_filename",
+            "init.mp4",
+            "-hls_segment_filename",
+            os.path.join(hls_dir, "segment_%05d.m4s"),
+            os.path.join(hls_dir, "index.m3u8"),
+        ]
+    )
+    return cmd
+
+
+def write_renditions(
+    clip, outputs, fps, audiofile=None, threads=None, on_progress=None
+):
+    """
+    Encode all renditions of a clip in one decode/composite pass
+
+    Args:
+        outputs: List of dicts with path, height, preset and optional bitrate
+        on_progress: Optional callback receiving the encoded fraction (0-1)
+    """
+    cmd = build_ladder_command(clip.size, fps, audiofile, outputs, threads)
+    logger.info(
+        f"Encoding {len(outputs)} renditions: "
+        + ", ".join(f"{output['height']}p" for output in outputs)
+    )
+    pipe_frames(clip, cmd, fps, on_progress)
+
+
+def pipe_frames(clip, cmd, fps, on_progress=None):
+    """Stream the clip's frames into an ffmpeg command reading rawvideo on stdin"""
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+    n_frames = max(1, int(clip.duration * fps))
+    try:
+        for index, frame in enumerate(clip.iter_frames(fps=fps, dtype="uint8")):
+            process.stdin.write(frame.tobytes())
+            if on_progress:
+                on_progress(index / n_frames)
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    stderr = process.stderr.read().decode(errors="replace")
+    if process.wait() != 0:
+        raise IOError(f"ffmpeg encoding failed: {stderr}")
@@ -1,17 +1,180 @@
 import os
+import re
+import json
+import time
+import wave
 import boto3
+import shutil
+import threading
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
 from botocore.exceptions import BotoCoreError, ClientError
 from contextlib import closing
+from moviepy.config import FFMPEG_BINARY
+from rate_limiter import get_limiter
+from storage_backends import get_aws_region
 import logging
 
 logger = logging.getLogger(__name__)
 logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 
+# Engines that support SSML <mark> speech marks
+BATCH_ENGINES = ("standard", "neural")
+# Pause inserted between batched lines, trimmed off when splitting
+BATCH_BREAK_MS = 500
+# Polly's raw PCM is 16-bit mono; 16 kHz is the highest rate it offers, so
+# it caps narration at 8 kHz bandwidth
+PCM_SAMPLE_RATE = 16000
+# Rate of Polly's compressed (mp3, ogg_vorbis) neural speech, kept full band
+MP3_SAMPLE_RATE = 24000
+# File extension per Polly output format
+FORMAT_EXTENSIONS = {"pcm": ".wav", "mp3": ".mp3", "ogg_vorbis": ".ogg"}
+STREAM_CHUNK_SIZE = 64 * 1024
+# Silence placed between stitched chunks once codec padding is trimmed
+CHUNK_JOIN_MS = 300
+# Samples quieter than this (about -54 dBFS) count as silence at the joins
+SILENCE_THRESHOLD = 64
+TASK_KEY_PREFIX = "tts-tasks/"
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+SSML_TOKEN = re.compile(r"(<[^>]+>)")
+SSML_BOUNDARY_TAGS = ("</p>", "</s>", "<break")
+
+
+def split_text(text, text_type="text", max_chars=2500):
+    """
+    Split text into chunks of at most max_chars for separate synthesis
+
+    Plain text is cut at sentence ends (falling back to word boundaries for
+    very long sentences). SSML is cut only between top-level elements or
+    sentences, and each chunk is re-wrapped in <speak>.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    if text_type == "ssml":
+        budget = max_chars - len("<speak></speak>")
+        return [f"<speak>{chunk}</speak>" for chunk in _split_ssml(text, budget)]
+
+    units = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        if len(sentence) <= max_chars:
+            units.append(sentence)
+        else:
+            units.extend(_pack(sentence.split(), max_chars, " "))
+    return _pack(units, max_chars, " ")
+
+
+def _split_ssml(ssml, max_chars):
+    inner = re.sub(r"^\s*<speak[^>]*>|</speak>\s*$", "", ssml)
+    units, current, depth = [], "", 0
+    for token in SSML_TOKEN.split(inner):
+        if token.startswith("<"):
+            current += token
+            if token.startswith("</"):
+                depth -= 1
+            elif not token.endswith("/>"):
+                depth += 1
+            if depth == 0 and token.startswith(SSML_BOUNDARY_TAGS):
+                units.append(current)
+                current = ""
+        elif depth == 0:
+            # Cut loose text between sentences
+            sentences = SENTENCE_END.split(token)
+            for sentence in sentences[:-1]:
+                units.append(current + sentence + " ")
+                current = ""
+            current += sentences[-1]
+        else:
+            current += token
+    if current.strip():
+        units.append(current)
+    return _pack(units, max_chars, "")
+
+
+def _pack(units, max_chars, separator):
+    """Greedily join units into chunks no longer than max_chars"""
+    chunks, current = [], ""
+    for unit in units:
+        if current and len(current) + len(separator) + len(unit) > max_chars:
+            chunks.append(current)
+            current = unit
+        else:
+            current = f"{current}{separator}{unit}" if current else unit
+    if current:
+        chunks.append(current)
+    return chunks
+
 
 class TTSGenerator:
+    """
+    Routes TTS requests to the provider named in the job spec
+
+    Providers share one interface (generate_speech and generate_batch) and
+    are created on first use. TTS_PROVIDER overrides the spec for every
+    event, e.g. "local" to benchmark renders without calling Polly.
+    """
+
+    def __init__(self):
+        self._providers = {}
+        self._lock = threading.Lock()
+
+    def provider(self, name="aws-polly"):
+        """Return the provider instance for a TTSData.provider value"""
+        name = os.getenv("TTS_PROVIDER") or name
+        with self._lock:
+            if name not in self._providers:
+                self._providers[name] = self._create_provider(name)
+            return self._providers[name]
+
+    def _create_provider(self, name):
+        if name == "aws-polly":
+            return PollyProvider()
+        if name == "local":
+            # Imported on demand so this module also loads as a package member
+            from offline_tts import OfflineProvider
+
+            return OfflineProvider()
+        raise ValueError(f"Unknown TTS provider: {name}")
+
+    def generate_speech(self, text, output_path, *args, provider="aws-polly", **kwargs):
+        """Synthesize one request with the given provider; returns the file path"""
+        return self.provider(provider).generate_speech(
+            text, output_path, *args, **kwargs
+        )
+
+    def generate_batch(self, requests):
+        """
+        Synthesize many requests, letting each provider batch its own share
+
+        Args:
+            requests (list): Dicts of generate_speech keyword arguments,
+                optionally with a provider key
+
+        Returns:
+            list: Paths of the generated audio files, in request order
+        """
+        groups = {}
+        for index, request in enumerate(requests):
+            request = dict(request)
+            name = request.pop("provider", "aws-polly")
+            groups.setdefault(name, []).append((index, request))
+
+        paths = [None] * len(requests)
+        for name, members in groups.items():
+            results = self.provider(name).generate_batch(
+                [request for _, request in members]
+            )
+            for (index, _), path in zip(members, results):
+                paths[index] = path
+        return paths
+
+
+class PollyProvider:
     def __init__(self):
         """
-        Initialize the TTS Generator with Amazon Polly
+        Initialize the Amazon Polly provider
         Uses Lambda's built-in IAM role for authentication
         """
         try:
@@ -20,6 +183,18 @@ class TTSGenerator:
         except Exception as e:
             logger.error(f"Failed to initialize AWS Polly client: {str(e)}")
             raise
+        # Shared by every synthesis thread in this worker
+        self.limiter = get_limiter("polly")
+        # Compressed 24 kHz speech keeps the full voice band and is decoded
+        # once through the PCM cache; pcm is an opt-in that skips the decode
+        # at the cost of 16 kHz narration
+        self.output_format = os.getenv("TTS_OUTPUT_FORMAT", "mp3")
+        self.sample_rate = (
+            PCM_SAMPLE_RATE if self.output_format == "pcm" else MP3_SAMPLE_RATE
+        )
+        # Regional clients for asynchronous synthesis tasks, created on first use
+        self._task_client = None
+        self._s3_client = None
 
     def generate_speech(
         self,
@@ -31,11 +206,15 @@ class TTSGenerator:
         text_type="text",
     ):
         """
-        Generate speech from text using Amazon Polly and save as MP3
+        Generate speech from text using Amazon Polly
+
+        Saved as 24 kHz MP3 (or Ogg Vorbis), or as a 16-bit WAV of Polly's
+        raw 16 kHz PCM when TTS_OUTPUT_FORMAT is pcm (the file extension is
+        adjusted to match).
 
         Args:
             text (str): The text to convert to speech
-            output_path (str): Path where to save the MP3 file
+            output_path (str): Path where to save the audio file
             voice_id (str): The Polly voice ID to use (default: Joanna)
             engine (str): The engine type to use ('neural' or 'standard')
             language_code (str): Optional language code
@@ -44,39 +223,53 @@ class TTSGenerator:
         Returns:
             str: Path to the generated audio file
         """
+        # Build synthesis parameters
+        params = {
+            "VoiceId": voice_id,
+            "Engine": engine,
+            "TextType": text_type,
+        }
+
+        if language_code:
+            params["LanguageCode"] = language_code
+
         try:
-            # Build synthesis parameters
-            params = {
-                "Text": text,
-                "OutputFormat": "mp3",
-                "VoiceId": voice_id,
-                "Engine": engine,
-                "TextType": text_type,
-            }
+            async_min_chars = int(os.getenv("TTS_ASYNC_MIN_CHARS", "0"))
+            if (
+                async_min_chars
+                and len(text) >= async_min_chars
+                and os.getenv("S3_BUCKET_NAME")
+            ):
+                return self._synthesize_task(text, output_path, params)
 
-            if language_code:
-                params["LanguageCode"] = language_code
+            chunks = split_text(
+                text, text_type, int(os.getenv("TTS_CHUNK_MAX_CHARS", "2500"))
+            )
+            if len(chunks) > 1:
+                return self._synthesize_chunks(chunks, output_path, params)
 
             # Request speech synthesis
-            response = self.polly_client.synthesize_speech(**params)
+            response = self._synthesize_speech(
+                Text=text, **self._audio_params(), **params
+            )
 
             # Save the audio stream to file
             if "AudioStream" in response:
-                with closing(response["AudioStream"]) as stream:
-                    try:
-                        # Ensure the directory exists
-                        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-                        # Write the audio stream to file
-                        with open(output_path, "wb") as file:
-                            file.write(stream.read())
+                try:
+                    output_path = (
+                        os.path.splitext(output_path)[0]
+                        + FORMAT_EXTENSIONS[self.output_format]
+                    )
+                    if self.output_format == "pcm":
+                        self._write_wav(response["AudioStream"], output_path)
+                    else:
+                        self._write_stream(response["AudioStream"], output_path)
+                    logger.info(f"Successfully generated speech at: {output_path}")
+                    return output_path
 
-                        logger.info(f"Successfully generated speech at: {output_path}")
-                        return output_path
-
-                    except IOError as error:
-                        logger.error(f"Error writing audio file: {str(error)}")
-                        raise
+                except IOError as error:
+                    logger.error(f"Error writing audio file: {str(error)}")
+                    raise
             else:
                 logger.error("No AudioStream found in the response")
                 raise Exception("No AudioStream in response")
@@ -84,3 +277,265 @@ class TTSGenerator:
         except (BotoCoreError, ClientError) as error:
             logger.error(f"Error generating speech: {str(error)}")
             raise
+
+    def _synthesize_speech(self, **params):
+        """SynthesizeSpeech through the worker-wide adaptive rate limiter"""
+        return self.limiter.call(self.polly_client.synthesize_speech, **params)
+
+    def _audio_params(self):
+        """Polly output parameters for audio requests"""
+        return {"OutputFormat": self.output_format, "SampleRate": str(self.sample_rate)}
+
+    def _open_wav(self, output_path):
+        """Open a mono 16-bit WAV for writing at the generator's sample rate"""
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        clip = wave.open(output_path, "wb")
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(self.sample_rate)
+        return clip
+
+    def _write_wav(self, audio_stream, output_path):
+        """Stream raw PCM from Polly into a WAV container"""
+        with closing(audio_stream) as stream, self._open_wav(output_path) as clip:
+            for block in iter(lambda: stream.read(STREAM_CHUNK_SIZE), b""):
+                clip.writeframes(block)
+
+    def _read_samples(self, part_path):
+        """Load a synthesized part as int16 samples and delete it"""
+        if self.output_format == "pcm":
+            samples = np.fromfile(part_path, dtype=np.int16)
+        else:
+            samples = np.frombuffer(self._decode_to_pcm(part_path), np.int16)
+        os.remove(part_path)
+        return samples
+
+    def _write_stream(self, audio_stream, output_path):
+        """Copy a Polly audio stream to disk without buffering it in memory"""
+        # Ensure the directory exists
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with closing(audio_stream) as stream, open(output_path, "wb") as file:
+            shutil.copyfileobj(stream, file, STREAM_CHUNK_SIZE)
+
+    def _synthesize_chunks(self, chunks, output_path, params):
+        """
+        Synthesize text chunks in parallel and stitch them into one WAV
+
+        Each chunk is streamed to its own part file, then appended sample by
+        sample. Near-silence (including MP3 encoder padding) is
+        trimmed at every join and replaced by a fixed sentence pause, so
+        joins are uniform and the total duration is exact.
+        """
+        stem = os.path.splitext(output_path)[0]
+        part_paths = [
+            f"{stem}.part{n}.{self.output_format}" for n in range(len(chunks))
+        ]
+
+        def synthesize(chunk, part_path):
+            response = self._synthesize_speech(
+                Text=chunk, **self._audio_params(), **params
+            )
+            self._write_stream(response["AudioStream"], part_path)
+
+        concurrency = int(os.getenv("TTS_CHUNK_CONCURRENCY", "4"))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # list() re-raises the first failed chunk
+            list(executor.map(synthesize, chunks, part_paths))
+
+        wav_path = f"{stem}.wav"
+        pause = np.zeros(self._sample_index(CHUNK_JOIN_MS), dtype=np.int16)
+        n_samples = 0
+        with self._open_wav(wav_path) as clip:
+            for n, part_path in enumerate(part_paths):
+                samples = self._read_samples(part_path)
+                voiced = np.flatnonzero(np.abs(samples) > SILENCE_THRESHOLD)
+                if len(voiced):
+                    start = voiced[0] if n > 0 else 0
+                    end = voiced[-1] + 1 if n < len(part_paths) - 1 else len(samples)
+                    samples = samples[start:end]
+                if n > 0:
+                    clip.writeframes(pause.tobytes())
+                    n_samples += len(pause)
+                clip.writeframes(samples.tobytes())
+                n_samples += len(samples)
+
+        logger.info(
+            f"Stitched {len(chunks)} speech chunks into {wav_path} "
+            f"({n_samples / self.sample_rate:.2f}s)"
+        )
+        return wav_path
+
+    def _synthesize_task(self, text, output_path, params):
+        """Synthesize very long text with Polly's asynchronous task API via S3"""
+        bucket = os.getenv("S3_BUCKET_NAME")
+        if self._task_client is None:
+            # Task output must land in a bucket in the client's region
+            region = get_aws_region()
+            self._task_client = boto3.client("polly", region_name=region)
+            self._s3_client = boto3.client("s3", region_name=region)
+
+        task = self.limiter.call(
+            self._task_client.start_speech_synthesis_task,
+            Text=text,
+            OutputFormat="mp3",
+            OutputS3BucketName=bucket,
+            OutputS3KeyPrefix=TASK_KEY_PREFIX,
+            **params,
+        )["SynthesisTask"]
+        task_id = task["TaskId"]
+        logger.info(f"Started speech synthesis task {task_id} ({len(text)} chars)")
+
+        poll_interval = float(os.getenv("TTS_ASYNC_POLL_INTERVAL", "2"))
+        deadline = time.monotonic() + float(os.getenv("TTS_ASYNC_TIMEOUT", "600"))
+        while task["TaskStatus"] in ("scheduled", "inProgress"):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Speech synthesis task {task_id} timed out")
+            time.sleep(poll_interval)
+            task = self.limiter.call(
+                self._task_client.get_speech_synthesis_task, TaskId=task_id
+            )["SynthesisTask"]
+        if task["TaskStatus"] != "completed":
+            raise Exception(
+                f"Speech synthesis task {task_id} failed: {task.get('TaskStatusReason')}"
+            )
+
+        key = f"{TASK_KEY_PREFIX}{task_id}.mp3"
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        get_limiter("s3").call(self._s3_client.download_file, bucket, key, output_path)
+        get_limiter("s3").call(self._s3_client.delete_object, Bucket=bucket, Key=key)
+        logger.info(f"Successfully generated speech at: {output_path}")
+        return output_path
+
+    def generate_batch(self, requests):
+        """
+        Synthesize many TTS requests, batching short compatible lines
+
+        Plain-text requests sharing voice, engine and language are sent as
+        one SSML request with a <mark> before each line; the audio is split at
+        the speech mark timestamps into one WAV per line. Anything that cannot
+        be batched, or a batch that fails, is synthesized per request.
+
+        Args:
+            requests (list): Dicts of generate_speech keyword arguments
+
+        Returns:
+            list: Paths of the generated audio files, in request order
+        """
+        paths = [None] * len(requests)
+        max_item_chars = int(os.getenv("TTS_BATCH_ITEM_MAX_CHARS", "300"))
+        max_batch_chars = int(os.getenv("TTS_BATCH_MAX_CHARS", "1500"))
+
+        groups = {}
+        for index, request in enumerate(requests):
+            if (
+                request.get("text_type", "text") == "text"
+                and request.get("engine", "neural") in BATCH_ENGINES
+                and len(request["text"]) <= max_item_chars
+            ):
+                key = (
+                    request.get("voice_id", "Joanna"),
+                    request.get("engine", "neural"),
+                    request.get("language_code"),
+                )
+                groups.setdefault(key, []).append(index)
+
+        for indices in groups.values():
+            for batch in self._plan_batches(requests, indices, max_batch_chars):
+                if len(batch) > 1:
+                    self._run_batch(requests, batch, paths)
+
+        for index, request in enumerate(requests):
+            if paths[index] is None:
+                paths[index] = self.generate_speech(**request)
+        return paths
+
+    def _plan_batches(self, requests, indices, max_batch_chars):
+        """Split a group of request indices into batches under the size limit"""
+        batch, batch_chars = [], 0
+        for index in indices:
+            text_length = len(requests[index]["text"])
+            if batch and batch_chars + text_length > max_batch_chars:
+                yield batch
+                batch, batch_chars = [], 0
+            batch.append(index)
+            batch_chars += text_length
+        if batch:
+            yield batch
+
+    def _run_batch(self, requests, batch, paths):
+        """Synthesize one batch into paths, leaving it unset on failure"""
+        try:
+            outputs = self.synthesize_batch([requests[index] for index in batch])
+        except Exception as e:
+            logger.warning(
+                f"Batched synthesis of {len(batch)} lines failed, "
+                f"falling back to one request per line: {e}"
+            )
+            return
+        for index, output_path in zip(batch, outputs):
+            paths[index] = output_path
+
+    def synthesize_batch(self, requests):
+        """Synthesize compatible requests with one SSML audio + speech marks call"""
+        first = requests[0]
+        ssml = "".join(
+            f'<mark name="line{n}"/>{escape(request["text"])}'
+            + (f'<break time="{BATCH_BREAK_MS}ms"/>' if n < len(requests) - 1 else "")
+            for n, request in enumerate(requests)
+        )
+        params = {
+            "Text": f"<speak>{ssml}</speak>",
+            "TextType": "ssml",
+            "VoiceId": first.get("voice_id", "Joanna"),
+            "Engine": first.get("engine", "neural"),
+        }
+        if first.get("language_code"):
+            params["LanguageCode"] = first["language_code"]
+
+        audio = self._synthesize_speech(**self._audio_params(), **params)
+        marks = self._synthesize_speech(
+            OutputFormat="json", SpeechMarkTypes=["ssml"], **params
+        )
+        with closing(marks["AudioStream"]) as stream:
+            mark_times = {
+                mark["value"]: mark["time"]
+                for mark in map(json.loads, stream.read().decode().splitlines())
+                if mark.get("type") == "ssml"
+            }
+        times = [mark_times.get(f"line{n}") for n in range(len(requests))]
+        if None in times:
+            raise ValueError("Speech marks missing for batched lines")
+
+        stem = os.path.splitext(first["output_path"])[0]
+        batch_path = f"{stem}.batch.{self.output_format}"
+        self._write_stream(audio["AudioStream"], batch_path)
+        samples = self._read_samples(batch_path)
+
+        outputs = []
+        for n, request in enumerate(requests):
+            start = self._sample_index(times[n])
+            if n < len(requests) - 1:
+                end = self._sample_index(times[n + 1] - BATCH_BREAK_MS)
+            else:
+                end = len(samples)
+            output_path = os.path.splitext(request["output_path"])[0] + ".wav"
+            with self._open_wav(output_path) as clip:
+                clip.writeframes(samples[start : max(start, end)].tobytes())
+            outputs.append(output_path)
+
+        logger.info(f"Synthesized {len(requests)} lines in one batched request")
+        return outputs
+
+    def _decode_to_pcm(self, audio_path):
+        """Decode compressed speech to 16-bit mono PCM at the generator's rate"""
+        result = subprocess.run(
+            [FFMPEG_BINARY, "-v", "error", "-i", audio_path]
+            + ["-f", "s16le", "-ac", "1", "-ar", str(self.sample_rate), "-"],
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            raise IOError(f"Failed to decode speech: {result.stderr.decode()}")
+        return result.stdout
+
+    def _sample_index(self, time_ms):
+        return max(0, round(time_ms * self.sample_rate / 1000))
@@ -4,7 +4,12 @@ import time
 from moviepy import VideoFileClip, AudioFileClip, CompositeAudioClip, afx
 from asset_manager import AssetManager
 from tts_generator import TTSGenerator
-from webhook_notifier import WebhookNotifier
+from workspace_manager import WorkspaceManager, InsufficientStorageError
+from pcm_cache import PCMCache, PCMAudioClip, read_wav
+from media_probe import MediaProbe
+from rate_limiter import limiter_metrics
+from rendition_encoder import write_renditions, build_hls_command, pipe_frames
+from ffmpeg_renderer import build_render_command, plan_background_tracks, run_render
 
 
 logger = logging.getLogger(__name__)
@@ -14,18 +19,85 @@ logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 DEFAULT_TEMP_DIR = "/tmp"
 
 
+def get_output_filename(output):
+    """Return the output filename with an .mp4 extension"""
+    output_filename = output.filename
+    if not output_filename.lower().endswith(".mp4"):
+        output_filename += ".mp4"
+    return output_filename
+
+
+def get_input_mode(video_asset):
+    """Resolve how the input video is read: "download" to /tmp or "stream" """
+    return video_asset.inputMode or os.getenv("VIDEO_INPUT_MODE", "download")
+
+
+def get_render_backend(output):
+    """Resolve the render backend: "moviepy" (frames in Python) or "ffmpeg" """
+    return output.renderer or os.getenv("RENDER_BACKEND", "moviepy")
+
+
+def merge_ducking_ranges(ducking_ranges):
+    """Merge overlapping ducking ranges, keeping the strongest duck and fade"""
+    ducking_ranges.sort(key=lambda x: x["start"])
+
+    merged_ranges = []
+    if ducking_ranges:
+        current_range = ducking_ranges[0]
+        for next_range in ducking_ranges[1:]:
+            if next_range["start"] <= current_range["end"]:
+                # Ranges overlap, merge them
+                current_range["end"] = max(current_range["end"], next_range["end"])
+                # Use more aggressive ducking level (lower value)
+                current_range["ducking_level"] = min(
+                    current_range["ducking_level"], next_range["ducking_level"]
+                )
+                # Use longer fade duration
+                current_range["fade_duration"] = max(
+                    current_range["fade_duration"], next_range["fade_duration"]
+                )
+            else:
+                # No overlap, add current range and start new one
+                merged_ranges.append(current_range)
+                current_range = next_range
+        merged_ranges.append(current_range)
+    return merged_ranges
+
+
 class VideoProcessor:
-    def __init__(self, temp_dir=None):
-        self.asset_manager = AssetManager()
+    def __init__(self, temp_dir=None, asset_manager=None):
+        self.asset_manager = asset_manager or AssetManager()
         self.tts_generator = TTSGenerator()
-        self.webhook_notifier = WebhookNotifier()
         self.temp_dir = temp_dir or DEFAULT_TEMP_DIR
 
         # Ensure temp directory exists
         os.makedirs(self.temp_dir, exist_ok=True)
 
+        # Track ephemeral storage and reclaim space leaked by earlier jobs
+        self.workspace = WorkspaceManager(self.temp_dir)
+        self.workspace.sweep_orphans()
+
+        # Decoded audio shared by every event (and warm job) using an asset
+        self.pcm_cache = PCMCache(
+            os.getenv("PCM_CACHE_DIR", os.path.join(self.temp_dir, "pcm-cache"))
+        )
+        self.workspace.track_cache(self.pcm_cache.cache_dir, self.pcm_cache.max_bytes)
+        # Durations and stream info, probed once per asset content
+        self.media_probe = MediaProbe(
+            os.getenv("PROBE_CACHE_DIR", os.path.join(self.temp_dir, "probe-cache"))
+        )
+
+    def _metrics(self, job_id):
+        """Storage and transfer metrics plus the worker's service rate limits"""
+        return {
+            **self.workspace.metrics(job_id),
+            "transfers": self.asset_manager.storage_metrics(),
+            "rateLimits": limiter_metrics(),
+        }
+
     def cleanup_job_dir(self, job_temp_dir):
         """Clean up job temporary directory"""
+        self.workspace.release(os.path.basename(job_temp_dir))
 
         try:
             import shutil
@@ -36,17 +108,41 @@ class VideoProcessor:
         except Exception as e:
             logger.warning(f"Failed to cleanup job temp directory: {str(e)}")
 
-    def process_video_job(self, job_id, job_spec):
-        """Process a complete video job from job specification"""
+    def process_video_job(
+        self,
+        job_id,
+        job_spec,
+        progress=None,
+        on_preview=None,
+        hls_publisher=None,
+        asset_info=None,
+    ):
+        """Process a complete video job from job specification
+
+        Args:
+            progress: Optional ProgressReporter receiving phase/encode progress
+            on_preview: Optional callback receiving the preview result before
+                the full-quality render starts
+            hls_publisher: Optional HLSPublisher uploading segments as they
+                are encoded (HLS output only)
+            asset_info: Optional asset sizes and ETags from the submit-time
+                preflight, used instead of HEAD requests
+        """
         start_time = time.time()
 
         # Create unique job directory
-        job_temp_dir = os.path.join(self.temp_dir, job_id)
-        os.makedirs(job_temp_dir, exist_ok=True)
+        job_temp_dir = self.workspace.create(job_id)
 
         try:
             return self._process_video_internal(
-                job_id, job_spec, job_temp_dir, start_time
+                job_id,
+                job_spec,
+                job_temp_dir,
+                start_time,
+                progress,
+                on_preview,
+                hls_publisher,
+                asset_info,
             )
         except Exception as e:
             processing_time = time.time() - start_time
@@ -60,75 +156,104 @@ class VideoProcessor:
                 "processingTime": processing_time,
                 "error": str(e),
                 "tempDir": job_temp_dir,
+                "metrics": self._metrics(job_id),
             }
 
-    def _process_video_internal(self, job_id, job_spec, job_temp_dir, start_time):
+    def _process_video_internal(
+        self,
+        job_id,
+        job_spec,
+        job_temp_dir,
+        start_time,
+        progress=None,
+        on_preview=None,
+        hls_publisher=None,
+        asset_info=None,
+    ):
         try:
+            # Reserve ephemeral storage before downloading anything
+            input_mode, output_estimate = self._reserve_download_space(
+                job_id, job_spec, asset_info
+            )
+
             # Phase 1: Download audio assets first (fast fail)
             logger.info("Downloading audio assets...")
+            if progress:
+                progress.start_phase("downloading")
             audio_assets = self._download_audio_assets(
                 job_spec.assets.audio, job_temp_dir
             )
 
-            # Phase 2: Download video asset
-            logger.info("Downloading video asset...")
-            downloaded_video_path = self.asset_manager.download_asset(
-                job_spec.assets.video.source, job_temp_dir
+            # Phase 2: Download video asset (or read it straight from the source)
+            video_fingerprint = None
+            if input_mode == "stream":
+                logger.info("Streaming video asset from source...")
+                video_path = self.asset_manager.get_stream_url(
+                    job_spec.assets.video.source
+                )
+            else:
+                logger.info("Downloading video asset...")
+                downloaded_video_path = self.asset_manager.download_asset(
+                    job_spec.assets.video.source, job_temp_dir
+                )
+
+                # Rename input video to avoid conflict with output filename
+                video_path = os.path.join(job_temp_dir, f"input_{job_id}.mp4")
+                os.rename(downloaded_video_path, video_path)
+                video_fingerprint = self._source_fingerprint(
+                    job_spec.assets.video.source, asset_info
+                )
+
+            # Phase 3: Plan every duration from probe data, before decoding
+            logger.info("Processing timeline...")
+            if progress:
+                progress.start_phase("timeline")
+            tts_paths = self._synthesize_tts_events(job_spec.timeline, job_temp_dir)
+            plan = self._plan_timeline(
+                job_spec, video_path, audio_assets, tts_paths, video_fingerprint
             )
 
-            # Rename input video to avoid conflict with output filename
-            video_path = os.path.join(job_temp_dir, f"input_{job_id}.mp4")
-            os.rename(downloaded_video_path, video_path)
+            output = job_spec.output
+            if get_render_backend(output) == "ffmpeg":
+                if output.preview or output.renditions or output.hls:
+                    logger.warning(
+                        "ffmpeg backend does not support preview, renditions or "
+                        "HLS output, rendering with MoviePy"
+                    )
+                else:
+                    return self._render_with_ffmpeg(
+                        job_id,
+                        job_spec,
+                        plan,
+                        video_path,
+                        job_temp_dir,
+                        start_time,
+                        output_estimate,
+                        progress,
+                    )
 
-            # Phase 3: Load video and get duration
+            # Phase 4: Build clips from the plan
             video = VideoFileClip(video_path)
-            video_duration = video.duration
-
-            # Phase 4: Process timeline and collect ducking ranges
-            logger.info("Processing timeline...")
-            background_music = None
+            video_duration = plan["videoDuration"]
+            ducking_ranges = plan["duckingRanges"]
             audio_clips = []
-            ducking_ranges = []
 
             # Create background music from top-level backgroundMusic section
-            if job_spec.backgroundMusic:
-                background_music = self._create_background_music(
-                    job_spec.backgroundMusic, audio_assets, video_duration
-                )
+            background_music = self._create_background_music(
+                plan["background"], video_duration
+            )
 
             for index, event in enumerate(job_spec.timeline):
+                if progress:
+                    progress.update(index / len(job_spec.timeline))
                 if event.type == "tts":
-                    clip = self._create_tts_clip(event, index, job_temp_dir)
-                    audio_clips.append(clip)
-                    # Collect ducking range if duckingLevel is specified
-                    ducking_level = event.data.duckingLevel
-                    fade_duration = event.data.duckingFadeDuration
-                    if ducking_level is not None:
-                        ducking_ranges.append(
-                            {
-                                "start": event.start,
-                                "end": event.start + clip.duration,
-                                "ducking_level": ducking_level,
-                                "fade_duration": fade_duration,
-                            }
-                        )
+                    audio_clips.append(self._create_tts_clip(event, tts_paths[index]))
                 elif event.type == "audio":
-                    clip = self._create_audio_clip(event, audio_assets)
-                    audio_clips.append(clip)
-                    # Collect ducking range if duckingLevel is specified
-                    ducking_level = event.data.duckingLevel
-                    fade_duration = event.data.duckingFadeDuration
-                    if ducking_level is not None:
-                        ducking_ranges.append(
-                            {
-                                "start": event.start,
-                                "end": event.start + clip.duration,
-                                "ducking_level": ducking_level,
-                                "fade_duration": fade_duration,
-                            }
-                        )
+                    audio_clips.append(self._create_audio_clip(event, audio_assets))
 
             # Phase 5: Apply ducking to background music
+            if progress:
+                progress.start_phase("mixing")
             if background_music and ducking_ranges:
                 logger.info("Applying ducking to background music...")
                 background_music = self._apply_ducking(background_music, ducking_ranges)
@@ -154,31 +279,97 @@ class VideoProcessor:
             logger.info("Creating final video...")
             final_video = video.with_audio(final_audio)
 
-            output_filename = job_spec.output.filename
-            if not output_filename.lower().endswith(".mp4"):
-                output_filename += ".mp4"
+            output_filename = get_output_filename(job_spec.output)
 
             local_output = os.path.join(job_temp_dir, output_filename)
             temp_audio_path = os.path.join(job_temp_dir, "temp_audio.m4a")
 
             # Get encoding parameters from job spec (Pydantic provides defaults)
             encoding = job_spec.output.encoding
+            preview = job_spec.output.preview
+            renditions = job_spec.output.renditions
+            hls = job_spec.output.hls
 
             is_lambda = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None
-
-            final_video.write_videofile(
-                local_output,
-                codec="libx264",
-                audio_codec="aac",
-                preset=encoding.preset if encoding else "medium",
-                bitrate=encoding.bitrate if encoding else None,
-                audio_bitrate=encoding.audio_bitrate if encoding else None,
-                fps=encoding.fps if encoding else None,
-                temp_audiofile=temp_audio_path,
-                remove_temp=True,
-                threads=os.cpu_count() if is_lambda else 6,
-                logger=None if is_lambda else "bar",
-            )
+            threads = os.cpu_count() if is_lambda else 6
+            self.workspace.reserve(job_id, output_estimate, "encoding")
+            if progress:
+                encode_logger = progress.encoder_logger()
+            else:
+                encode_logger = None if is_lambda else "bar"
+
+            audio_source = True
+            if preview or renditions or hls:
+                # Mix audio once; every encode below muxes the same track
+                final_audio.write_audiofile(
+                    temp_audio_path,
+                    fps=44100,
+                    codec="aac",
+                    bitrate=encoding.audio_bitrate if encoding else None,
+                    logger=encode_logger,
+                )
+                audio_source = temp_audio_path
+
+            preview_result = None
+            if preview:
+                preview_result = self._render_preview(
+                    final_video,
+                    preview,
+                    output_filename,
+                    job_temp_dir,
+                    audio_source,
+                    threads,
+                    progress.encoder_logger("preview") if progress else encode_logger,
+                )
+                if preview.finalRender and on_preview:
+                    on_preview(preview_result)
+
+            rendition_results = []
+            if preview and not preview.finalRender:
+                logger.info("Preview only, skipping full-quality render")
+                local_output = preview_result["localOutputPath"]
+                output_filename = preview_result["outputFilename"]
+            elif renditions:
+                rendition_results = self._render_renditions(
+                    final_video,
+                    renditions,
+                    encoding,
+                    output_filename,
+                    job_temp_dir,
+                    audio_source,
+                    threads,
+                    progress,
+                )
+                # The first rendition doubles as the job's primary output
+                local_output = rendition_results[0]["localOutputPath"]
+                output_filename = rendition_results[0]["outputFilename"]
+            elif hls:
+                local_output = self._render_hls(
+                    final_video,
+                    hls,
+                    encoding,
+                    job_temp_dir,
+                    audio_source,
+                    threads,
+                    progress,
+                    hls_publisher,
+                )
+                output_filename = os.path.basename(local_output)
+            else:
+                final_video.write_videofile(
+                    local_output,
+                    codec="libx264",
+                    audio=audio_source,
+                    audio_codec="aac",
+                    preset=encoding.preset if encoding else "medium",
+                    bitrate=encoding.bitrate if encoding else None,
+                    audio_bitrate=encoding.audio_bitrate if encoding else None,
+                    fps=encoding.fps if encoding else None,
+                    temp_audiofile=temp_audio_path,
+                    remove_temp=True,
+                    threads=threads,
+                    logger=encode_logger,
+                )
 
             # Cleanup MoviePy objects before upload to free memory
             video.close()
@@ -191,7 +382,11 @@ class VideoProcessor:
 
             # Return success result with local file path
             processing_time = time.time() - start_time
-            file_size = os.path.getsize(local_output)
+            if hls:
+                # Playlist plus every segment it references
+                file_size = self.workspace.usage_bytes(os.path.dirname(local_output))
+            else:
+                file_size = os.path.getsize(local_output)
 
             return {
                 "success": True,
@@ -202,10 +397,306 @@ class VideoProcessor:
                 "processingTime": processing_time,
                 "error": None,
                 "tempDir": job_temp_dir,
+                "metrics": self._metrics(job_id),
+                "renditions": rendition_results,
             }
         except Exception as e:
             raise e
 
+    def _plan_timeline(
+        self, job_spec, video_path, audio_assets, tts_paths, video_fingerprint=None
+    ):
+        """
+        Lay out the job from probe data alone, before any media is decoded
+
+        Returns the video duration, timeline events (path, start, volume,
+        duration), unmerged ducking ranges and the background playlist laid
+        out by plan_background_tracks (or None). Both backends render from it.
+        """
+        video_duration = self.media_probe.duration(video_path, video_fingerprint)
+        if not video_duration:
+            raise ValueError("Could not determine the input video duration")
+
+        events = []
+        ducking_ranges = []
+        for index, event in enumerate(job_spec.timeline):
+            if event.type == "tts":
+                path = tts_paths[index]
+            else:
+                if event.data.assetId not in audio_assets:
+                    raise ValueError(f"Audio asset {event.data.assetId} not found")
+                path = audio_assets[event.data.assetId]
+            duration = self.media_probe.duration(path)
+            events.append(
+                {
+                    "path": path,
+                    "start": event.start,
+                    "volume": event.data.volume,
+                    "duration": duration,
+                }
+            )
+            if event.data.duckingLevel is not None:
+                ducking_ranges.append(
+                    {
+                        "start": event.start,
+                        "end": event.start + duration,
+                        "ducking_level": event.data.duckingLevel,
+                        "fade_duration": event.data.duckingFadeDuration,
+                    }
+                )
+
+        background = None
+        bg_music = job_spec.backgroundMusic
+        if bg_music:
+            paths = [
+                audio_assets[asset_id]
+                for asset_id in bg_music.playlist
+                if asset_id in audio_assets
+            ]
+            durations = {path: self.media_probe.duration(path) for path in set(paths)}
+            # Tracks without a known duration cannot be laid out
+            paths = [path for path in paths if durations[path]]
+            background = {
+                "tracks": plan_background_tracks(
+                    paths,
+                    durations,
+                    bg_music.loop,
+                    bg_music.crossfadeDuration,
+                    video_duration,
+                ),
+                "volume": bg_music.volume,
+                "crossfade": bg_music.crossfadeDuration,
+            }
+
+        return {
+            "videoDuration": video_duration,
+            "events": events,
+            "duckingRanges": ducking_ranges,
+            "background": background,
+        }
+
+    def _source_fingerprint(self, source, asset_info=None):
+        """Source URI and ETag of the input video, or None if it has no ETag"""
+        try:
+            fingerprint = self.asset_manager.get_asset_fingerprint(source, asset_info)
+        except Exception as e:
+            logger.info(f"No fingerprint for {source}: {e}")
+            return None
+        return f"{source}@{fingerprint}" if fingerprint else None
+
+    def _render_with_ffmpeg(
+        self,
+        job_id,
+        job_spec,
+        plan,
+        video_path,
+        job_temp_dir,
+        start_time,
+        output_estimate,
+        progress=None,
+    ):
+        """Render the job as one ffmpeg filter graph; Python only orchestrates"""
+        video_duration = plan["videoDuration"]
+
+        if progress:
+            progress.start_phase("mixing")
+        output_filename = get_output_filename(job_spec.output)
+        local_output = os.path.join(job_temp_dir, output_filename)
+        is_lambda = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None
+        cmd = build_render_command(
+            video_path,
+            video_duration,
+            local_output,
+            plan["events"],
+            background=plan["background"],
+            ducking_ranges=merge_ducking_ranges(plan["duckingRanges"]),
+            encoding=job_spec.output.encoding,
+            threads=os.cpu_count() if is_lambda else 6,
+        )
+
+        logger.info("Rendering with ffmpeg filter graph...")
+        self.workspace.reserve(job_id, output_estimate, "encoding")
+        if progress:
+            progress.start_phase("encoding_video")
+        run_render(
+            cmd, video_duration, on_progress=progress.update if progress else None
+        )
+
+        return {
+            "success": True,
+            "localOutputPath": local_output,
+            "outputFilename": output_filename,
+            "duration": video_duration,
+            "fileSize": os.path.getsize(local_output),
+            "processingTime": time.time() - start_time,
+            "error": None,
+            "tempDir": job_temp_dir,
+            "metrics": self._metrics(job_id),
+            "renditions": [],
+        }
+
+    def _render_preview(
+        self, final_video, preview, output_filename, job_temp_dir, audio, threads, log
+    ):
+        """Render a downscaled low-bitrate proxy with the final audio mix"""
+        start_time = time.time()
+        stem, _ = os.path.splitext(output_filename)
+        preview_filename = f"{stem}_preview.mp4"
+        preview_path = os.path.join(job_temp_dir, preview_filename)
+
+        logger.info(f"Rendering {preview.height}p preview...")
+        clip = final_video
+        if final_video.h > preview.height:
+            clip = final_video.resized(height=preview.height)
+        clip.write_videofile(
+            preview_path,
+            codec="libx264",
+            audio=audio,
+            preset="ultrafast",
+            bitrate=preview.bitrate,
+            fps=preview.fps,
+            threads=threads,
+            # Even dimensions for yuv420p after scaling
+            ffmpeg_params=["-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2"],
+            logger=log,
+        )
+        if clip is not final_video:
+            clip.close()
+
+        return {
+            "localOutputPath": preview_path,
+            "outputFilename": preview_filename,
+            "duration": final_video.duration,
+            "fileSize": os.path.getsize(preview_path),
+            "processingTime": time.time() - start_time,
+        }
+
+    def _render_renditions(
+        self,
+        final_video,
+        renditions,
+        encoding,
+        output_filename,
+        job_temp_dir,
+        audio,
+        threads,
+        progress=None,
+    ):
+        """Encode every rendition from a single decode and composite pass"""
+        stem, _ = os.path.splitext(output_filename)
+        outputs = [
+            {
+                "height": rendition.height,
+                "bitrate": rendition.bitrate,
+                "preset": rendition.preset
+                or (encoding.preset if encoding else "medium"),
+                "outputFilename": f"{stem}_{rendition.height}p.mp4",
+                "path": os.path.join(job_temp_dir, f"{stem}_{rendition.height}p.mp4"),
+            }
+            for rendition in renditions
+        ]
+
+        if progress:
+            progress.start_phase("encoding_video")
+        write_renditions(
+            final_video,
+            outputs,
+            fps=(encoding.fps if encoding and encoding.fps else final_video.fps),
+            audiofile=audio if isinstance(audio, str) else None,
+            threads=threads,
+            on_progress=progress.update if progress else None,
+        )
+
+        return [
+            {
+                "height": output["height"],
+                "localOutputPath": output["path"],
+                "outputFilename": output["outputFilename"],
+                "fileSize": os.path.getsize(output["path"]),
+            }
+            for output in outputs
+        ]
+
+    def _render_hls(
+        self,
+        final_video,
+        hls,
+        encoding,
+        job_temp_dir,
+        audio,
+        threads,
+        progress=None,
+        hls_publisher=None,
+    ):
+        """Encode to HLS segments, publishing each one as soon as it is closed"""
+        hls_dir = os.path.join(job_temp_dir, "hls")
+        os.makedirs(hls_dir, exist_ok=True)
+        fps = encoding.fps if encoding and encoding.fps else final_video.fps
+        cmd = build_hls_command(
+            final_video.size,
+            fps,
+            audio if isinstance(audio, str) else None,
+            hls_dir,
+            hls.segmentDuration,
+            preset=encoding.preset if encoding else "medium",
+            bitrate=encoding.bitrate if encoding else None,
+            threads=threads,
+        )
+
+        def on_progress(fraction):
+            if progress:
+                progress.update(fraction, "encoding_video")
+            if hls_publisher:
+                hls_publisher.publish(hls_dir)
+
+        logger.info(f"Encoding HLS with {hls.segmentDuration}s segments...")
+        pipe_frames(final_video, cmd, fps, on_progress)
+        if hls_publisher:
+            hls_publisher.publish(hls_dir, final=True)
+        return os.path.join(hls_dir, "index.m3u8")
+
+    def _reserve_download_space(self, job_id, job_spec, asset_info=None):
+        """
+        Reserve space for downloads and return (input_mode, output_estimate)
+
+        Falls back to streaming the input video when downloading it would not
+        fit; raises InsufficientStorageError when even that is not enough.
+        """
+        audio_bytes = sum(
+            self.asset_manager.get_asset_size(asset.source, asset_info) or 0
+            for asset in job_spec.assets.audio
+        )
+        video_bytes = (
+            self.asset_manager.get_asset_size(job_spec.assets.video.source, asset_info)
+            or 0
+        )
+        # Output plus temporary audio track, estimated from the input size
+        factor = float(os.getenv("WORKSPACE_OUTPUT_FACTOR", "1.5"))
+        output_estimate = int(video_bytes * factor)
+        if job_spec.output.renditions:
+            output_estimate *= len(job_spec.output.renditions)
+
+        input_mode = get_input_mode(job_spec.assets.video)
+        if input_mode == "download" and not self.workspace.can_fit(
+            audio_bytes + video_bytes + output_estimate
+        ):
+            logger.warning(
+                f"Input video ({video_bytes / 1e6:.0f} MB) does not fit in "
+                "ephemeral storage, streaming it from the source instead"
+            )
+            input_mode = "stream"
+
+        download_bytes = audio_bytes + (video_bytes if input_mode == "download" else 0)
+        self.workspace.reserve(job_id, download_bytes, "downloading")
+
+        # Refuse now rather than after rendering if the output cannot fit
+        if not self.workspace.can_fit(output_estimate):
+            raise InsufficientStorageError(
+                f"Not enough ephemeral storage for the output "
+                f"(~{output_estimate / 1e6:.0f} MB)"
+            )
+        return input_mode, output_estimate
+
     def _download_audio_assets(self, audio_assets, job_temp_dir):
         """Download all audio assets and return lookup dict"""
         assets = {}
@@ -214,82 +705,32 @@ class VideoProcessor:
             assets[asset.id] = local_path
         return assets
 
-    def _create_background_music(self, bg_music_config, audio_assets, video_duration):
-        """Create background music from playlist with crossfading"""
-        playlist = bg_music_config.playlist
-        volume = bg_music_config.volume
-        background_music_loop = bg_music_config.loop
-        crossfade_duration = bg_music_config.crossfadeDuration
-
-        if not playlist:
-            return None
-
-        # Get audio files from playlist
-        audio_files = []
-        for asset_id in playlist:
-            if asset_id in audio_assets:
-                audio_files.append(audio_assets[asset_id])
-
-        if not audio_files:
+    def _create_background_music(self, background, video_duration):
+        """Create background music from the planned playlist with crossfading"""
+        if not background or not background["tracks"]:
             return None
 
+        crossfade_duration = background["crossfade"]
         background_tracks = []
-        current_duration = 0
-        track_index = 0
-
-        while current_duration < video_duration:
-            # Get next track from playlist (cycle through if loop enabled)
-            if track_index >= len(audio_files):
-                if background_music_loop:
-                    track_index = 0
-                else:
-                    break
+        for track in background["tracks"]:
+            audio_clip = self._load_audio(track["path"])
+            audio_clip = audio_clip.with_volume_scaled(background["volume"])
 
-            audio_path = audio_files[track_index]
-            audio_clip = AudioFileClip(audio_path)
-            audio_clip = audio_clip.with_volume_scaled(volume)
-
-            # Calculate clip duration needed
-            remaining_duration = video_duration - current_duration
-            if audio_clip.duration is None:
-                continue
-
-            clip_duration = min(
-                audio_clip.duration, remaining_duration + crossfade_duration
-            )
-
-            # Trim clip if needed
+            # Trim clip if needed (decoded length can differ from the probe)
+            clip_duration = min(track["duration"], audio_clip.duration)
             if clip_duration < audio_clip.duration:
                 audio_clip = audio_clip.subclipped(0, clip_duration)
 
             # Add crossfade effects
-            if len(background_tracks) > 0:  # Not first track
+            if track["fadeIn"]:
                 audio_clip = audio_clip.with_effects(
                     [afx.AudioFadeIn(crossfade_duration)]
                 )
-                audio_clip = audio_clip.with_start(
-                    current_duration - crossfade_duration
-                )
-            else:
-                audio_clip = audio_clip.with_start(current_duration)
-
-            if current_duration + clip_duration < video_duration:  # Not last track
+            if track["fadeOut"]:
                 audio_clip = audio_clip.with_effects(
                     [afx.AudioFadeOut(crossfade_duration)]
                 )
-
-            background_tracks.append(audio_clip)
-            current_duration += clip_duration - (
-                crossfade_duration if len(background_tracks) > 1 else 0
-            )
-            track_index += 1
-
-            # Break if close enough to target duration
-            if video_duration - current_duration < 1:
-                break
-
-        if not background_tracks:
-            return None
+            background_tracks.append(audio_clip.with_start(track["start"]))
 
         # Create composite and trim to exact duration
         final_audio = CompositeAudioClip(background_tracks)
@@ -298,37 +739,50 @@ class VideoProcessor:
 
         return final_audio
 
-    def _create_tts_clip(self, event, index, job_temp_dir):
+    def _create_tts_clip(self, event, tts_path):
         """Create TTS audio clip"""
-        data = event.data
-        start_time = event.start
-
-        # Get provider config (Pydantic provides defaults)
-        provider = data.provider
-        provider_config = data.providerConfig
-
-        # Extract AWS Polly config
-        voice_id = provider_config.voiceId
-        engine = provider_config.engine
-        language_code = provider_config.languageCode
-        text_type = provider_config.textType
-
-        # Generate TTS with unique filename using timeline index
-        tts_path = os.path.join(job_temp_dir, f"tts_{index}_{start_time}.mp3")
-        self.tts_generator.generate_speech(
-            data.text, tts_path, voice_id, engine, language_code, text_type
-        )
-
-        # Create clip
-        clip = AudioFileClip(tts_path)
-        clip = clip.with_start(start_time)
+        # Raw PCM speech is wrapped straight from memory; anything else (MP3)
+        # goes through the decode cache
+        samples = read_wav(tts_path) if tts_path.endswith(".wav") else None
+        if samples is not None:
+            clip = PCMAudioClip(samples)
+        else:
+            clip = self._load_audio(tts_path)
+        clip = clip.with_start(event.start)
 
         # Apply volume
-        volume = data.volume
+        volume = event.data.volume
         clip = clip.with_volume_scaled(volume)
 
         return clip
 
+    def _synthesize_tts_events(self, timeline, job_temp_dir):
+        """Synthesize every TTS event up front; returns {timeline index: path}"""
+        requests = {}
+        for index, event in enumerate(timeline):
+            if event.type != "tts":
+                continue
+            # Get provider config (Pydantic provides defaults)
+            provider_config = event.data.providerConfig
+            requests[index] = {
+                "text": event.data.text,
+                "provider": event.data.provider,
+                # Unique filename using timeline index
+                "output_path": os.path.join(
+                    job_temp_dir, f"tts_{index}_{event.start}.mp3"
+                ),
+                "voice_id": provider_config.voiceId,
+                "engine": provider_config.engine,
+                "language_code": provider_config.languageCode,
+                "text_type": provider_config.textType,
+            }
+        if not requests:
+            return {}
+
+        # Each provider batches what it can (Polly: short lines sharing a voice)
+        paths = self.tts_generator.generate_batch(list(requests.values()))
+        return dict(zip(requests, paths))
+
     def _create_audio_clip(self, event, audio_assets):
         """Create audio clip from asset"""
         data = event.data
@@ -339,7 +793,7 @@ class VideoProcessor:
             raise ValueError(f"Audio asset {asset_id} not found")
 
         # Create clip
-        clip = AudioFileClip(audio_assets[asset_id])
+        clip = self._load_audio(audio_assets[asset_id])
         clip = clip.with_start(start_time)
 
         # Apply volume
@@ -348,32 +802,17 @@ class VideoProcessor:
 
         return clip
 
+    def _load_audio(self, audio_path):
+        """Load an audio asset from the PCM cache, decoding it at most once"""
+        try:
+            return self.pcm_cache.load(audio_path)
+        except Exception as e:
+            logger.warning(f"PCM cache unavailable for {audio_path}: {e}")
+            return AudioFileClip(audio_path)
+
     def _apply_ducking(self, background_music, ducking_ranges):
         """Apply ducking to background music based on ranges"""
-        # Sort ranges by start time
-        ducking_ranges.sort(key=lambda x: x["start"])
-
-        # Merge overlapping ranges
-        merged_ranges = []
-        if ducking_ranges:
-            current_range = ducking_ranges[0]
-            for next_range in ducking_ranges[1:]:
-                if next_range["start"] <= current_range["end"]:
-                    # Ranges overlap, merge them
-                    current_range["end"] = max(current_range["end"], next_range["end"])
-                    # Use more aggressive ducking level (lower value)
-                    current_range["ducking_level"] = min(
-                        current_range["ducking_level"], next_range["ducking_level"]
-                    )
-                    # Use longer fade duration
-                    current_range["fade_duration"] = max(
-                        current_range["fade_duration"], next_range["fade_duration"]
-                    )
-                else:
-                    # No overlap, add current range and start new one
-                    merged_ranges.append(current_range)
-                    current_range = next_range
-            merged_ranges.append(current_range)
+        merged_ranges = merge_ducking_ranges(ducking_ranges)
 
         # Apply ducking for each merged range
         for range_info in merged_ranges:
@@ -0,0 +1,322 @@
+import os
+import signal
+import shutil
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from app import JobProcessor, RETRY_STATUSES, process_job_message, get_retry_delay
+from video_processor import DEFAULT_TEMP_DIR
+from local_store import get_queue_client
+from scheduler import (
+    JobScheduler,
+    MAX_RECEIVE_MESSAGES,
+    get_lane_queue_urls,
+    receive_by_priority,
+)
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# One JobProcessor per job process, reused across the jobs it runs
+_processor = None
+
+
+def available_cpus():
+    """CPUs this container may use (cgroup quota, else affinity)"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(int(quota) / int(period), 1)
+    except (OSError, ValueError):
+        pass
+    return len(os.sched_getaffinity(0))
+
+
+def available_memory_mb():
+    """Memory this container may use (cgroup limit, else physical memory)"""
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit != "max":
+            return int(limit) // 2**20
+    except (OSError, ValueError):
+        pass
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2**20
+
+
+def get_worker_concurrency():
+    """
+    Jobs to run at once: WORKER_CONCURRENCY, or as many as the container's
+    CPUs, memory and scratch disk fit at WORKER_JOB_CPUS, WORKER_JOB_MEMORY_MB
+    and WORKER_JOB_DISK_MB per job (defaults match the Lambda function)
+    """
+    configured = int(os.getenv("WORKER_CONCURRENCY", "0"))
+    if configured > 0:
+        return configured
+    by_cpu = available_cpus() / float(os.getenv("WORKER_JOB_CPUS", "2"))
+    by_memory = available_memory_mb() / int(os.getenv("WORKER_JOB_MEMORY_MB", "3008"))
+    by_disk = shutil.disk_usage(DEFAULT_TEMP_DIR).free / 2**20
+    by_disk /= int(os.getenv("WORKER_JOB_DISK_MB", "10240"))
+    return max(1, int(min(by_cpu, by_memory, by_disk)))
+
+
+def _init_job_process():
+    global _processor
+    # SIGTERM is for the parent; running jobs finish during its grace period
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _processor = JobProcessor()
+
+
+def _run_job(body):
+    return process_job_message(_processor, body)
+
+
+class QueueWorker:
+    """
+    Long-running consumer of the jobs queue for container deployments
+
+    Runs process_single_job, the same code path as the Lambda handler, in a
+    pool of job processes sized by get_worker_concurrency, so jobs are not
+    bound by Lambda's 15 minute, 10 GB storage or 3 GB memory limits. The
+    main process polls the interactive lane before the batch lane, keeps up
+    to WORKER_PREFETCH interactive messages ready, and extends the visibility
+    of every held message while it waits or renders. Each free slot gets the
+    held job JobScheduler ranks first (interactive, least-served project,
+    shortest estimate).
+
+    On SIGTERM it stops polling, hands prefetched messages back to the queue
+    and waits up to WORKER_SHUTDOWN_GRACE_SECONDS for running jobs; messages
+    of jobs still running after that become visible again for another worker.
+    """
+
+    def __init__(self, queue_url=None, concurrency=None, prefetch=None):
+        lanes = get_lane_queue_urls(queue_url)
+        self.queue_urls = list(dict.fromkeys([lanes["interactive"], lanes["batch"]]))
+        self.concurrency = concurrency or get_worker_concurrency()
+        self.prefetch = (
+            prefetch if prefetch is not None else int(os.getenv("WORKER_PREFETCH", "1"))
+        )
+        self.visibility_timeout = int(os.getenv("WORKER_VISIBILITY_TIMEOUT", "300"))
+        self.shutdown_grace = float(os.getenv("WORKER_SHUTDOWN_GRACE_SECONDS", "100"))
+        self.sqs = get_queue_client(region_name=os.getenv("APP_AWS_REGION"))
+        self.scheduler = JobScheduler()
+
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._finished = threading.Event()
+        self._held = {}
+        self._waiting = []
+        self._running = {}
+        self._executor = None
+        self._pool_broken = False
+
+    def run(self):
+        """Process jobs until SIGTERM or SIGINT"""
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+        self._executor = self._create_executor()
+        logger.info(
+            f"Worker started on {', '.join(self.queue_urls)}: {self.concurrency} "
+            f"concurrent jobs, {self.prefetch} prefetched, "
+            f"{self.visibility_timeout}s visibility"
+        )
+
+        extender = threading.Thread(target=self._extend_visibility, daemon=True)
+        extender.start()
+        self._poll()
+        self._shutdown()
+
+    def stop(self):
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def _on_signal(self, signum, frame):
+        logger.info(f"Received {signal.Signals(signum).name}, shutting down")
+        self.stop()
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.concurrency,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_job_process,
+        )
+
+    def _poll(self):
+        capacity = self.concurrency + self.prefetch
+        while not self._stopping.is_set():
+            with self._condition:
+                while len(self._held) >= capacity and not self._stopping.is_set():
+                    self._condition.wait()
+                wanted = capacity - len(self._held)
+                # Only interactive jobs are prefetched; batch jobs are taken
+                # when a slot is free, so they cannot block a later short job
+                free_slots = max(self.concurrency - len(self._held), 0)
+            if self._stopping.is_set():
+                return
+
+            try:
+                messages = receive_by_priority(
+                    self.sqs,
+                    self.queue_urls,
+                    wanted,
+                    self.visibility_timeout,
+                    lower_lane_max=free_slots,
+                )
+            except Exception as e:
+                logger.warning(f"Receiving job messages failed: {e}")
+                self._stopping.wait(5)
+                continue
+
+            with self._condition:
+                for message in messages:
+                    self._held[message["ReceiptHandle"]] = message
+                    self._waiting.append(message)
+                blocked = self._start_waiting()
+            self._release_blocked(blocked)
+
+    def _start_waiting(self):
+        """
+        Hand prefetched messages to free job processes (holding the lock)
+
+        Returns the messages to hand back because their projects are at
+        their caps; the caller releases them once the lock is dropped, so
+        SQS calls never block the scheduler.
+        """
+        if self._pool_broken:
+            # A job process died (e.g. out of memory); start a fresh pool
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            self._pool_broken = False
+        while (
+            self._waiting
+            and len(self._running) < self.concurrency
+            and not self._stopping.is_set()
+        ):
+            message = self.scheduler.pick(
+                self._waiting, [m["Scheduling"] for m in self._running.values()]
+            )
+            if message is None:
+                # Every waiting job's project is at its cap; hand them back
+                # so this worker can take other projects' jobs meanwhile
+                blocked = list(self._waiting)
+                self._waiting.clear()
+                return blocked
+            self._waiting.remove(message)
+            future = self._executor.submit(_run_job, message["Body"])
+            self._running[future] = message
+            future.add_done_callback(self._on_job_done)
+        return []
+
+    def _release_blocked(self, blocked):
+        """Hand back messages _start_waiting could not run (without the lock)"""
+        for message in blocked:
+            self._release(message, get_retry_delay())
+
+    def _on_job_done(self, future):
+        with self._condition:
+            message = self._running.pop(future)
+
+        retry = True
+        try:
+            job_id, result = future.result()
+            retry = result["status"] in RETRY_STATUSES
+            logger.info(f"Job {job_id} finished: {result['status']}")
+        except BrokenProcessPool:
+            logger.error(f"Job process died running message {message['MessageId']}")
+            self._pool_broken = True
+        except Exception as e:
+            logger.error(f"Message {message['MessageId']} failed: {e}")
+
+        try:
+            if retry:
+                self._change_visibility(message, get_retry_delay())
+            else:
+                self.sqs.delete_message(
+                    QueueUrl=message["QueueUrl"],
+                    ReceiptHandle=message["ReceiptHandle"],
+                )
+        except Exception as e:
+            logger.warning(f"Could not settle message {message['MessageId']}: {e}")
+
+        with self._condition:
+            self._held.pop(message["ReceiptHandle"], None)
+            blocked = self._start_waiting()
+            self._condition.notify_all()
+        self._release_blocked(blocked)
+
+    def _extend_visibility(self):
+        """Keep held messages invisible while they wait or render"""
+        interval = max(self.visibility_timeout / 3, 1)
+        while not self._finished.wait(interval):
+            with self._condition:
+                held = list(self._held.values())
+            for queue_url in self.queue_urls:
+                messages = [m for m in held if m["QueueUrl"] == queue_url]
+                self._extend_batches(queue_url, messages)
+
+    def _extend_batches(self, queue_url, messages):
+        for start in range(0, len(messages), MAX_RECEIVE_MESSAGES):
+            batch = messages[start : start + MAX_RECEIVE_MESSAGES]
+            try:
+                self.sqs.change_message_visibility_batch(
+                    QueueUrl=queue_url,
+                    Entries=[
+                        {
+                            "Id": str(n),
+                            "ReceiptHandle": message["ReceiptHandle"],
+                            "VisibilityTimeout": self.visibility_timeout,
+                        }
+                        for n, message in enumerate(batch)
+                    ],
+                )
+            except Exception as e:
+                logger.warning(f"Extending message visibility failed: {e}")
+
+    def _shutdown(self):
+        with self._condition:
+            waiting = list(self._waiting)
+            self._waiting.clear()
+            running = list(self._running)
+        for message in waiting:
+            self._release(message)
+        logger.info(
+            f"Returned {len(waiting)} prefetched messages, waiting up to "
+            f"{self.shutdown_grace:.0f}s for {len(running)} running jobs"
+        )
+
+        _, unfinished = wait(running, timeout=self.shutdown_grace)
+        with self._condition:
+            abandoned = [self._running[f] for f in unfinished if f in self._running]
+        for message in abandoned:
+            self._release(message)
+        if abandoned:
+            logger.warning(f"Released {len(abandoned)} jobs still running at shutdown")
+        self._finished.set()
+        self._executor.shutdown(wait=not abandoned, cancel_futures=True)
+        logger.info("Worker stopped")
+
+    def _release(self, message, delay=0):
+        """Make a message visible to other workers, right away by default"""
+        with self._condition:
+            self._held.pop(message["ReceiptHandle"], None)
+        try:
+            self._change_visibility(message, delay)
+        except Exception as e:
+            logger.warning(f"Could not release message {message['MessageId']}: {e}")
+
+    def _change_visibility(self, message, timeout):
+        self.sqs.change_message_visibility(
+            QueueUrl=message["QueueUrl"],
+            ReceiptHandle=message["ReceiptHandle"],
+            VisibilityTimeout=timeout,
+        )
+
+
+if __name__ == "__main__":
+    QueueWorker().run()
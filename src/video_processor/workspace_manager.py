@@ -0,0 +1,151 @@
+import os
+import shutil
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+class InsufficientStorageError(ValueError):
+    """Raised when a job phase cannot fit in ephemeral storage"""
+
+
+class WorkspaceManager:
+    """
+    Tracks ephemeral storage used by job workspaces
+
+    Each job reserves the space it expects to need before a phase starts.
+    Reservations are shared by every WorkspaceManager in the process so
+    concurrent jobs cannot overcommit the same disk. Workspaces carry a
+    marker file with the owning PID so orphans left by failed cleanups can
+    be swept safely.
+    """
+
+    MARKER = ".autovid-workspace"
+
+    _lock = threading.Lock()
+    _reservations = {}
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.headroom = int(os.getenv("WORKSPACE_HEADROOM_BYTES", str(256 << 20)))
+
+    def create(self, job_id):
+        """Create the job workspace and register it as active"""
+        job_dir = os.path.join(self.root_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        with open(os.path.join(job_dir, self.MARKER), "w") as f:
+            f.write(str(os.getpid()))
+        with self._lock:
+            self._reservations.setdefault(job_id, {"dir": job_dir, "bytes": 0})
+        return job_dir
+
+    def track_cache(self, cache_dir, max_bytes):
+        """
+        Count a shared cache directory against the budget up to its size cap
+
+        Space the cache may still grow into is held like an outstanding job
+        reservation. Caches on another filesystem are not counted.
+        """
+        try:
+            if os.stat(cache_dir).st_dev != os.stat(self.root_dir).st_dev:
+                return
+        except OSError:
+            return
+        with self._lock:
+            self._reservations[f"cache:{cache_dir}"] = {
+                "dir": cache_dir,
+                "bytes": max_bytes,
+            }
+
+    def release(self, job_id):
+        with self._lock:
+            self._reservations.pop(job_id, None)
+
+    def free_bytes(self):
+        return shutil.disk_usage(self.root_dir).free
+
+    def available_bytes(self):
+        """Free space minus what active jobs have reserved but not yet written"""
+        with self._lock:
+            reservations = list(self._reservations.values())
+        outstanding = sum(
+            max(0, r["bytes"] - self.usage_bytes(r["dir"])) for r in reservations
+        )
+        return self.free_bytes() - outstanding - self.headroom
+
+    def can_fit(self, nbytes):
+        return nbytes <= self.available_bytes()
+
+    def reserve(self, job_id, nbytes, phase):
+        """Reserve space for a phase or raise InsufficientStorageError"""
+        available = self.available_bytes()
+        if nbytes > available:
+            raise InsufficientStorageError(
+                f"Not enough ephemeral storage for {phase}: needs "
+                f"{nbytes / 1e6:.0f} MB, {max(available, 0) / 1e6:.0f} MB available"
+            )
+        with self._lock:
+            self._reservations.setdefault(
+                job_id, {"dir": os.path.join(self.root_dir, job_id), "bytes": 0}
+            )["bytes"] += nbytes
+        logger.info(f"Reserved {nbytes / 1e6:.0f} MB for {phase} of job {job_id}")
+
+    def usage_bytes(self, job_dir):
+        total = 0
+        for dirpath, _, filenames in os.walk(job_dir):
+            for filename in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return total
+
+    def metrics(self, job_id):
+        """Storage metrics for the job record"""
+        with self._lock:
+            reservation = self._reservations.get(job_id, {})
+        job_dir = reservation.get("dir", os.path.join(self.root_dir, job_id))
+        return {
+            "tmpFreeBytes": self.free_bytes(),
+            "tmpReservedBytes": reservation.get("bytes", 0),
+            "tmpUsedBytes": self.usage_bytes(job_dir),
+        }
+
+    def sweep_orphans(self):
+        """Remove workspaces left behind by jobs that are no longer running"""
+        if not os.path.isdir(self.root_dir):
+            return
+        with self._lock:
+            active = set(self._reservations)
+
+        for entry in os.listdir(self.root_dir):
+            job_dir = os.path.join(self.root_dir, entry)
+            marker = os.path.join(job_dir, self.MARKER)
+            if entry in active or not os.path.isfile(marker):
+                continue
+            try:
+                with open(marker) as f:
+                    pid = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                pid = 0
+            if pid and pid != os.getpid() and _pid_alive(pid):
+                continue
+
+            freed = self.usage_bytes(job_dir)
+            shutil.rmtree(job_dir, ignore_errors=True)
+            logger.info(
+                f"Swept orphaned workspace {job_dir} ({freed / 1e6:.0f} MB freed)"
+            )
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
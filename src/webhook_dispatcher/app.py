@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from job_spec_models import WebhookConfig
+from webhook_notifier import WebhookNotifier
+from rate_limiter import limiter_metrics
+
+level = os.getenv("LOG_LEVEL", "INFO").upper()
+logging.basicConfig(
+    level=getattr(logging, level),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+logger.setLevel(level)
+
+# Time kept back from the Lambda timeout to report the batch result
+DEADLINE_MARGIN_SECONDS = 5
+
+# Module-level so the pooled session survives warm invocations
+webhook_notifier = WebhookNotifier()
+
+
+def lambda_handler(event, context):
+    """
+    Deliver queued webhook notifications, reporting retryable failures to SQS
+
+    Requests are cut short before the function times out, so a batch of
+    slow endpoints reports its unfinished records as failures instead of
+    timing out and redelivering webhooks that were already sent.
+    """
+    records = event["Records"]
+    concurrency = int(os.getenv("WEBHOOK_DISPATCH_CONCURRENCY", "10"))
+    deadline = None
+    if context is not None:
+        remaining = context.get_remaining_time_in_millis() / 1000
+        deadline = time.monotonic() + remaining - DEADLINE_MARGIN_SECONDS
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(records) or 1)) as pool:
+        results = list(pool.map(lambda r: deliver_record(r, deadline), records))
+
+    # Failed items are redelivered by SQS after the visibility timeout and
+    # end up in the dead letter queue after maxReceiveCount attempts
+    failures = [
+        {"itemIdentifier": record["messageId"]}
+        for record, delivered in zip(records, results)
+        if not delivered
+    ]
+    logger.info(f"Webhook rate limits: {json.dumps(limiter_metrics())}")
+    return {"batchItemFailures": failures}
+
+
+def deliver_record(record, deadline=None):
+    """Deliver one outbox message; returns False only when it should be retried"""
+    try:
+        message = json.loads(record["body"])
+        webhook_config = WebhookConfig.model_validate(message["webhook"])
+        payload = message["payload"]
+    except Exception as e:
+        logger.error(f"Dropping malformed webhook message {record['messageId']}: {e}")
+        return True
+
+    attempt = int(record.get("attributes", {}).get("ApproximateReceiveCount", "1")) - 1
+    result = webhook_notifier.attempt_delivery(
+        webhook_config, payload, attempt, deadline
+    )
+
+    if result is False:
+        logger.error(
+            f"Webhook for job {payload.get('jobId')} failed permanently, not retrying"
+        )
+    # Delivered and permanently rejected messages are both acknowledged
+    return result is not None
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# Usage: python test_asset_preflight.py
+# Checks submit-time asset HEAD checks against a local HTTP server and the
+# directory-backed S3 stand-in
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append("layers/shared")
+
+SOURCE = "./media/inputs/explainer_video.mp4"
+HEAD_DELAY = 0.2
+
+
+class HeadHandler(BaseHTTPRequestHandler):
+    """Answers HEAD by path: /ok-*, /missing, /private or /nohead"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        time.sleep(HEAD_DELAY)
+        status = {"/missing": 404, "/private": 403, "/nohead": 405}.get(self.path, 200)
+        self.send_response(status)
+        if status == 200:
+            self.send_header("Content-Length", "1234")
+            self.send_header("ETag", '"v1"')
+        self.end_headers()
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HeadHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def test_preflight(base_url):
+    """Missing and denied assets are errors; unverifiable ones are skipped"""
+    from asset_manager import AssetManager
+    from asset_preflight import preflight_assets
+
+    asset_manager = AssetManager()
+    os.makedirs(os.path.join(os.environ["S3_LOCAL_ROOT"], "bucket"))
+    shutil.copy(SOURCE, os.path.join(os.environ["S3_LOCAL_ROOT"], "bucket", "in.mp4"))
+    sources = [
+        "s3://bucket/in.mp4",
+        SOURCE,
+        f"{base_url}/ok-1",
+        f"{base_url}/nohead",
+        "s3://bucket/gone.mp4",
+        "./media/missing.wav",
+        f"{base_url}/missing",
+        f"{base_url}/private",
+    ]
+    assets, errors = preflight_assets(asset_manager, sources)
+    assert sorted(assets) == sorted(sources[:3]), assets
+    assert assets[f"{base_url}/ok-1"] == {
+        "size": 1234,
+        "etag": "v1",
+        "ranges": False,
+    }, assets
+    assert assets["s3://bucket/in.mp4"]["ranges"], assets
+    assert assets[SOURCE]["size"] == os.path.getsize(SOURCE)
+    assert len(assets["s3://bucket/in.mp4"]["etag"]) == 32
+    assert errors == [
+        "s3://bucket/gone.mp4: not found",
+        "./media/missing.wav: not found",
+        f"{base_url}/missing: not found (HTTP 404)",
+        f"{base_url}/private: access denied (HTTP 403)",
+    ], errors
+    print(f"✅ Preflight errors: {errors}")
+
+    urls = [f"{base_url}/ok-{n}" for n in range(16)]
+    started = time.monotonic()
+    assets, errors = preflight_assets(asset_manager, urls)
+    elapsed = time.monotonic() - started
+    assert len(assets) == 16 and not errors
+    assert elapsed < 4 * HEAD_DELAY, elapsed
+    print(f"✅ 16 HEADs in {elapsed:.2f}s ({16 * HEAD_DELAY:.1f}s sequentially)")
+
+
+def test_known_assets():
+    """Preflight sizes and ETags stand in for the processor's HEAD requests"""
+    from asset_manager import AssetManager
+
+    asset_manager = AssetManager()
+    uri = "s3://bucket/in.mp4"
+    asset_info = {uri: {"size": 42, "etag": "abc"}}
+    assert asset_manager.get_asset_size(uri, asset_info) == 42
+    assert asset_manager.get_asset_fingerprint(uri, asset_info) == "abc"
+    assert not asset_manager.storage_metrics()
+    assert asset_manager.get_asset_size(uri) == os.path.getsize(SOURCE)
+    print("✅ Known sizes and ETags skip HEAD requests")
+
+
+def test_submit(base_url, temp_dir):
+    """submit_job rejects bad specs and stores sizes and ETags on the job"""
+    from local_runtime import load_handler
+    from local_store import LocalQueueClient
+    from job_manager import get_job_manager
+
+    os.environ["LOCAL_RUNTIME_DB"] = os.path.join(temp_dir, "runtime.db")
+    os.environ["SQS_JOB_QUEUE_URL"] = "jobs"
+    os.environ["ASSET_PREFLIGHT"] = "true"
+    try:
+        submit = load_handler("submit_job")
+        spec = {
+            "assets": {
+                "video": {"id": "main", "source": "s3://bucket/in.mp4"},
+                "audio": [{"id": "music", "source": f"{base_url}/missing"}],
+            },
+            "timeline": [],
+            "output": {"filename": "preflight.mp4"},
+        }
+        response = submit({"body": json.dumps(spec)}, None)
+        body = json.loads(response["body"])
+        assert response["statusCode"] == 400, body
+        assert "/missing: not found" in body["error"], body
+        assert not LocalQueueClient().receive_message(QueueUrl="jobs").get("Messages")
+        print(f"✅ Rejected at submit: {body['error']}")
+
+        spec["assets"]["audio"][0]["source"] = f"{base_url}/ok-music"
+        response = submit({"body": json.dumps(spec)}, None)
+        body = json.loads(response["body"])
+        assert response["statusCode"] == 200, body
+        assert body["assetInfo"][f"{base_url}/ok-music"]["size"] == 1234, body
+        record = get_job_manager().get_job(body["jobId"])
+        assert record["assetInfo"] == body["assetInfo"], record
+        message = LocalQueueClient().receive_message(QueueUrl="jobs")["Messages"][0]
+        assert json.loads(message["Body"])["assetInfo"] == body["assetInfo"]
+        print("✅ Sizes and ETags stored on the job and its queue message")
+    finally:
+        for key in ("LOCAL_RUNTIME_DB", "SQS_JOB_QUEUE_URL", "ASSET_PREFLIGHT"):
+            del os.environ[key]
+
+
+if __name__ == "__main__":
+    server, base_url = start_server()
+    root = tempfile.mkdtemp()
+    os.environ["S3_LOCAL_ROOT"] = root
+    try:
+        test_preflight(base_url)
+        test_known_assets()
+        test_submit(base_url, root)
+    except AssertionError as e:
+        print(f"❌ Asset preflight check failed: {e}")
+        sys.exit(1)
+    finally:
+        server.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# Usage: python test_cost_model.py
+# Checks the submit-time cost model, limits and large-job routing offline
+import os
+import sys
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append("layers/shared")
+
+from asset_manager import AssetManager  # noqa: E402
+from media_header import read_media_info  # noqa: E402
+from job_spec_models import JobSpec  # noqa: E402
+from asset_preflight import preflight_assets  # noqa: E402
+from cost_model import (  # noqa: E402
+    estimate_job,
+    estimate_resources,
+    exceeded_limits,
+    fit_calibration,
+    get_limits,
+)
+
+SOURCE = "./media/inputs/explainer_video.mp4"
+SPEC = {
+    "assets": {"video": {"id": "main", "source": SOURCE}, "audio": []},
+    "timeline": [],
+    "output": {"filename": "estimate.mp4", "encoding": {"preset": "ultrafast"}},
+}
+
+
+def features(**overrides):
+    base = {
+        "duration": 60,
+        "width": 1920,
+        "height": 1080,
+        "fps": 30,
+        "codec": "avc1",
+        "preset": "medium",
+        "renderer": "ffmpeg",
+        "inputBytes": 100e6,
+        "audioAssets": 1,
+        "ttsEvents": 0,
+        "ttsChars": 0,
+        "renditions": [],
+        "previewHeight": None,
+        "finalRender": True,
+    }
+    return dict(base, **overrides)
+
+
+def test_media_header():
+    """Duration, resolution, fps and codecs come from the MP4 header alone"""
+    info = read_media_info(AssetManager(), SOURCE)
+    assert abs(info["duration"] - 58.08) < 0.1, info
+    assert (info["width"], info["height"]) == (640, 360), info
+    assert abs(info["fps"] - 25) < 0.1, info
+    assert (info["videoCodec"], info["audioCodec"]) == ("avc1", "mp4a"), info
+    assert read_media_info(AssetManager(), "./media/assets/sfx/cheers.wav") is None
+    print(f"✅ MP4 header probe: {info}")
+
+
+with open(SOURCE, "rb") as source_file:
+    # A 40+ MB input, so reading it whole would stand out from socket buffering
+    LARGE_BODY = source_file.read() * 20
+
+
+class NoRangeHandler(BaseHTTPRequestHandler):
+    """Serves LARGE_BODY whole, ignoring Range, and counts the bytes it sends"""
+
+    bytes_sent = 0
+    heads = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        NoRangeHandler.heads += 1
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(LARGE_BODY)))
+        self.end_headers()
+
+    def do_GET(self):
+        body = LARGE_BODY
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            for offset in range(0, len(body), 65536):
+                self.wfile.write(body[offset : offset + 65536])
+                NoRangeHandler.bytes_sent += len(body[offset : offset + 65536])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def test_no_range_server():
+    """Servers ignoring Range are never read whole; the estimate uses size"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), NoRangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/video.mp4"
+    try:
+        asset_manager = AssetManager()
+        assert asset_manager.read_range(url, 1000, 1099) == LARGE_BODY[1000:1100]
+        assert (
+            NoRangeHandler.bytes_sent < len(LARGE_BODY) / 4
+        ), NoRangeHandler.bytes_sent
+
+        NoRangeHandler.bytes_sent = 0
+        assets = dict(SPEC["assets"], video={"id": "main", "source": url})
+        spec = JobSpec(**dict(SPEC, assets=assets))
+        estimate = estimate_job(spec, asset_manager)
+        assert estimate and estimate["features"]["inputBytes"] > 0, estimate
+        assert NoRangeHandler.bytes_sent == 0, NoRangeHandler.bytes_sent
+
+        # The preflight's HEAD answers (range support included) are reused
+        asset_info, _ = preflight_assets(asset_manager, [url])
+        NoRangeHandler.heads = 0
+        reused = estimate_job(spec, asset_manager, asset_info)
+        assert reused["renderSeconds"] == estimate["renderSeconds"], reused
+        assert NoRangeHandler.heads == 0, NoRangeHandler.heads
+    finally:
+        server.shutdown()
+    print(f"✅ No range support: size-only estimate {estimate['renderSeconds']}s")
+
+
+def test_estimates():
+    """Estimates grow with duration, resolution, preset and renderer"""
+    base = estimate_resources(features(), calibration={})
+    longer = estimate_resources(features(duration=120), calibration={})
+    uhd = estimate_resources(features(width=3840, height=2160), calibration={})
+    slow = estimate_resources(features(preset="veryslow"), calibration={})
+    moviepy = estimate_resources(features(renderer="moviepy"), calibration={})
+    assert longer["renderSeconds"] > base["renderSeconds"]
+    assert uhd["renderSeconds"] > 3 * base["renderSeconds"] - 20
+    assert uhd["memoryMb"] > base["memoryMb"]
+    assert slow["renderSeconds"] > base["renderSeconds"]
+    assert moviepy["renderSeconds"] > base["renderSeconds"]
+    assert longer["diskMb"] > base["diskMb"]
+    print(f"✅ 1080p60s medium: {base}, 4K: {uhd}")
+
+    feature_film = estimate_resources(
+        features(duration=7200, width=3840, height=2160, renderer="moviepy"),
+        calibration={},
+    )
+    assert exceeded_limits(feature_film, get_limits("standard"))
+    assert exceeded_limits(feature_film, get_limits("hard"))
+    assert not exceeded_limits(base, get_limits("standard"))
+    print(f"✅ Limits: 2h 4K MoviePy render {feature_film}")
+
+    scaled = estimate_resources(features(), calibration={"ffmpeg/medium": 2.0})
+    assert abs(scaled["renderSeconds"] - 2 * base["renderSeconds"]) < 0.2
+    print("✅ Calibration factors scale render time")
+
+
+def test_fit_calibration():
+    """Factors are median actual/estimated ratios per renderer/preset"""
+    sample = features()
+    predicted = estimate_resources(sample, calibration={})["renderSeconds"]
+    records = [
+        {
+            "status": "completed",
+            "processingTime": predicted * ratio,
+            "estimate": {"features": sample},
+        }
+        for ratio in (1.4, 1.5, 1.6)
+    ]
+    records.append({"status": "completed", "processingTime": 0.1, "renderCache": "hit"})
+    calibration = fit_calibration(records)
+    assert abs(calibration["ffmpeg/medium"] - 1.5) < 0.01, calibration
+    assert fit_calibration(records[:2]) == {}
+    print(f"✅ Fitted calibration {calibration}")
+
+
+def test_submit_routing():
+    """submit_job rejects jobs over hard limits and routes oversized ones"""
+    from local_runtime import load_handler
+    from local_store import LocalQueueClient
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.environ["LOCAL_RUNTIME_DB"] = os.path.join(temp_dir, "runtime.db")
+        os.environ["SQS_JOB_QUEUE_URL"] = "standard"
+        submit = load_handler("submit_job")
+        queue = LocalQueueClient()
+
+        def submit_job(**env):
+            os.environ.update(env)
+            try:
+                response = submit({"body": json.dumps(SPEC)}, None)
+            finally:
+                for key in env:
+                    del os.environ[key]
+            return response["statusCode"], json.loads(response["body"])
+
+        status, body = submit_job()
+        assert status == 200 and body["estimate"]["queue"] == "standard", body
+        assert body["estimate"]["estimatedCompletionAt"]
+        print(f"✅ Submit returns estimate {body['estimate']['renderSeconds']}s")
+
+        status, body = submit_job(MAX_JOB_RENDER_SECONDS="1")
+        assert status == 400 and "renderSeconds" in body["error"], body
+        print(f"✅ Rejected: {body['error']}")
+
+        status, body = submit_job(
+            STANDARD_MAX_RENDER_SECONDS="1", SQS_LARGE_JOB_QUEUE_URL="large"
+        )
+        assert status == 200 and body["estimate"]["queue"] == "large", body
+        assert queue.receive_message(QueueUrl="large")["Messages"]
+        status, body = submit_job(STANDARD_MAX_RENDER_SECONDS="1")
+        assert body["estimate"]["queue"] == "standard", body
+        print("✅ Oversized jobs routed to the large-job queue when configured")
+        del os.environ["LOCAL_RUNTIME_DB"]
+
+
+if __name__ == "__main__":
+    try:
+        test_media_header()
+        test_no_range_server()
+        test_estimates()
+        test_fit_calibration()
+        test_submit_routing()
+    except AssertionError as e:
+        print(f"❌ Cost model check failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Usage: python test_ffmpeg_backend.py
+# Renders the same job with the MoviePy and ffmpeg backends and compares them
+import os
+import sys
+import shutil
+import subprocess
+import numpy as np
+
+sys.path.append("src/video_processor")
+sys.path.append("layers/shared")
+
+from moviepy.config import FFMPEG_BINARY
+from video_processor import VideoProcessor
+from job_spec_models import JobSpec
+
+SPEC = {
+    "assets": {
+        "video": {"id": "main", "source": "./media/inputs/api_demo_video.mp4"},
+        "audio": [
+            {"id": "swoosh", "source": "./media/assets/sfx/swoosh-6-351021.mp3"},
+            {"id": "cheers", "source": "./media/assets/sfx/cheers.wav"},
+        ],
+    },
+    "backgroundMusic": {
+        "playlist": ["cheers"],
+        "loop": True,
+        "volume": 0.3,
+        "crossfadeDuration": 1.0,
+    },
+    "timeline": [
+        {
+            "start": 1,
+            "type": "audio",
+            "data": {"assetId": "swoosh", "duckingLevel": 0.3},
+        },
+        {"start": 6, "type": "audio", "data": {"assetId": "swoosh", "volume": 0.8}},
+        {
+            "start": 9,
+            "type": "audio",
+            "data": {
+                "assetId": "cheers",
+                "duckingLevel": 0.5,
+                "duckingFadeDuration": 0,
+            },
+        },
+    ],
+    "output": {"filename": "backend.mp4", "encoding": {"preset": "ultrafast"}},
+}
+
+
+def render(backend, temp_dir):
+    spec = dict(SPEC, output=dict(SPEC["output"], renderer=backend))
+    processor = VideoProcessor(temp_dir=temp_dir)
+    result = processor.process_video_job(f"backend-{backend}", JobSpec(**spec))
+    assert result["success"], result["error"]
+    return result
+
+
+def decode_audio(path):
+    raw = subprocess.run(
+        [FFMPEG_BINARY, "-v", "error", "-i", path, "-f", "f32le", "-ac", "2"]
+        + ["-ar", "44100", "-"],
+        capture_output=True,
+        check=True,
+    ).stdout
+    return np.frombuffer(raw, dtype=np.float32).reshape(-1, 2)
+
+
+def decode_frame(path, t):
+    raw = subprocess.run(
+        [FFMPEG_BINARY, "-v", "error", "-ss", str(t), "-i", path, "-frames:v", "1"]
+        + ["-f", "rawvideo", "-pix_fmt", "gray", "-"],
+        capture_output=True,
+        check=True,
+    ).stdout
+    return np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
+
+
+def envelope(samples, window=4410):
+    """RMS per 100 ms window"""
+    n = len(samples) // window
+    blocks = samples[: n * window].reshape(n, window, -1)
+    return np.sqrt((blocks**2).mean(axis=(1, 2)))
+
+
+def test_backend_equivalence():
+    """ffmpeg filter-graph output matches the MoviePy render"""
+    temp_dir = "./tmp_backend_test"
+    try:
+        moviepy_result = render("moviepy", temp_dir)
+        ffmpeg_result = render("ffmpeg", temp_dir)
+        print(
+            f"   MoviePy {moviepy_result['processingTime']:.1f}s, "
+            f"ffmpeg {ffmpeg_result['processingTime']:.1f}s"
+        )
+
+        reference = decode_audio(moviepy_result["localOutputPath"])
+        candidate = decode_audio(ffmpeg_result["localOutputPath"])
+        length_diff = abs(len(reference) - len(candidate)) / 44100
+        print(f"   Audio length difference: {length_diff:.3f}s")
+        assert length_diff < 0.1
+
+        ref_env = envelope(reference)
+        cand_env = envelope(candidate)
+        n = min(len(ref_env), len(cand_env))
+        correlation = np.corrcoef(ref_env[:n], cand_env[:n])[0, 1]
+        level_error = np.abs(ref_env[:n] - cand_env[:n]).mean() / ref_env[:n].mean()
+        print(
+            f"   Audio envelope correlation: {correlation:.4f}, "
+            f"mean level error: {level_error:.1%}"
+        )
+        assert correlation > 0.98
+        assert level_error < 0.05
+
+        for t in (0.5, 7.0, 13.0):
+            diff = np.abs(
+                decode_frame(moviepy_result["localOutputPath"], t)
+                - decode_frame(ffmpeg_result["localOutputPath"], t)
+            ).mean()
+            print(f"   Frame at {t}s mean abs difference: {diff:.2f}")
+            assert diff < 4
+
+        print("✅ ffmpeg backend matches MoviePy output")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    try:
+        test_backend_equivalence()
+    except AssertionError as e:
+        print(f"❌ Backends differ {e}")
+        sys.exit(1)
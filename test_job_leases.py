@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# Usage: python test_job_leases.py
+# Checks job leases, the lease heartbeat and lease-conditional completion
+# writes against the SQLite job store (no AWS needed)
+import os
+import sys
+import time
+import tempfile
+from types import SimpleNamespace
+
+sys.path.append("src/video_processor")
+sys.path.append("layers/shared")
+
+# Renewed every second, so takeovers are noticed quickly
+os.environ["JOB_LEASE_SECONDS"] = "3"
+
+from job_manager import LeaseHeartbeat  # noqa: E402
+from local_store import LocalJobManager  # noqa: E402
+from app import process_single_job  # noqa: E402
+
+SPEC = {
+    "assets": {"video": {"id": "main", "source": "s3://bucket/in.mp4"}, "audio": []},
+    "timeline": [],
+    "output": {"filename": "lease.mp4", "destination": "s3://bucket/out/"},
+}
+
+
+def take_over(jobs, job_id, owner="other-worker"):
+    """Another worker takes the lease, as after an expiry"""
+    jobs._update(job_id, lambda item: item.update(leaseOwner=owner))
+
+
+def test_takeover(path):
+    """An expired lease is taken over and its old owner can no longer write"""
+    jobs = LocalJobManager(path)
+    jobs.create_job("job-1")
+    assert jobs.acquire_lease("job-1", "a", lease_seconds=-1)
+    assert jobs.acquire_lease("job-1", "b"), "expired lease not taken over"
+    assert not jobs.renew_lease("job-1", "a")
+
+    assert not jobs.update_job_completion(
+        "job-1", "completed", 1, {"url": "a"}, lease_owner="a"
+    )
+    assert jobs.get_job("job-1")["status"] == "submitted"
+    assert jobs.update_job_completion(
+        "job-1", "completed", 1, {"url": "b"}, lease_owner="b"
+    )
+    job = jobs.get_job("job-1")
+    assert job["status"] == "completed" and job["output"] == {"url": "b"}, job
+    print("✅ Expired lease taken over; the old owner's completion is rejected")
+
+
+def test_heartbeat(path):
+    """The heartbeat renews the lease and flags a takeover"""
+    jobs = LocalJobManager(path)
+    jobs.create_job("job-2")
+    assert jobs.acquire_lease("job-2", "a")
+    expires = jobs.get_job("job-2")["leaseExpiresAt"]
+    heartbeat = LeaseHeartbeat(jobs, "job-2", "a").start()
+    try:
+        time.sleep(2.2)
+        assert jobs.get_job("job-2")["leaseExpiresAt"] > expires
+        assert not heartbeat.lost
+        take_over(jobs, "job-2")
+        time.sleep(1.5)
+        assert heartbeat.lost, "takeover not noticed"
+    finally:
+        heartbeat.stop()
+    # Stopping must not release a lease that is no longer ours
+    assert jobs.get_job("job-2")["leaseOwner"] == "other-worker"
+    print("✅ Heartbeat renews the lease and notices a takeover")
+
+
+def make_processor(jobs, process_video_job):
+    uploads = []
+    return uploads, SimpleNamespace(
+        job_manager=jobs,
+        worker_id="worker-a",
+        project_slots=SimpleNamespace(
+            acquire=lambda project_id, job_id: True,
+            release=lambda project_id, job_id: None,
+            renew=lambda *args: None,
+        ),
+        render_cache=SimpleNamespace(enabled=False),
+        asset_manager=SimpleNamespace(
+            upload_result=lambda *args: uploads.append(args) or (None, None, None)
+        ),
+        video_processor=SimpleNamespace(
+            process_video_job=process_video_job, cleanup_job_dir=lambda path: None
+        ),
+        webhook_notifier=None,
+        empty_output={"url": None},
+    )
+
+
+def test_lost_lease_in_processor(path):
+    """A worker whose lease is taken over neither uploads nor records a result"""
+    jobs = LocalJobManager(path)
+
+    def stolen_while_rendering(job_id, *args, **kwargs):
+        take_over(jobs, job_id)
+        # Long enough for the heartbeat to notice
+        time.sleep(1.5)
+        return {"success": True, "processingTime": 1.5, "duration": 1, "fileSize": 1}
+
+    jobs.create_job("job-3")
+    uploads, processor = make_processor(jobs, stolen_while_rendering)
+    result = process_single_job(processor, "job-3", SPEC)
+    assert result == {"status": "duplicate"}, result
+    assert not uploads, "uploaded after losing the lease"
+    assert jobs.get_job("job-3")["status"] == "processing"
+    print("✅ Lost lease stops the job before its upload")
+
+    def stolen_then_failed(job_id, *args, **kwargs):
+        # Taken over just before the final write, before any heartbeat ran
+        take_over(jobs, job_id)
+        return {"success": False, "processingTime": 0.1, "error": "boom"}
+
+    jobs.create_job("job-4")
+    _, processor = make_processor(jobs, stolen_then_failed)
+    result = process_single_job(processor, "job-4", SPEC)
+    assert result == {"status": "duplicate"}, result
+    job = jobs.get_job("job-4")
+    assert job["status"] == "processing" and not job.get("error"), job
+    print("✅ Lost lease blocks the failure write")
+
+
+if __name__ == "__main__":
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "jobs.db")
+            test_takeover(path)
+            test_heartbeat(path)
+            test_lost_lease_in_processor(path)
+    except AssertionError as e:
+        print(f"❌ Job lease check failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# Usage: python test_job_validator.py
+# Checks the trusted fast path for queued job specs and its schema version
+import sys
+from typing import Optional
+
+sys.path.append("layers/shared")
+
+from job_spec_models import JobSpec, JOB_SPEC_SCHEMA_VERSION  # noqa: E402
+from job_spec_models import schema_version  # noqa: E402
+import job_validator  # noqa: E402
+from job_validator import compute_spec_hash, load_job_spec  # noqa: E402
+
+SPEC = {
+    "assets": {"video": {"id": "main", "source": "s3://bucket/in.mp4"}, "audio": []},
+    "timeline": [],
+    "output": {"filename": "out.mp4"},
+}
+
+
+def test_schema_version():
+    """Adding a field to the spec changes the schema version"""
+
+    class ExtendedSpec(JobSpec):
+        newField: Optional[str] = None
+
+    assert schema_version(JobSpec) == JOB_SPEC_SCHEMA_VERSION
+    assert schema_version(ExtendedSpec) != JOB_SPEC_SCHEMA_VERSION
+    print(f"✅ Schema version {JOB_SPEC_SCHEMA_VERSION} follows the model")
+
+
+def test_fast_path():
+    """Only specs with the current version skip validation"""
+    normalized = JobSpec.model_validate(SPEC).model_dump(mode="json")
+    spec_hash = compute_spec_hash(normalized)
+    validated = []
+
+    original = job_validator.validate_job_spec
+
+    def counting(data):
+        validated.append(data)
+        return original(data)
+
+    job_validator.validate_job_spec = counting
+    try:
+        load_job_spec(normalized, spec_hash, JOB_SPEC_SCHEMA_VERSION)
+        assert not validated, "current version was revalidated"
+        spec = load_job_spec(normalized, spec_hash, 1)
+        assert validated, "stale version skipped validation"
+    finally:
+        job_validator.validate_job_spec = original
+    assert spec.output.filename == "out.mp4"
+    print("✅ Stale schema versions fall back to full validation")
+
+
+if __name__ == "__main__":
+    try:
+        test_schema_version()
+        test_fast_path()
+    except AssertionError as e:
+        print(f"❌ Job validator check failed: {e}")
+        sys.exit(1)
@@ -14,6 +14,7 @@ from webhook_notifier import WebhookNotifier
 from video_processor import VideoProcessor
 from asset_manager import AssetManager
 from app import process_single_job
+from render_cache import RenderCache
 
 
 # Configure logging with colors
@@ -49,13 +50,33 @@ load_dotenv()
 class MockJobManager:
     """Mock JobManager for local testing"""
 
-    def update_status(self, job_id, status, **kwargs):
+    def acquire_lease(self, job_id, owner, lease_seconds=None):
+        return True
+
+    def renew_lease(self, job_id, owner, lease_seconds=None):
+        return True
+
+    def release_lease(self, job_id, owner):
+        pass
+
+    def get_job(self, job_id):
+        return None
+
+    def update_status(self, job_id, status, lease_owner=None, **kwargs):
         print(f"📊 Job {job_id}: Status updated to {status}")
         if kwargs:
             print(f"   Additional data: {kwargs}")
+        return True
 
     def update_job_completion(
-        self, job_id, status, processing_time, output, error=None
+        self,
+        job_id,
+        status,
+        processing_time,
+        output,
+        error=None,
+        metrics=None,
+        lease_owner=None,
     ):
         print(f"✅ Job {job_id}: Completed with status {status}")
         print(f"   Processing time: {processing_time:.2f}s")
@@ -63,6 +84,9 @@ class MockJobManager:
             print(f"   Error: {error}")
         else:
             print(f"   Output: {output['url']}")
+        if metrics:
+            print(f"   Metrics: {metrics}")
+        return True
 
 
 class MockWebhookNotifier:
@@ -71,6 +95,9 @@ class MockWebhookNotifier:
     def create_payload(self, **kwargs):
         return kwargs
 
+    def enqueue_notification(self, config, payload):
+        return self.send_notification(config, payload)
+
     def send_notification(self, config, payload):
         print(f"🔔 Webhook notification: {payload['status']}")
         if payload.get("error"):
@@ -84,9 +111,14 @@ class LocalJobProcessor:
 
     def __init__(self):
         self.job_manager = MockJobManager()
-        self.video_processor = VideoProcessor(temp_dir="./tmp")
         self.asset_manager = AssetManager()
+        self.video_processor = VideoProcessor(
+            temp_dir="./tmp", asset_manager=self.asset_manager
+        )
         self.webhook_notifier = WebhookNotifier()  # MockWebhookNotifier
+        # Disabled unless DYNAMODB_RENDER_CACHE_TABLE is set
+        self.render_cache = RenderCache()
+        self.worker_id = str(uuid.uuid4())
         self.empty_output = {
             "url": None,
             "urlExpiresAt": None,
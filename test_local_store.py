@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Usage: python test_local_store.py
+# Exercises the SQLite job store and queue behind local_runtime.py
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.append("layers/shared")
+
+from local_store import LocalJobManager, LocalQueueClient  # noqa: E402
+
+
+def test_job_leases(path):
+    """Leases follow the same conditional rules as the DynamoDB JobManager"""
+    jobs = LocalJobManager(path)
+    jobs.create_job("job-1", {"projectId": "demo"})
+    assert jobs.get_job("job-1")["status"] == "submitted"
+    assert jobs.get_job("missing") is None
+    assert not jobs.acquire_lease("missing", "a")
+    print("✅ Create and get")
+
+    assert jobs.acquire_lease("job-1", "a")
+    assert not jobs.acquire_lease("job-1", "b")
+    assert jobs.acquire_lease("job-1", "a")
+    assert not jobs.renew_lease("job-1", "b")
+    jobs.release_lease("job-1", "a")
+    assert jobs.acquire_lease("job-1", "b")
+    # An expired lease is taken over
+    jobs.acquire_lease("job-1", "b", lease_seconds=-5)
+    assert jobs.acquire_lease("job-1", "c")
+    print("✅ Lease acquire, renew, release and takeover")
+
+    # Final writes from a worker whose lease was taken over are rejected
+    assert not jobs.update_job_completion(
+        "job-1", "failed", 0, {}, "stale", lease_owner="b"
+    )
+    assert not jobs.update_status("job-1", "retrying", lease_owner="b")
+    assert jobs.get_job("job-1")["status"] == "submitted"
+    assert jobs.update_status("job-1", "processing", lease_owner="c")
+    print("✅ Lease-conditional status writes")
+
+    jobs.update_status("job-1", "processing", renderCache=None, progress={"p": 1})
+    jobs.update_job_completion("job-1", "completed", 1.234, {"url": "x"})
+    job = jobs.get_job("job-1")
+    assert job["progress"] == {"p": 1} and "renderCache" not in job
+    assert job["processingTime"] == 1.23 and job["completedAt"]
+    assert not jobs.acquire_lease("job-1", "d")
+    print("✅ Status updates and completed jobs")
+
+
+def test_queue_visibility(path):
+    """Received messages stay hidden until deleted or their visibility lapses"""
+    queue = LocalQueueClient(path)
+    for n in range(3):
+        queue.send_message(QueueUrl="jobs", MessageBody=json.dumps({"n": n}))
+    queue.send_message(QueueUrl="other", MessageBody="{}")
+
+    first = queue.receive_message(QueueUrl="jobs", VisibilityTimeout=60)["Messages"]
+    assert [json.loads(m["Body"])["n"] for m in first] == [0]
+    batch = queue.receive_message(
+        QueueUrl="jobs", MaxNumberOfMessages=5, VisibilityTimeout=0.2
+    )["Messages"]
+    assert [json.loads(m["Body"])["n"] for m in batch] == [1, 2]
+    attributes = queue.get_queue_attributes(QueueUrl="jobs")["Attributes"]
+    assert attributes["ApproximateNumberOfMessagesNotVisible"] == "3"
+    print("✅ FIFO receive per queue")
+
+    queue.delete_message(QueueUrl="jobs", ReceiptHandle=first[0]["ReceiptHandle"])
+    time.sleep(0.3)
+    again = queue.receive_message(QueueUrl="jobs", MaxNumberOfMessages=5)["Messages"]
+    assert [json.loads(m["Body"])["n"] for m in again] == [1, 2]
+    assert again[0]["Attributes"]["ApproximateReceiveCount"] == "2"
+    # A stale receipt handle no longer deletes the message
+    queue.delete_message(QueueUrl="jobs", ReceiptHandle=batch[0]["ReceiptHandle"])
+    assert queue.receive_message(QueueUrl="jobs", WaitTimeSeconds=0.5) == {}
+    print("✅ Visibility timeout, redelivery and receipt handles")
+
+    queue.change_message_visibility(
+        QueueUrl="jobs", ReceiptHandle=again[1]["ReceiptHandle"], VisibilityTimeout=0
+    )
+    retried = queue.receive_message(QueueUrl="jobs")["Messages"]
+    assert json.loads(retried[0]["Body"])["n"] == 2
+    timings = queue.message_timings("jobs")
+    assert timings[0]["deleted_at"] and timings[0]["first_received_at"]
+    print("✅ Visibility changes and timings")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "runtime.db")
+        try:
+            test_job_leases(path)
+            test_queue_visibility(path)
+        except AssertionError as e:
+            print(f"❌ Local store check failed: {e}")
+            sys.exit(1)
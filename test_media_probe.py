@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# Usage: python test_media_probe.py
+# Checks the media probe service, its content-hash cache and timeline planning
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append("src/video_processor")
+sys.path.append("layers/shared")
+
+from moviepy import AudioFileClip, VideoFileClip  # noqa: E402
+import media_probe  # noqa: E402
+from media_probe import MediaProbe, content_digest  # noqa: E402
+from video_processor import VideoProcessor  # noqa: E402
+from job_spec_models import JobSpec  # noqa: E402
+
+VIDEO = "./media/inputs/api_demo_video.mp4"
+WAV = "./media/assets/sfx/cheers.wav"
+MP3 = "./media/assets/sfx/swoosh-6-351021.mp3"
+
+
+def test_probe(temp_dir):
+    """Probe results match what MoviePy reads and carry the stream info"""
+    probe = MediaProbe(os.path.join(temp_dir, "probe-cache"))
+    video = probe.probe(VIDEO)
+    with VideoFileClip(VIDEO) as clip:
+        assert abs(video["duration"] - clip.duration) < 0.05, video
+        assert (video["width"], video["height"]) == tuple(clip.size), video
+        assert abs(video["fps"] - clip.fps) < 0.01, video
+    assert video["videoCodec"] == "h264", video
+
+    for path in (WAV, MP3):
+        audio = probe.probe(path)
+        with AudioFileClip(path) as clip:
+            assert abs(audio["duration"] - clip.duration) < 0.05, audio
+        assert audio["sampleRate"] and audio["channels"] in (1, 2), audio
+        assert audio["videoCodec"] is None, audio
+    print(f"✅ Probed {VIDEO}: {video}")
+
+    if probe.ffprobe:
+        keyframes = probe.probe(VIDEO, keyframes=True)
+        assert keyframes["keyframes"][0] == 0 and keyframes["keyframeInterval"]
+        print(f"✅ Keyframe interval {keyframes['keyframeInterval']}s")
+    else:
+        print("⚠️  ffprobe not installed, keyframes not checked")
+
+
+def test_cache(temp_dir):
+    """Each content is probed once, across copies and probe instances"""
+    cache_dir = os.path.join(temp_dir, "shared-cache")
+    runs = []
+
+    def counting(probe):
+        run = probe._run
+        probe._run = lambda path, keyframes: runs.append(path) or run(path, keyframes)
+        return probe
+
+    probe = counting(MediaProbe(cache_dir))
+    copy = os.path.join(temp_dir, "renamed.wav")
+    shutil.copy(WAV, copy)
+    first = probe.probe(WAV)
+    assert probe.probe(copy) == first
+    assert counting(MediaProbe(cache_dir)).probe(WAV) == first
+    assert len(runs) == 1, runs
+    print("✅ Probe results cached by content hash")
+
+
+def test_large_inputs(temp_dir):
+    """Large files are keyed by source ETag or path and mtime, never hashed"""
+    first, second = [os.path.join(temp_dir, f"large-{n}.mp4") for n in (1, 2)]
+    shutil.copy(VIDEO, first)
+    shutil.copy(VIDEO, second)
+    small_key = content_digest(VIDEO)
+
+    limit = media_probe.PROBE_HASH_MAX_BYTES
+    media_probe.PROBE_HASH_MAX_BYTES = 0
+    try:
+        etag = "s3://bucket/in.mp4@abc"
+        assert content_digest(first, etag) == content_digest(second, etag)
+        assert content_digest(first, etag) != small_key
+        assert content_digest(first, "s3://bucket/in.mp4@def") != content_digest(
+            first, etag
+        )
+        # Without an ETag each downloaded copy is its own entry
+        assert content_digest(first) != content_digest(second)
+        probe = MediaProbe(os.path.join(temp_dir, "large-cache"))
+        assert probe.duration(first, etag) == probe.duration(VIDEO)
+    finally:
+        media_probe.PROBE_HASH_MAX_BYTES = limit
+    print("✅ Large inputs keyed by source ETag, or path and mtime")
+
+
+def test_plan(temp_dir):
+    """The timeline is laid out from probe data before anything is decoded"""
+    spec = JobSpec(
+        assets={
+            "video": {"id": "main", "source": VIDEO},
+            "audio": [
+                {"id": "cheers", "source": WAV},
+                {"id": "swoosh", "source": MP3},
+            ],
+        },
+        backgroundMusic={"playlist": ["cheers"], "loop": True, "volume": 0.3},
+        timeline=[
+            {"start": 1, "type": "audio", "data": {"assetId": "swoosh"}},
+            {
+                "start": 5,
+                "type": "audio",
+                "data": {"assetId": "cheers", "duckingLevel": 0.5},
+            },
+        ],
+        output={"filename": "plan.mp4"},
+    )
+    processor = VideoProcessor(temp_dir=temp_dir)
+    assets = {"cheers": WAV, "swoosh": MP3}
+    plan = processor._plan_timeline(spec, VIDEO, assets, {})
+    assert not os.listdir(processor.pcm_cache.cache_dir), "decoded while planning"
+
+    probe = processor.media_probe
+    video_duration = probe.duration(VIDEO)
+    tracks = plan["background"]["tracks"]
+    assert plan["videoDuration"] == video_duration
+    assert tracks[-1]["start"] + tracks[-1]["duration"] >= video_duration - 1
+    assert all(track["duration"] <= probe.duration(WAV) for track in tracks)
+    assert [event["duration"] for event in plan["events"]] == [
+        probe.duration(MP3),
+        probe.duration(WAV),
+    ]
+    assert plan["duckingRanges"][0]["end"] == 5 + probe.duration(WAV)
+    print(f"✅ Planned {len(tracks)} playlist tracks without decoding")
+
+
+if __name__ == "__main__":
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_probe(temp_dir)
+            test_cache(temp_dir)
+            test_large_inputs(temp_dir)
+            test_plan(temp_dir)
+    except AssertionError as e:
+        print(f"❌ Media probe check failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# Usage: python test_pcm_cache.py
+# Checks the PCM cache size budget across jobs in a warm process
+import os
+import sys
+import wave
+import tempfile
+import numpy as np
+
+sys.path.append("src/video_processor")
+sys.path.append("layers/shared")
+
+from pcm_cache import PCMCache, PCM_FPS, PCM_CHANNELS  # noqa: E402
+from workspace_manager import WorkspaceManager  # noqa: E402
+
+SECONDS = 2
+# One decoded entry: float32 frames at the render rate
+ENTRY_BYTES = SECONDS * PCM_FPS * PCM_CHANNELS * 4
+
+
+def write_tone(path, frequency):
+    t = np.arange(SECONDS * 16000) / 16000
+    samples = (np.sin(2 * np.pi * frequency * t) * 12000).astype(np.int16)
+    with wave.open(path, "wb") as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(16000)
+        clip.writeframes(samples.tobytes())
+
+
+def cached_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith(".f32"))
+
+
+def test_eviction(temp_dir):
+    """A finished job's entries are evicted by the next job's decode"""
+    paths = []
+    for n, frequency in enumerate((220, 330, 440)):
+        paths.append(os.path.join(temp_dir, f"tone-{n}.wav"))
+        write_tone(paths[-1], frequency)
+
+    cache = PCMCache(os.path.join(temp_dir, "pcm-cache"))
+    cache.max_bytes = ENTRY_BYTES
+
+    # First job: its clip stays live while a second job decodes
+    first_job = cache.load(paths[0])
+    first_entry = cached_files(cache)
+    assert len(first_entry) == 1, first_entry
+    second_job = cache.load(paths[1])
+    assert first_entry[0] in cached_files(cache), "evicted a live entry"
+    assert len(cached_files(cache)) == 2
+    print("✅ Live entries are kept over budget")
+
+    # Both jobs finish; the next decode trims the cache back to its budget
+    del first_job, second_job
+    third_job = cache.load(paths[2])
+    remaining = cached_files(cache)
+    assert len(remaining) == 1 and first_entry[0] not in remaining, remaining
+    assert cache.usage_bytes() <= cache.max_bytes
+    assert abs(third_job.duration - SECONDS) < 0.01
+    print("✅ Finished jobs' entries are evicted")
+
+
+def test_workspace_budget(temp_dir):
+    """The cache's remaining budget is held back from job reservations"""
+    workspace = WorkspaceManager(temp_dir)
+    cache_dir = os.path.join(temp_dir, "budget-cache")
+    os.makedirs(cache_dir)
+    before = workspace.available_bytes()
+    workspace.track_cache(cache_dir, 100 << 20)
+    held = before - workspace.available_bytes()
+    # Free space may drift slightly between the two readings
+    assert abs(held - (100 << 20)) < (8 << 20), held
+    WorkspaceManager._reservations.pop(f"cache:{cache_dir}")
+    print(f"✅ Cache budget counted in the workspace ({held / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_eviction(temp_dir)
+            test_workspace_budget(temp_dir)
+    except AssertionError as e:
+        print(f"❌ PCM cache check failed: {e}")
+        sys.exit(1)
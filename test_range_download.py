@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# Usage: python test_range_download.py
+# Exercises AssetManager HTTP downloads against a local range-capable server
+import os
+import re
+import sys
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append("src/video_processor")
+sys.path.append("layers/shared")
+
+from asset_manager import AssetManager
+
+PAYLOAD = os.urandom(40 * 1024 * 1024 + 123)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with Accept-Ranges; can cut one response short"""
+
+    fail_next = False
+    bytes_sent = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+
+    def do_GET(self):
+        start, end = 0, len(PAYLOAD) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        body = PAYLOAD[start : end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        with RangeHandler.lock:
+            cut = RangeHandler.fail_next
+            RangeHandler.fail_next = False
+        if cut:
+            body = body[: len(body) // 2]
+        self.wfile.write(body)
+        with RangeHandler.lock:
+            RangeHandler.bytes_sent += len(body)
+        if cut:
+            self.close_connection = True
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/video.mp4"
+
+
+def download(asset_manager, url, fail_once):
+    RangeHandler.bytes_sent = 0
+    RangeHandler.fail_next = fail_once
+    with tempfile.TemporaryDirectory() as temp_dir:
+        started = time.time()
+        path = asset_manager.download_asset(url, temp_dir)
+        elapsed = time.time() - started
+        with open(path, "rb") as f:
+            intact = f.read() == PAYLOAD
+    return intact, RangeHandler.bytes_sent, elapsed
+
+
+def report(name, intact, bytes_sent, elapsed):
+    mb = len(PAYLOAD) / (1024 * 1024)
+    overhead = bytes_sent / len(PAYLOAD)
+    status = "✅" if intact and overhead < 1.3 else "❌"
+    print(
+        f"{status} {name}: {mb / elapsed:.0f} MB/s, "
+        f"{overhead:.2f}x bytes transferred, intact={intact}"
+    )
+    return intact and overhead < 1.3
+
+
+def test_ranged_download():
+    """Parallel ranged download with one interrupted range resumed"""
+    server, url = start_server()
+    try:
+        asset_manager = AssetManager()
+        asset_manager.http.backoff_base = 0
+        assert report("Ranged + resume", *download(asset_manager, url, True))
+    finally:
+        server.shutdown()
+
+
+def test_single_stream_resume():
+    """Single-stream download resumed with a Range request after a cut"""
+    server, url = start_server()
+    try:
+        asset_manager = AssetManager()
+        asset_manager.http.backoff_base = 0
+        asset_manager.http.range_threshold = len(PAYLOAD) + 1
+        assert report("Single stream + resume", *download(asset_manager, url, True))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    results = []
+    for test in (test_ranged_download, test_single_stream_resume):
+        try:
+            test()
+            results.append(True)
+        except AssertionError:
+            results.append(False)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# Usage: python test_scheduler.py
+# Checks priority lanes, project caps and shortest-job-first scheduling
+# against the local queue stand-in, including a simulated bulk submission
+import os
+import sys
+import json
+import tempfile
+from concurrent.futures import Future
+from datetime import datetime, timezone
+
+sys.path.append("src/video_processor")
+sys.path.append("layers/shared")
+
+from local_store import LocalProjectSlots, LocalQueueClient  # noqa: E402
+from scheduler import JobScheduler, get_project_cap, receive_by_priority  # noqa: E402
+
+LANE_URLS = ["interactive", "batch"]
+SPEC = {
+    "jobInfo": {"projectId": "demo"},
+    "assets": {
+        "video": {"id": "main", "source": "s3://missing/video.mp4"},
+        "audio": [],
+    },
+    "timeline": [],
+    "output": {"filename": "lanes.mp4"},
+}
+
+
+def message(job_id, lane="batch", project="demo", seconds=60, submitted=0):
+    return {
+        "MessageId": job_id,
+        "Scheduling": {
+            "jobId": job_id,
+            "lane": lane,
+            "projectId": project,
+            "estimatedSeconds": seconds,
+            "submittedAt": submitted,
+        },
+    }
+
+
+def body(job_id, lane, project, seconds, submitted):
+    return json.dumps(
+        {
+            "jobId": job_id,
+            "jobSpec": {},
+            "lane": lane,
+            "projectId": project,
+            "estimatedSeconds": seconds,
+            "submittedAt": datetime.fromtimestamp(submitted, timezone.utc).isoformat(),
+        }
+    )
+
+
+def test_policy():
+    """Interactive first, then least-served project, then shortest estimate"""
+    scheduler = JobScheduler(aging_rate=0.1)
+    long_job = message("long", seconds=600)
+    short_job = message("short", seconds=30)
+    preview = message("preview", lane="interactive", seconds=900)
+    assert scheduler.pick([long_job, short_job], [], now=0) is short_job
+    assert scheduler.pick([long_job, short_job, preview], [], now=0) is preview
+    print("✅ Interactive lane first, then shortest job")
+
+    other = message("other", project="other", seconds=600)
+    running = [short_job["Scheduling"]]
+    assert scheduler.pick([long_job, other], running, now=0) is other
+    print("✅ Fair share: projects with fewer running jobs go first")
+
+    # 10 s of waiting takes 1 s off the effective estimate
+    old = message("old", seconds=600, submitted=0)
+    fresh = message("fresh", seconds=100, submitted=4000)
+    assert scheduler.pick([old, fresh], [], now=4000) is fresh
+    fresh = message("fresh", seconds=100, submitted=6000)
+    assert scheduler.pick([old, fresh], [], now=6000) is old
+    print("✅ Aging keeps long jobs from starving")
+
+    os.environ["PROJECT_MAX_CONCURRENT_JOBS"] = "1"
+    os.environ["PROJECT_CONCURRENCY_LIMITS"] = json.dumps({"bulk": 2})
+    try:
+        assert get_project_cap("demo") == 1 and get_project_cap("bulk") == 2
+        assert get_project_cap(None) == 0
+        assert scheduler.pick([long_job], running, now=0) is None
+        assert scheduler.pick([long_job, other], running, now=0) is other
+    finally:
+        del os.environ["PROJECT_MAX_CONCURRENT_JOBS"]
+        del os.environ["PROJECT_CONCURRENCY_LIMITS"]
+    print("✅ Projects at their cap are skipped")
+
+
+class RecordingQueue:
+    """SQS stand-in noting whether each call was made holding the worker lock"""
+
+    def __init__(self, worker):
+        self.worker = worker
+        self.calls = []
+
+    def change_message_visibility(self, **kwargs):
+        self.calls.append(("release", self.worker._condition._is_owned()))
+
+    def delete_message(self, **kwargs):
+        self.calls.append(("delete", self.worker._condition._is_owned()))
+
+
+def test_worker_release(path):
+    """Capped jobs are handed back to SQS after the scheduler lock is dropped"""
+    from worker import QueueWorker
+
+    os.environ["LOCAL_RUNTIME_DB"] = path
+    os.environ["PROJECT_MAX_CONCURRENT_JOBS"] = "1"
+    try:
+        worker = QueueWorker(queue_url="batch", concurrency=2, prefetch=1)
+        worker.sqs = RecordingQueue(worker)
+        finished, running, capped = [
+            dict(message(job_id), QueueUrl="batch", ReceiptHandle=job_id)
+            for job_id in ("finished", "running", "capped")
+        ]
+        done = Future()
+        done.set_result(("finished", {"status": "success"}))
+        worker._running = {done: finished, Future(): running}
+        worker._held = {m["ReceiptHandle"]: m for m in (finished, running, capped)}
+        worker._waiting = [capped]
+
+        worker._on_job_done(done)
+        assert worker.sqs.calls == [
+            ("delete", False),
+            ("release", False),
+        ], worker.sqs.calls
+        assert list(worker._held) == ["running"] and not worker._waiting
+    finally:
+        del os.environ["LOCAL_RUNTIME_DB"]
+        del os.environ["PROJECT_MAX_CONCURRENT_JOBS"]
+    print("✅ Worker settles and releases messages outside its lock")
+
+
+def test_project_slots(path):
+    """Slots are capped per project, released, and expire with the lease"""
+    slots = LocalProjectSlots(path)
+    os.environ["PROJECT_MAX_CONCURRENT_JOBS"] = "2"
+    try:
+        assert slots.acquire("bulk", "a") and slots.acquire("bulk", "b")
+        assert not slots.acquire("bulk", "c")
+        assert slots.acquire("bulk", "a")
+        assert slots.acquire("other", "d")
+        slots.release("bulk", "a")
+        assert slots.acquire("bulk", "c")
+        slots.renew("bulk", "b", seconds=-1)
+        assert slots.acquire("bulk", "e")
+        assert slots.acquire(None, "f")
+    finally:
+        del os.environ["PROJECT_MAX_CONCURRENT_JOBS"]
+    print("✅ Project slots: cap, release and expiry")
+
+
+def test_submit_lanes(path):
+    """submit_job routes by priority lane and adds scheduling hints"""
+    from local_runtime import load_handler
+
+    os.environ["LOCAL_RUNTIME_DB"] = path
+    os.environ["SQS_JOB_QUEUE_URL"] = "batch"
+    os.environ["SQS_INTERACTIVE_JOB_QUEUE_URL"] = "interactive"
+    try:
+        submit = load_handler("submit_job")
+        queue = LocalQueueClient(path)
+        for priority, preview, lane in (
+            (None, None, "batch"),
+            ("interactive", None, "interactive"),
+            (None, {"height": 240}, "interactive"),
+            ("batch", {"height": 240}, "batch"),
+        ):
+            spec = json.loads(json.dumps(SPEC))
+            if priority:
+                spec["jobInfo"]["priority"] = priority
+            if preview:
+                spec["output"]["preview"] = preview
+            response = submit({"body": json.dumps(spec)}, None)
+            assert response["statusCode"] == 200, response
+            received = receive_by_priority(queue, [lane], 1, 30, wait_seconds=0)
+            assert len(received) == 1, (priority, preview)
+            info = received[0]["Scheduling"]
+            assert info["lane"] == lane and info["projectId"] == "demo", info
+
+        # Jobs estimated as short overtake the batch lane
+        spec = json.loads(json.dumps(SPEC))
+        spec["assets"]["video"]["source"] = "./media/inputs/explainer_video.mp4"
+        spec["output"]["encoding"] = {"preset": "ultrafast"}
+        for short_job_seconds, lane in (("60", "interactive"), ("0", "batch")):
+            os.environ["SCHEDULER_SHORT_JOB_SECONDS"] = short_job_seconds
+            response = submit({"body": json.dumps(spec)}, None)
+            assert response["statusCode"] == 200, response
+            received = receive_by_priority(queue, [lane], 1, 30, wait_seconds=0)
+            assert len(received) == 1, short_job_seconds
+            assert received[0]["Scheduling"]["estimatedSeconds"] > 0, received
+        del os.environ["SCHEDULER_SHORT_JOB_SECONDS"]
+    finally:
+        for key in (
+            "LOCAL_RUNTIME_DB",
+            "SQS_JOB_QUEUE_URL",
+            "SQS_INTERACTIVE_JOB_QUEUE_URL",
+        ):
+            del os.environ[key]
+    print("✅ Submit routes jobs to the interactive and batch lanes")
+
+
+def simulate(queue, arrivals, pick, slots=4, prefetch=4):
+    """
+    Run the lane queues in virtual time with jobs lasting their estimate
+
+    Mirrors QueueWorker: it holds up to slots + prefetch messages, fills free
+    slots with pick, and defers messages of capped projects until a job
+    finishes. Returns queue wait per job and peak running jobs per project.
+    """
+    arrivals = sorted(arrivals, key=lambda arrival: arrival[0])
+    clock = 0.0
+    held, running, deferred = [], [], []
+    waits, peak = {}, {}
+    while True:
+        while arrivals and arrivals[0][0] <= clock:
+            _, queue_url, message_body = arrivals.pop(0)
+            queue.send_message(QueueUrl=queue_url, MessageBody=message_body)
+
+        while len(running) < slots:
+            wanted = slots + prefetch - len(running) - len(held)
+            if wanted > 0:
+                held += receive_by_priority(
+                    queue,
+                    LANE_URLS,
+                    wanted,
+                    3600,
+                    wait_seconds=0,
+                    lower_lane_max=max(slots - len(running) - len(held), 0),
+                )
+            if not held:
+                break
+            chosen = pick(held, [m["Scheduling"] for _, m in running], clock)
+            if chosen is None:
+                deferred += held
+                held = []
+                continue
+            held.remove(chosen)
+            info = chosen["Scheduling"]
+            waits[info["jobId"]] = clock - info["submittedAt"]
+            running.append((clock + info["estimatedSeconds"], chosen))
+            project = info["projectId"]
+            count = sum(
+                1 for _, m in running if m["Scheduling"]["projectId"] == project
+            )
+            peak[project] = max(peak.get(project, 0), count)
+
+        upcoming = [finish for finish, _ in running] + [a[0] for a in arrivals[:1]]
+        if not upcoming:
+            break
+        clock = min(upcoming)
+        for job in [job for job in running if job[0] <= clock]:
+            running.remove(job)
+            queue.delete_message(
+                QueueUrl=job[1]["QueueUrl"], ReceiptHandle=job[1]["ReceiptHandle"]
+            )
+            # A slot freed up; deferred jobs get another chance
+            for message in deferred:
+                queue.change_message_visibility(
+                    QueueUrl=message["QueueUrl"],
+                    ReceiptHandle=message["ReceiptHandle"],
+                    VisibilityTimeout=0,
+                )
+            deferred = []
+    return waits, peak
+
+
+def bulk_arrivals(lanes=True):
+    """40 ten-minute jobs from one project, then small jobs and previews"""
+    short_lane = "interactive" if lanes else "batch"
+    arrivals = [
+        (0, "batch", body(f"bulk-{n}", "batch", "bulk", 600, 0)) for n in range(40)
+    ]
+    # Short jobs ride the interactive lane (see get_lane)
+    arrivals += [
+        (t, short_lane, body(f"small-{n}", short_lane, f"team-{n % 4}", 30, t))
+        for n, t in enumerate(range(10, 1210, 60))
+    ]
+    arrivals += [
+        (t, short_lane, body(f"preview-{t}", short_lane, "studio", 20, t))
+        for t in (300, 900)
+    ]
+    return arrivals
+
+
+def p95(waits, kind):
+    values = sorted(wait for job_id, wait in waits.items() if kind in job_id)
+    return values[max(int(0.95 * len(values)) - 1, 0)]
+
+
+def test_bulk_submission(temp_dir):
+    """Small jobs keep low latency while one project floods the queue"""
+
+    def fifo(held, running, now):
+        return held[0]
+
+    baseline, _ = simulate(
+        LocalQueueClient(os.path.join(temp_dir, "fifo.db")),
+        bulk_arrivals(lanes=False),
+        fifo,
+    )
+    waits, _ = simulate(
+        LocalQueueClient(os.path.join(temp_dir, "sjf.db")),
+        bulk_arrivals(),
+        JobScheduler().pick,
+    )
+    assert len(waits) == len(baseline) == len(bulk_arrivals())
+    assert p95(waits, "small") < p95(baseline, "small") / 5, (waits, baseline)
+    print(
+        f"✅ Lanes and SJF: small job p95 queue wait {p95(waits, 'small'):.0f}s "
+        f"(FIFO {p95(baseline, 'small'):.0f}s)"
+    )
+
+    os.environ["PROJECT_CONCURRENCY_LIMITS"] = json.dumps({"bulk": 2})
+    try:
+        waits, peak = simulate(
+            LocalQueueClient(os.path.join(temp_dir, "capped.db")),
+            bulk_arrivals(),
+            JobScheduler().pick,
+        )
+    finally:
+        del os.environ["PROJECT_CONCURRENCY_LIMITS"]
+    assert len(waits) == len(baseline)
+    assert peak["bulk"] <= 2, peak
+    assert p95(waits, "small") <= 30 and p95(waits, "preview") <= 30, waits
+    print(
+        f"✅ With a cap of 2 on the bulk project: small job p95 "
+        f"{p95(waits, 'small'):.0f}s, previews {p95(waits, 'preview'):.0f}s, "
+        f"bulk peak {peak['bulk']} running"
+    )
+
+
+if __name__ == "__main__":
+    try:
+        test_policy()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_project_slots(os.path.join(temp_dir, "slots.db"))
+            test_submit_lanes(os.path.join(temp_dir, "submit.db"))
+            test_bulk_submission(temp_dir)
+            test_worker_release(os.path.join(temp_dir, "worker.db"))
+    except AssertionError as e:
+        print(f"❌ Scheduler check failed: {e}")
+        sys.exit(1)
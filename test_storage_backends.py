@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# Usage: python test_storage_backends.py
+# Exercises the storage layer against the directory-backed S3 stand-in
+import os
+import sys
+import hashlib
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+sys.path.append("src/video_processor")
+sys.path.append("layers/shared")
+
+SOURCE = "./media/inputs/api_demo_video.mp4"
+
+
+def test_local_s3_backend():
+    """S3 URIs round-trip through S3_LOCAL_ROOT with S3-like semantics"""
+    root = tempfile.mkdtemp()
+    os.environ["S3_LOCAL_ROOT"] = root
+    from asset_manager import AssetManager
+
+    try:
+        asset_manager = AssetManager()
+        assert asset_manager.s3.name == "s3-local"
+
+        uri, bucket, key = asset_manager.upload_result(
+            SOURCE, "s3://bucket/inputs", "video.mp4"
+        )
+        assert (uri, bucket, key) == (
+            "s3://bucket/inputs/video.mp4",
+            "bucket",
+            "inputs/video.mp4",
+        )
+        print("✅ Upload")
+
+        with open(SOURCE, "rb") as f:
+            content = f.read()
+        info = asset_manager.head(uri)
+        assert info["size"] == len(content)
+        assert (
+            asset_manager.get_asset_fingerprint(uri) == hashlib.md5(content).hexdigest()
+        )
+        print("✅ Head and ETag fingerprint")
+
+        assert asset_manager.read_range(uri, 100, 199) == content[100:200]
+        print("✅ Range read")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = asset_manager.download_asset(uri, temp_dir)
+            with open(path, "rb") as f:
+                assert f.read() == content
+        print("✅ Download")
+
+        copied, _, _ = asset_manager.copy_result(uri, "s3://other/outputs", "copy.mp4")
+        assert os.path.exists(os.path.join(root, "other", "outputs", "copy.mp4"))
+        assert os.path.exists(
+            asset_manager.generate_presigned_url("other", "outputs/copy.mp4")
+        )
+        print("✅ Copy and presign")
+
+        metrics = asset_manager.storage_metrics()["s3-local"]
+        for operation in ("put", "head", "read_range", "get", "copy", "presign"):
+            assert metrics[operation]["count"] >= 1, operation
+        assert metrics["get"]["bytes"] == len(content)
+        print(f"   get: {metrics['get']}")
+        print("✅ Transfers recorded per backend")
+    finally:
+        del os.environ["S3_LOCAL_ROOT"]
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_stale_render_cache():
+    """A deleted cached render is invalidated, so the job renders again"""
+    root = tempfile.mkdtemp()
+    os.environ["S3_LOCAL_ROOT"] = root
+    from asset_manager import AssetManager
+    from app import complete_from_cache
+    from job_spec_models import JobSpec
+
+    try:
+        invalidated = []
+        processor = SimpleNamespace(
+            asset_manager=AssetManager(),
+            render_cache=SimpleNamespace(invalidate=invalidated.append),
+        )
+        cached = {"s3Uri": "s3://bucket/outputs/deleted.mp4", "duration": 1, "size": 1}
+        for destination in ("s3://bucket/renders/", os.path.join(root, "local-out")):
+            spec = JobSpec(
+                assets={"video": {"id": "main", "source": SOURCE}, "audio": []},
+                timeline=[],
+                output={"filename": "stale.mp4", "destination": destination},
+            )
+            result = complete_from_cache(processor, "job-1", spec, "hash", cached)
+            assert result is None, result
+        assert invalidated == ["hash", "hash"], invalidated
+        print("✅ Missing cached render invalidated (S3 and local destinations)")
+    finally:
+        del os.environ["S3_LOCAL_ROOT"]
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    try:
+        test_local_s3_backend()
+        test_stale_render_cache()
+    except AssertionError as e:
+        print(f"❌ Storage backend check failed: {e}")
+        sys.exit(1)
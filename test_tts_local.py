@@ -11,6 +11,7 @@ load_dotenv()
 
 # Add src to path for imports
 sys.path.append("src")
+sys.path.append("layers/shared")
 
 from video_processor.tts_generator import TTSGenerator
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Usage: python test_tts_offline.py
+# Checks the offline TTS provider: no network, deterministic, realistic duration
+import os
+import sys
+import wave
+import shutil
+
+sys.path.append("src/video_processor")
+sys.path.append("layers/shared")
+
+from tts_generator import TTSGenerator
+
+OUTPUT_DIR = "./tmp_tts_offline"
+
+
+def duration(path):
+    with wave.open(path) as clip:
+        return clip.getnframes() / clip.getframerate()
+
+
+def test_offline_provider():
+    """Offline speech is reproducible and paced like real speech"""
+    tts = TTSGenerator()
+    text = (
+        "Welcome to the product tour. In the next minute, we will walk "
+        "through the dashboard, the reports, and the settings page."
+    )
+    try:
+        first = tts.generate_speech(
+            text, os.path.join(OUTPUT_DIR, "a.mp3"), provider="local"
+        )
+        second = tts.generate_speech(
+            text, os.path.join(OUTPUT_DIR, "b.mp3"), provider="local"
+        )
+        with open(first, "rb") as a, open(second, "rb") as b:
+            assert a.read() == b.read(), "same text produced different audio"
+        print("✅ Deterministic output")
+
+        # ~22 words at 160 wpm plus punctuation pauses
+        seconds = duration(first)
+        print(f"   {seconds:.2f}s for {len(text.split())} words")
+        assert 6 < seconds < 12, f"unrealistic duration {seconds:.2f}s"
+        print("✅ Realistic duration")
+
+        ssml = '<speak>Hello<break time="2s"/>world</speak>'
+        plain = tts.generate_speech(
+            "Hello world", os.path.join(OUTPUT_DIR, "c.mp3"), provider="local"
+        )
+        paused = tts.generate_speech(
+            ssml,
+            os.path.join(OUTPUT_DIR, "d.mp3"),
+            text_type="ssml",
+            provider="local",
+        )
+        assert abs(duration(paused) - duration(plain) - 2) < 0.1
+        print("✅ SSML breaks honored")
+
+        paths = tts.generate_batch(
+            [
+                {
+                    "text": "One",
+                    "output_path": f"{OUTPUT_DIR}/e.mp3",
+                    "provider": "local",
+                },
+                {
+                    "text": "Two",
+                    "output_path": f"{OUTPUT_DIR}/f.mp3",
+                    "provider": "local",
+                },
+            ]
+        )
+        assert [os.path.basename(p) for p in paths] == ["e.wav", "f.wav"]
+        print("✅ Batch requests keep their order")
+    finally:
+        shutil.rmtree(OUTPUT_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    try:
+        test_offline_provider()
+    except AssertionError as e:
+        print(f"❌ Offline TTS check failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Usage: python test_webhook_dispatcher.py
+# Checks that a batch of slow webhook endpoints finishes before the Lambda
+# timeout, reporting unfinished deliveries back to SQS
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append("layers/shared")
+
+from local_runtime import load_handler  # noqa: E402
+
+SLOW_SECONDS = 3
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Accepts /ok at once and /slow after SLOW_SECONDS"""
+
+    received = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/slow":
+            time.sleep(SLOW_SECONDS)
+        WebhookHandler.received.append(self.path)
+        self.send_response(200)
+        self.end_headers()
+
+
+class FakeContext:
+    def __init__(self, seconds):
+        self.deadline = time.monotonic() + seconds
+
+    def get_remaining_time_in_millis(self):
+        return int((self.deadline - time.monotonic()) * 1000)
+
+
+def record(n, url):
+    body = {"webhook": {"url": url}, "payload": {"jobId": f"job-{n}"}}
+    return {"messageId": f"m{n}", "body": json.dumps(body)}
+
+
+def test_deadline(base_url):
+    """Slow endpoints are cut off before the timeout, fast ones still succeed"""
+    handler = load_handler("webhook_dispatcher")
+    records = [record(n, f"{base_url}/slow") for n in range(5)]
+    records += [record(n, f"{base_url}/ok") for n in range(5, 10)]
+
+    # 5 s of margin leaves about 1 s for requests
+    started = time.monotonic()
+    result = handler({"Records": records}, FakeContext(6))
+    elapsed = time.monotonic() - started
+    failed = sorted(item["itemIdentifier"] for item in result["batchItemFailures"])
+    assert failed == [f"m{n}" for n in range(5)], failed
+    assert elapsed < SLOW_SECONDS, elapsed
+    print(f"✅ Slow deliveries reported as failures after {elapsed:.1f}s")
+
+    started = time.monotonic()
+    result = handler({"Records": records}, FakeContext(60))
+    elapsed = time.monotonic() - started
+    assert result["batchItemFailures"] == [], result
+    # Ten records, ten workers: the slow ones run in a single wave
+    assert elapsed < 2 * SLOW_SECONDS, elapsed
+    print(f"✅ Batch of 10 delivered in one wave ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WebhookHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        test_deadline(f"http://127.0.0.1:{server.server_port}")
+    except AssertionError as e:
+        print(f"❌ Webhook dispatcher check failed: {e}")
+        sys.exit(1)
+    finally:
+        server.shutdown()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# Usage: python test_workspace_manager.py
+# Checks ephemeral storage reservations and the orphaned workspace sweep
+import os
+import sys
+import subprocess
+import tempfile
+
+sys.path.append("src/video_processor")
+
+os.environ["WORKSPACE_HEADROOM_BYTES"] = "0"
+
+from workspace_manager import WorkspaceManager, InsufficientStorageError  # noqa: E402
+
+MB = 1 << 20
+
+
+def about(nbytes, expected):
+    # Workspace marker files take a few bytes
+    return abs(nbytes - expected) < MB
+
+
+def test_reservations(root):
+    """Reservations add up across jobs and fail once over budget"""
+    workspace = WorkspaceManager(root)
+    workspace.free_bytes = lambda: 100 * MB
+    workspace.create("job-a")
+    workspace.create("job-b")
+    try:
+        workspace.reserve("job-a", 60 * MB, "downloading")
+        assert about(workspace.available_bytes(), 40 * MB)
+        assert not workspace.can_fit(50 * MB)
+        try:
+            workspace.reserve("job-b", 50 * MB, "downloading")
+            raise AssertionError("over-budget reservation succeeded")
+        except InsufficientStorageError as e:
+            print(f"✅ Over budget: {e}")
+
+        # Bytes already written count against the reservation, not twice
+        with open(os.path.join(root, "job-a", "input.mp4"), "wb") as f:
+            f.write(b"\0" * (20 * MB))
+        assert about(workspace.available_bytes(), 60 * MB)
+        workspace.reserve("job-b", 50 * MB, "downloading")
+        assert workspace.metrics("job-a")["tmpUsedBytes"] >= 20 * MB
+
+        workspace.release("job-a")
+        workspace.release("job-b")
+        assert about(workspace.available_bytes(), 100 * MB)
+        print("✅ Reservations shared across jobs and released")
+    finally:
+        workspace.release("job-a")
+        workspace.release("job-b")
+
+
+def make_workspace(root, name, pid):
+    job_dir = os.path.join(root, name)
+    os.makedirs(job_dir)
+    if pid is not None:
+        with open(os.path.join(job_dir, WorkspaceManager.MARKER), "w") as f:
+            f.write(str(pid))
+    return job_dir
+
+
+def test_sweep(root):
+    """Only workspaces of processes that are gone (or of this one) are swept"""
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    dead_dir = make_workspace(root, "dead", dead.pid)
+    stale_dir = make_workspace(root, "stale", os.getpid())
+    live_dir = make_workspace(root, "live", os.getppid())
+    unmarked_dir = make_workspace(root, "unmarked", None)
+
+    workspace = WorkspaceManager(root)
+    active_dir = workspace.create("active")
+    try:
+        workspace.sweep_orphans()
+        assert not os.path.exists(dead_dir) and not os.path.exists(stale_dir)
+        for kept in (live_dir, unmarked_dir, active_dir):
+            assert os.path.isdir(kept), kept
+    finally:
+        workspace.release("active")
+    print("✅ Orphaned workspaces swept, live and unmarked ones kept")
+
+
+if __name__ == "__main__":
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_reservations(os.path.join(temp_dir, "reserve"))
+            test_sweep(os.path.join(temp_dir, "sweep"))
+    except AssertionError as e:
+        print(f"❌ Workspace manager check failed: {e}")
+        sys.exit(1)